@@ -0,0 +1,96 @@
+"""
+Mide la memoria que ocupan los objetos del modelo al listar citas
+Compara Cita (con __slots__) contra una clase equivalente con __dict__,
+usando una base SQLite temporal para no tocar los datos reales
+
+Uso: python benchmark_memoria.py [número de citas]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import date, timedelta, time
+
+from config.settings import DATABASE_CONFIG
+from config.database import Database
+from controllers.cita_controller import CitaController, SELECT_CITAS
+from models.cita import Cita
+
+
+class CitaConDict:
+    """Cita sin __slots__: cada objeto guarda sus atributos en un diccionario"""
+    __init__ = Cita.__init__
+
+
+def poblar(base: Database, numero_citas: int):
+    """Crea un psicólogo, 500 pacientes y las citas a medir"""
+    id_usuario = base.insertar_retornando_id(
+        "INSERT INTO USUARIO (nombre, correo, contraseña, rol) VALUES (?, ?, ?, ?)",
+        ('Psicóloga de prueba', 'psicologa@prueba.com', 'x' * 64, 'psicologo'),
+        'IDusuario'
+    )
+    id_psicologo = base.insertar_retornando_id(
+        "INSERT INTO PSICOLOGOS (IDusuario, especialidad, cedula) VALUES (?, 'Clínica', '00000001')",
+        (id_usuario,), 'IDpsicologo'
+    )
+    base.ejecutar_lote(
+        "INSERT INTO PACIENTES (nombre, telefono, correo) VALUES (?, ?, ?)",
+        [(f"Paciente {i:04d}", f"55{i:08d}", f"paciente{i}@prueba.com") for i in range(500)]
+    )
+    inicio = date(2025, 1, 1)
+    base.ejecutar_lote(
+        "INSERT INTO CITAS (IDpaciente, IDpsicologo, fecha, hora, modalidad) VALUES (?, ?, ?, ?, ?)",
+        [(i % 500 + 1, id_psicologo, inicio + timedelta(days=i // 8), time(9 + i % 8),
+          'Presencial' if i % 3 else 'Virtual') for i in range(numero_citas)]
+    )
+
+
+def medir(funcion) -> tuple:
+    """
+    Ejecuta funcion y mide la memoria que siguen ocupando sus resultados
+    Returns:
+        tuple: (lista de resultados, bytes retenidos)
+    """
+    tracemalloc.start()
+    resultados = funcion()
+    retenidos, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultados, retenidos
+
+
+def main():
+    numero_citas = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        config = dict(DATABASE_CONFIG, motor='sqlite',
+                      sqlite_archivo=os.path.join(carpeta, 'benchmark.db'))
+        base = Database(config)
+        if not base.conectar():
+            return
+            
+        try:
+            poblar(base, numero_citas)
+            controlador = CitaController()
+            controlador.db = base
+            
+            con_slots, bytes_slots = medir(controlador.listar_citas)
+            con_dict, bytes_dict = medir(lambda: base.ejecutar_consulta(SELECT_CITAS, modelo=CitaConDict))
+            
+            filas = len(con_slots)
+            print(f"\nCitas listadas: {filas}")
+            print(f"  Cita con __slots__: {bytes_slots / filas:8.1f} bytes por fila")
+            print(f"  Cita con __dict__:  {bytes_dict / filas:8.1f} bytes por fila")
+            print(f"  Ahorro:             {(bytes_dict - bytes_slots) / filas:8.1f} bytes por fila "
+                  f"({100 * (1 - bytes_slots / bytes_dict):.0f}%)")
+            # Solo el objeto (sin los valores de sus atributos)
+            objeto_slots = sys.getsizeof(con_slots[0])
+            objeto_dict = sys.getsizeof(con_dict[0]) + sys.getsizeof(con_dict[0].__dict__)
+            print(f"  Tamaño del objeto:  {objeto_slots} bytes con __slots__, {objeto_dict} bytes con __dict__")
+            del con_slots, con_dict
+        finally:
+            base.desconectar()
+
+
+if __name__ == "__main__":
+    main()
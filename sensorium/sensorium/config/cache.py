@@ -0,0 +1,177 @@
+"""
+Caché de resultados de consultas para datos de referencia
+Guarda en memoria los resultados de los SELECT que lo piden (cache=True)
+por un tiempo limitado y con un número máximo de entradas (LRU).
+Cada escritura invalida las entradas que leen de las tablas que modifica
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, FrozenSet, Iterable, Optional, Tuple
+
+# Tablas cuyas filas se borran en cascada al borrar una fila de la tabla padre
+# (ON DELETE CASCADE en init_db.sql / init_db_sqlite.sql)
+CASCADAS = {
+    'USUARIO': ('PSICOLOGOS',),
+    'PSICOLOGOS': ('HORARIOS',),
+    'PACIENTES': ('CITAS', 'HISTORIAL'),
+    'CITAS': ('CONSULTAS',),
+    'CONSULTAS': ('PAGOS',),
+}
+
+_PATRON_LECTURA = re.compile(r'\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)', re.IGNORECASE)
+_PATRON_ESCRITURA = re.compile(
+    r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+(?:FROM\s+)?|MERGE\s+(?:INTO\s+)?)\s*([A-Za-z_]\w*)',
+    re.IGNORECASE
+)
+
+
+def normalizar_query(query: str) -> str:
+    """Une los espacios de la query para que el formato no cambie la clave"""
+    return ' '.join(query.split())
+
+
+def tablas_leidas(query: str) -> FrozenSet[str]:
+    """
+    Tablas de las que lee un SELECT (FROM y JOIN)
+    Args:
+        query: Consulta SELECT
+    Returns:
+        FrozenSet[str]: Nombres de tabla en mayúsculas
+    """
+    return frozenset(tabla.upper() for tabla in _PATRON_LECTURA.findall(query))
+
+
+def tablas_modificadas(query: str) -> Optional[FrozenSet[str]]:
+    """
+    Tablas que puede modificar una escritura, incluidas las cascadas
+    Args:
+        query: INSERT, UPDATE, DELETE o MERGE
+    Returns:
+        FrozenSet[str] con las tablas, o None si no se reconoce la sentencia
+        (en ese caso se invalida toda la caché)
+    """
+    coincidencia = _PATRON_ESCRITURA.match(query)
+    if not coincidencia:
+        return None
+        
+    tablas = set()
+    pendientes = [coincidencia.group(1).upper()]
+    while pendientes:
+        tabla = pendientes.pop()
+        if tabla not in tablas:
+            tablas.add(tabla)
+            pendientes.extend(CASCADAS.get(tabla, ()))
+    return frozenset(tablas)
+
+
+class CacheConsultas:
+    """
+    Caché LRU con tiempo de vida (TTL) e invalidación por tabla
+    Es segura entre hilos; una lectura que empezó antes de una escritura
+    no guarda su resultado (se compara la generación)
+    """
+    
+    def __init__(self, maximo: int = 256, ttl: float = 60):
+        """
+        Args:
+            maximo: Número máximo de resultados guardados
+            ttl: Segundos que vive cada resultado (0 desactiva la caché)
+        """
+        self.maximo = maximo
+        self.ttl = ttl
+        self.generacion = 0  # Aumenta con cada invalidación
+        self.aciertos = 0
+        self.fallos = 0
+        
+        self._entradas = OrderedDict()  # clave -> (expira, tablas, resultado)
+        self._por_tabla = {}  # tabla -> claves que leen de ella
+        self._lock = threading.Lock()
+    
+    @property
+    def activa(self) -> bool:
+        """Indica si la caché guarda resultados"""
+        return self.ttl > 0 and self.maximo > 0
+    
+    @staticmethod
+    def clave(query: str, parametros: Optional[Tuple], modelo: Optional[type], una: bool = False) -> tuple:
+        """Clave de un resultado: query normalizada, parámetros y modelo"""
+        return (normalizar_query(query), tuple(parametros or ()), modelo, una)
+    
+    def obtener(self, clave: tuple) -> Tuple[bool, Any]:
+        """
+        Busca un resultado vigente
+        Returns:
+            tuple: (encontrado: bool, resultado)
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return False, None
+                
+            expira, _, resultado = entrada
+            if expira < time.monotonic():
+                self._quitar(clave)
+                self.fallos += 1
+                return False, None
+                
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return True, resultado
+    
+    def guardar(self, clave: tuple, resultado: Any, generacion: int):
+        """
+        Guarda un resultado leído de la base de datos
+        Args:
+            clave: Clave obtenida con clave()
+            resultado: Lista de filas u objeto a guardar
+            generacion: Valor de self.generacion antes de ejecutar la consulta
+        """
+        tablas = tablas_leidas(clave[0])
+        with self._lock:
+            if generacion != self.generacion:
+                return  # Hubo una escritura mientras se leía
+                
+            self._quitar(clave)
+            self._entradas[clave] = (time.monotonic() + self.ttl, tablas, resultado)
+            for tabla in tablas:
+                self._por_tabla.setdefault(tabla, set()).add(clave)
+                
+            while len(self._entradas) > self.maximo:
+                self._quitar(next(iter(self._entradas)))
+    
+    def invalidar(self, tablas: Optional[Iterable[str]] = None):
+        """
+        Descarta los resultados que leen de alguna de las tablas
+        Args:
+            tablas: Nombres de tabla; None descarta todo
+        """
+        with self._lock:
+            self.generacion += 1
+            if tablas is None:
+                self._entradas.clear()
+                self._por_tabla.clear()
+                return
+                
+            for tabla in tablas:
+                for clave in list(self._por_tabla.get(tabla.upper(), ())):
+                    self._quitar(clave)
+    
+    def invalidar_escritura(self, query: str):
+        """Descarta los resultados afectados por una sentencia de escritura"""
+        self.invalidar(tablas_modificadas(query))
+    
+    def _quitar(self, clave: tuple):
+        """Elimina una entrada y sus referencias por tabla (con el lock tomado)"""
+        entrada = self._entradas.pop(clave, None)
+        if entrada is None:
+            return
+        for tabla in entrada[1]:
+            claves = self._por_tabla.get(tabla)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_tabla[tabla]
@@ -1,47 +1,203 @@
 """
-Módulo de configuración de la base de datos SQL Server
+Módulo de configuración de la base de datos (SQL Server o SQLite)
 Maneja la conexión y operaciones básicas con la base de datos
 """
 
-import pyodbc # pyright: ignore[reportMissingImports]
-from typing import Optional, List, Tuple, Any
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from queue import Queue, Empty
+from typing import Optional, List, Tuple, Any, Callable, Iterator
+from config.settings import DATABASE_CONFIG, PATHS
+from config.motores import crear_motor
+from config.mapeador import obtener_mapeador, nombre_atributo
+from config.cache import CacheConsultas, tablas_modificadas
+
+# Resultado de obtener_cambios: filas nuevas o modificadas, IDs que ya no
+# están en el listado y versión a pedir en la siguiente sincronización
+Cambios = namedtuple('Cambios', ['actualizados', 'eliminados', 'version'])
+
+
+class PoolConexiones:
+    """
+    Pool acotado de conexiones reutilizables
+    Cada hilo toma una conexión propia mientras ejecuta una operación y la
+    devuelve al terminar, de modo que varias cargas pueden correr en paralelo
+    """
+    
+    def __init__(self, fabrica: Callable, tamaño_maximo: int = 5,
+                 timeout: float = 30, segundos_verificacion: float = 60):
+        """
+        Args:
+            fabrica: Función sin argumentos que abre una conexión nueva
+            tamaño_maximo: Número máximo de conexiones abiertas a la vez
+            timeout: Segundos que se espera por una conexión libre
+            segundos_verificacion: Inactividad tras la cual se verifica la
+                conexión antes de entregarla
+        """
+        self.fabrica = fabrica
+        self.tamaño_maximo = tamaño_maximo
+        self.timeout = timeout
+        self.segundos_verificacion = segundos_verificacion
+        
+        self._libres = Queue()  # Tuplas (conexion, ultimo_uso)
+        self._creadas = 0
+        self._lock = threading.Lock()
+    
+    def obtener(self):
+        """
+        Entrega una conexión sana del pool (checkout)
+        Reutiliza una libre, abre una nueva si no se alcanzó el máximo
+        o espera a que otro hilo devuelva la suya
+        Returns:
+            Conexión lista para usar
+        """
+        # Primero intentar con las conexiones libres
+        while True:
+            try:
+                conexion, ultimo_uso = self._libres.get_nowait()
+            except Empty:
+                break
+            if self._esta_viva(conexion, ultimo_uso):
+                return conexion
+            self._descartar(conexion)
+            
+        # Abrir una nueva si hay capacidad
+        with self._lock:
+            puede_crear = self._creadas < self.tamaño_maximo
+            if puede_crear:
+                self._creadas += 1
+                
+        if puede_crear:
+            try:
+                return self.fabrica()
+            except Exception:
+                with self._lock:
+                    self._creadas -= 1
+                raise
+                
+        # Esperar a que se libere alguna
+        try:
+            conexion, ultimo_uso = self._libres.get(timeout=self.timeout)
+        except Empty:
+            raise TimeoutError("No hay conexiones disponibles en el pool")
+            
+        if self._esta_viva(conexion, ultimo_uso):
+            return conexion
+        self._descartar(conexion)
+        return self.obtener()
+    
+    def devolver(self, conexion, verificar: bool = False):
+        """
+        Regresa una conexión al pool (checkin)
+        Args:
+            conexion: Conexión obtenida con obtener()
+            verificar: True para forzar la verificación en el siguiente uso
+                (por ejemplo, después de un error)
+        """
+        ultimo_uso = 0 if verificar else time.monotonic()
+        self._libres.put((conexion, ultimo_uso))
+    
+    def cerrar(self):
+        """Cierra todas las conexiones libres del pool"""
+        while True:
+            try:
+                conexion, _ = self._libres.get_nowait()
+            except Empty:
+                break
+            self._descartar(conexion)
+    
+    def _esta_viva(self, conexion, ultimo_uso: float) -> bool:
+        """Verifica la conexión si estuvo inactiva más de lo configurado"""
+        if time.monotonic() - ultimo_uso < self.segundos_verificacion:
+            return True
+            
+        try:
+            cursor = conexion.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+    
+    def _descartar(self, conexion):
+        """Cierra una conexión y libera su lugar en el pool"""
+        try:
+            conexion.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._creadas -= 1
+
 
 class Database:
     """
-    Clase para manejar la conexión con SQL Server
+    Clase para manejar la conexión con la base de datos
+    El motor (SQL Server o SQLite) se elige con DATABASE_CONFIG['motor'].
+    Las operaciones toman una conexión del pool, crean su propio cursor y
+    devuelven la conexión al terminar; transaccion() agrupa varias en una
     """
     
-    # Configuración de conexión
-    SERVER = 'localhost'  # o '.\SQLEXPRESS' si usas la instancia por defecto
-    DATABASE = 'SENSORIUM'
-    DRIVER = '{ODBC Driver 17 for SQL Server}'  # Driver más común
+    def __init__(self, config: Optional[dict] = None):
+        """
+        Inicializa la clase sin conexión activa
+        Args:
+            config: Configuración a usar (por defecto DATABASE_CONFIG)
+        """
+        self.config = config or DATABASE_CONFIG
+        self.pool = None
+        self._local = threading.local()
+        self.cache = CacheConsultas(
+            maximo=self.config.get('cache_maximo', 256),
+            ttl=self.config.get('cache_ttl', 60)
+        )
+        self._configurar_motor()
     
-    def __init__(self):
-        """Inicializa la clase sin conexión activa"""
-        self.connection = None
-        self.cursor = None
+    def _configurar_motor(self):
+        """Crea el motor y su dialecto según la configuración actual"""
+        self.motor = crear_motor(self.config, PATHS['database'])
+        self.dialecto = self.motor.dialecto
+        self.errores = self.motor.errores
+    
+    def _crear_pool(self, usuario: Optional[str] = None, contraseña: Optional[str] = None):
+        """
+        Crea el pool de conexiones y abre la primera para validar los datos
+        Args:
+            usuario: Usuario de la base de datos (opcional)
+            contraseña: Contraseña del usuario (opcional)
+        """
+        self._configurar_motor()
+        nuevo_pool = PoolConexiones(
+            lambda: self.motor.conectar(usuario, contraseña),
+            tamaño_maximo=self.config.get('pool_maximo', 5),
+            timeout=self.config.get('pool_timeout', 30),
+            segundos_verificacion=self.config.get('pool_verificacion', 60)
+        )
+        conexion = nuevo_pool.obtener()
+        self.motor.preparar(conexion)
+        nuevo_pool.devolver(conexion)
+        
+        if self.pool:
+            self.pool.cerrar()
+        self.pool = nuevo_pool
+        self.cache.invalidar()
     
     def conectar(self) -> bool:
         """
-        Establece conexión con SQL Server usando autenticación de Windows
+        Establece conexión con la base de datos configurada
+        (SQL Server con autenticación de Windows o archivo SQLite)
         Returns:
             bool: True si la conexión fue exitosa, False en caso contrario
         """
         try:
-            connection_string = (
-                f'DRIVER={self.DRIVER};'
-                f'SERVER={self.SERVER};'
-                f'DATABASE={self.DATABASE};'
-                f'Trusted_Connection=yes;'  # Autenticación de Windows
-            )
-            
-            self.connection = pyodbc.connect(connection_string)
-            self.cursor = self.connection.cursor()
-            print("✓ Conexión exitosa a SQL Server")
+            self._crear_pool()
+            print(f"✓ Conexión exitosa a {self.motor.descripcion}")
             return True
             
-        except pyodbc.Error as e:
-            print(f"✗ Error al conectar con SQL Server: {e}")
+        except self.errores as e:
+            print(f"✗ Error al conectar con {self.motor.descripcion}: {e}")
             return False
     
     def conectar_con_credenciales(self, usuario: str, contraseña: str) -> bool:
@@ -54,34 +210,176 @@ class Database:
             bool: True si la conexión fue exitosa
         """
         try:
-            connection_string = (
-                f'DRIVER={self.DRIVER};'
-                f'SERVER={self.SERVER};'
-                f'DATABASE={self.DATABASE};'
-                f'UID={usuario};'
-                f'PWD={contraseña};'
-            )
-            
-            self.connection = pyodbc.connect(connection_string)
-            self.cursor = self.connection.cursor()
-            print("✓ Conexión exitosa a SQL Server")
+            self._crear_pool(usuario, contraseña)
+            print(f"✓ Conexión exitosa a {self.motor.descripcion}")
             return True
             
-        except pyodbc.Error as e:
+        except self.errores as e:
             print(f"✗ Error al conectar: {e}")
             return False
     
     def desconectar(self):
-        """Cierra la conexión con la base de datos"""
+        """Cierra todas las conexiones del pool"""
         try:
-            if self.cursor:
-                self.cursor.close()
-            if self.connection:
-                self.connection.close()
+            if self.pool:
+                self.pool.cerrar()
             print("✓ Conexión cerrada")
         except Exception as e:
             print(f"✗ Error al cerrar conexión: {e}")
     
+    @contextmanager
+    def _conexion(self):
+        """
+        Presta una conexión del pool al hilo actual
+        Si el hilo ya tiene una prestada (llamadas anidadas) se reutiliza
+        """
+        if getattr(self._local, 'conexion', None) is not None:
+            self._local.profundidad += 1
+            try:
+                yield self._local.conexion
+            finally:
+                self._local.profundidad -= 1
+            return
+            
+        if not self.pool:
+            raise RuntimeError("No hay conexión con la base de datos")
+            
+        conexion = self.pool.obtener()
+        self._local.conexion = conexion
+        self._local.profundidad = 0
+        self._local.con_error = False
+        try:
+            yield conexion
+        finally:
+            self._local.conexion = None
+            self.pool.devolver(conexion, verificar=self._local.con_error)
+    
+    @contextmanager
+    def transaccion(self):
+        """
+        Agrupa varias operaciones en una sola transacción (unidad de trabajo)
+        Dentro del bloque las escrituras no se confirman una por una: todo se
+        confirma al salir, o se revierte si hubo una excepción, si alguna
+        query falló o si se llamó a cancelar_transaccion().
+        Los bloques anidados usan puntos de guardado, así un fallo interno
+        solo revierte su parte
+        
+        Uso:
+            with db.transaccion():
+                usuario_controller.crear_usuario(usuario)
+                psicologo_controller.crear_psicologo(psicologo)
+        """
+        with self._conexion() as conexion:
+            nivel = getattr(self._local, 'nivel_transaccion', 0)
+            fallo_externo = getattr(self._local, 'fallo_transaccion', False)
+            punto = f"punto_{nivel}" if nivel else None
+            
+            if punto:
+                self._ejecutar_control(conexion, self.dialecto.sql_crear_punto.format(punto))
+            elif self.dialecto.sql_iniciar_transaccion:
+                self._ejecutar_control(conexion, self.dialecto.sql_iniciar_transaccion)
+            if not nivel:
+                self._local.tablas_transaccion = set()
+            self._local.nivel_transaccion = nivel + 1
+            self._local.fallo_transaccion = False
+            
+            exito = False
+            try:
+                yield self
+                exito = not self._local.fallo_transaccion
+            finally:
+                self._local.nivel_transaccion = nivel
+                self._local.fallo_transaccion = fallo_externo
+                try:
+                    self._cerrar_transaccion(conexion, punto, exito)
+                finally:
+                    if not nivel:
+                        # Otros hilos pudieron guardar lo confirmado antes de este momento
+                        self.cache.invalidar(self._local.tablas_transaccion)
+    
+    def en_transaccion(self) -> bool:
+        """Indica si el hilo actual está dentro de transaccion()"""
+        return getattr(self._local, 'nivel_transaccion', 0) > 0
+    
+    def cancelar_transaccion(self):
+        """
+        Marca la transacción actual para revertirse al salir del bloque
+        Útil cuando un paso devuelve (False, mensaje) sin que fallara el SQL
+        """
+        if self.en_transaccion():
+            self._local.fallo_transaccion = True
+    
+    def _cerrar_transaccion(self, conexion, punto: Optional[str], exito: bool):
+        """Confirma o revierte la transacción (o el punto de guardado) al salir"""
+        try:
+            if punto is None:
+                if exito:
+                    conexion.commit()
+                else:
+                    conexion.rollback()
+                return
+                
+            if not exito:
+                self._ejecutar_control(conexion, self.dialecto.sql_revertir_punto.format(punto))
+            if self.dialecto.sql_liberar_punto:
+                self._ejecutar_control(conexion, self.dialecto.sql_liberar_punto.format(punto))
+                
+        except self.errores as e:
+            print(f"✗ Error al cerrar transacción: {e}")
+            self._local.con_error = True
+            if punto is None:
+                conexion.rollback()
+            else:
+                self._local.fallo_transaccion = True
+            if exito:
+                raise
+    
+    def _ejecutar_control(self, conexion, sentencia: str):
+        """Ejecuta una sentencia de control de transacciones"""
+        cursor = conexion.cursor()
+        try:
+            cursor.execute(sentencia)
+        finally:
+            cursor.close()
+    
+    def _confirmar(self, conexion):
+        """Confirma la escritura salvo que la controle una transacción explícita"""
+        if not self.en_transaccion():
+            conexion.commit()
+    
+    def _revertir(self, conexion):
+        """Revierte tras un error; dentro de una transacción la marca como fallida"""
+        self._local.con_error = True
+        if self.en_transaccion():
+            self._local.fallo_transaccion = True
+        else:
+            conexion.rollback()
+    
+    def _invalidar_cache(self, query: str):
+        """Descarta de la caché lo que pudo cambiar con una escritura"""
+        self.cache.invalidar_escritura(query)
+        if self.en_transaccion():
+            # Se vuelve a invalidar al confirmar o revertir la transacción
+            tablas = tablas_modificadas(query)
+            if tablas is None:
+                self._local.tablas_transaccion = None
+            elif self._local.tablas_transaccion is not None:
+                self._local.tablas_transaccion.update(tablas)
+    
+    def _clave_cache(self, query: str, parametros: Optional[Tuple],
+                     modelo: Optional[type], una: bool = False) -> Optional[tuple]:
+        """Clave de caché de una lectura, o None si no debe usar la caché"""
+        if not self.cache.activa or self.en_transaccion():
+            return None  # Dentro de una transacción se leen los cambios sin confirmar
+        return self.cache.clave(query, parametros, modelo, una)
+    
+    def _ejecutar(self, cursor, query: str, parametros: Optional[Tuple]):
+        """Ejecuta la query en el cursor con o sin parámetros"""
+        if parametros:
+            cursor.execute(query, parametros)
+        else:
+            cursor.execute(query)
+    
     def ejecutar_query(self, query: str, parametros: Optional[Tuple] = None) -> bool:
         """
         Ejecuta una query que modifica datos (INSERT, UPDATE, DELETE)
@@ -91,77 +389,274 @@ class Database:
         Returns:
             bool: True si se ejecutó correctamente
         """
-        try:
-            if parametros:
-                self.cursor.execute(query, parametros)
-            else:
-                self.cursor.execute(query)
-            
-            self.connection.commit()
-            return True
-            
-        except pyodbc.Error as e:
-            print(f"✗ Error al ejecutar query: {e}")
-            self.connection.rollback()
-            return False
+        with self._conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                self._ejecutar(cursor, query, parametros)
+                self._confirmar(conexion)
+                return True
+                
+            except self.errores as e:
+                print(f"✗ Error al ejecutar query: {e}")
+                self._revertir(conexion)
+                return False
+            finally:
+                cursor.close()
+                self._invalidar_cache(query)
+    
+    def ejecutar_lote(self, query: str, filas: List[Tuple], tamaño_lote: Optional[int] = None) -> int:
+        """
+        Ejecuta la misma query para muchas filas (INSERT, UPDATE, DELETE masivos)
+        Las filas se envían por bloques con executemany (fast_executemany en
+        SQL Server) y cada bloque se confirma en su propia transacción
+        Args:
+            query: Consulta SQL con parámetros
+            filas: Lista de tuplas de parámetros, una por fila
+            tamaño_lote: Filas por bloque (por defecto DATABASE_CONFIG['tamaño_lote'])
+        Returns:
+            int: Filas confirmadas; si un bloque falla se revierte y se detiene.
+                Dentro de transaccion() todo el lote se confirma al final
+        """
+        filas = list(filas)
+        if not filas:
+            return 0
+        tamaño_lote = tamaño_lote or self.config.get('tamaño_lote', 500)
+        escritas = 0
+        
+        with self._conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                self.motor.preparar_lote(cursor)
+                for inicio in range(0, len(filas), tamaño_lote):
+                    bloque = filas[inicio:inicio + tamaño_lote]
+                    cursor.executemany(query, bloque)
+                    self._confirmar(conexion)
+                    escritas += len(bloque)
+                return escritas
+                
+            except self.errores as e:
+                print(f"✗ Error al ejecutar lote ({escritas} de {len(filas)} filas guardadas): {e}")
+                self._revertir(conexion)
+                return 0 if self.en_transaccion() else escritas
+            finally:
+                cursor.close()
+                self._invalidar_cache(query)
     
-    def ejecutar_consulta(self, query: str, parametros: Optional[Tuple] = None) -> List[Tuple]:
+    def insertar_retornando_id(self, query: str, parametros: Optional[Tuple] = None,
+                               columna_id: str = 'id') -> Optional[int]:
+        """
+        Ejecuta un INSERT y obtiene el ID generado en el mismo viaje
+        (OUTPUT INSERTED en SQL Server, RETURNING en SQLite)
+        Args:
+            query: INSERT INTO tabla (...) VALUES (...)
+            parametros: Tupla con los parámetros de la query
+            columna_id: Columna IDENTITY de la tabla (por ejemplo 'IDcita')
+        Returns:
+            Optional[int]: ID de la fila insertada, 0 si un INSERT ... SELECT
+                condicional no insertó nada, o None si hubo error
+        """
+        with self._conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                self._ejecutar(cursor, self.dialecto.retornando_id(query, columna_id), parametros)
+                resultado = cursor.fetchone()
+                self._confirmar(conexion)
+                
+                id_insertado = int(resultado[0]) if resultado else 0
+                self._local.ultimo_id = id_insertado or None
+                return id_insertado
+                
+            except self.errores as e:
+                print(f"✗ Error al ejecutar query: {e}")
+                self._revertir(conexion)
+                return None
+            finally:
+                cursor.close()
+                self._invalidar_cache(query)
+    
+    def ejecutar_consulta(self, query: str, parametros: Optional[Tuple] = None,
+                          modelo: Optional[type] = None, cache: bool = False) -> List[Any]:
         """
         Ejecuta una consulta SELECT y retorna los resultados
         Args:
             query: Consulta SQL SELECT
             parametros: Tupla con los parámetros de la query
+            modelo: Clase (o namedtuple) a la que se mapea cada fila por
+                nombre de columna; None para recibir las tuplas
+            cache: Reutilizar el resultado de una consulta idéntica reciente
+                (DATABASE_CONFIG['cache_ttl']). Los objetos devueltos se
+                comparten entre llamadas: no deben modificarse
         Returns:
-            List[Tuple]: Lista de tuplas con los resultados
+            List[Any]: Lista de tuplas u objetos del modelo
         """
-        try:
-            if parametros:
-                self.cursor.execute(query, parametros)
-            else:
-                self.cursor.execute(query)
+        clave = self._clave_cache(query, parametros, modelo) if cache else None
+        if clave:
+            encontrado, resultados = self.cache.obtener(clave)
+            if encontrado:
+                return list(resultados)
+        generacion = self.cache.generacion
+        
+        with self._conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                self._ejecutar(cursor, query, parametros)
+                resultados = cursor.fetchall()
+                if modelo:
+                    resultados = list(map(obtener_mapeador(modelo, cursor.description), resultados))
+                if clave:
+                    self.cache.guardar(clave, list(resultados), generacion)
+                return resultados
             
-            resultados = self.cursor.fetchall()
-            return resultados
+            except self.errores as e:
+                print(f"✗ Error al ejecutar consulta: {e}")
+                self._local.con_error = True
+                return []
+            finally:
+                cursor.close()
+    
+    def ejecutar_consulta_iter(self, query: str, parametros: Optional[Tuple] = None,
+                               arraysize: int = 500, modelo: Optional[type] = None) -> Iterator[Any]:
+        """
+        Ejecuta una consulta SELECT y entrega las filas por bloques (fetchmany)
+        Pensada para listados grandes y exportaciones: la primera fila llega sin
+        esperar al resto y la memoria no crece con el tamaño del resultado.
+        El cursor usa una conexión propia del pool (o la de la transacción
+        abierta) hasta que el generador se agota o se cierra
+        Args:
+            query: Consulta SQL SELECT
+            parametros: Tupla con los parámetros de la query
+            arraysize: Filas que se piden al servidor en cada bloque
+            modelo: Clase a la que se mapea cada fila (opcional)
+        Yields:
+            Cada fila del resultado (tupla u objeto del modelo)
+        """
+        if self.en_transaccion():
+            # Dentro de una transacción solo su conexión ve los cambios pendientes
+            with self._conexion() as conexion:
+                yield from self._iterar_cursor(conexion, query, parametros, arraysize, modelo)
+            return
             
-        except pyodbc.Error as e:
+        if not self.pool:
+            raise RuntimeError("No hay conexión con la base de datos")
+            
+        # Conexión aparte: el hilo puede seguir usando la suya mientras itera
+        conexion = self.pool.obtener()
+        exito = True
+        try:
+            exito = yield from self._iterar_cursor(conexion, query, parametros, arraysize, modelo)
+        finally:
+            self.pool.devolver(conexion, verificar=not exito)
+    
+    def _iterar_cursor(self, conexion, query: str, parametros: Optional[Tuple],
+                       arraysize: int, modelo: Optional[type] = None):
+        """Recorre el resultado con fetchmany; retorna False si hubo error"""
+        cursor = conexion.cursor()
+        cursor.arraysize = arraysize
+        try:
+            self._ejecutar(cursor, query, parametros)
+            mapear = obtener_mapeador(modelo, cursor.description) if modelo else None
+            while True:
+                filas = cursor.fetchmany(arraysize)
+                if not filas:
+                    return True
+                yield from map(mapear, filas) if mapear else filas
+                
+        except self.errores as e:
             print(f"✗ Error al ejecutar consulta: {e}")
-            return []
+            self._local.con_error = True
+            return False
+        finally:
+            cursor.close()
     
-    def ejecutar_consulta_una(self, query: str, parametros: Optional[Tuple] = None) -> Optional[Tuple]:
+    def ejecutar_consulta_una(self, query: str, parametros: Optional[Tuple] = None,
+                              modelo: Optional[type] = None, cache: bool = False) -> Optional[Any]:
         """
         Ejecuta una consulta SELECT y retorna solo el primer resultado
         Args:
             query: Consulta SQL SELECT
             parametros: Tupla con los parámetros de la query
+            modelo: Clase a la que se mapea la fila (opcional)
+            cache: Reutilizar el resultado de una consulta idéntica reciente
         Returns:
-            Optional[Tuple]: Primera fila del resultado o None
+            Optional[Any]: Primera fila (tupla u objeto del modelo) o None
         """
-        try:
-            if parametros:
-                self.cursor.execute(query, parametros)
-            else:
-                self.cursor.execute(query)
-            
-            resultado = self.cursor.fetchone()
-            return resultado
+        clave = self._clave_cache(query, parametros, modelo, una=True) if cache else None
+        if clave:
+            encontrado, resultado = self.cache.obtener(clave)
+            if encontrado:
+                return resultado
+        generacion = self.cache.generacion
+        
+        with self._conexion() as conexion:
+            cursor = conexion.cursor()
+            try:
+                self._ejecutar(cursor, query, parametros)
+                resultado = cursor.fetchone()
+                if modelo and resultado:
+                    resultado = obtener_mapeador(modelo, cursor.description)(resultado)
+                if clave:
+                    self.cache.guardar(clave, resultado, generacion)
+                return resultado
             
-        except pyodbc.Error as e:
-            print(f"✗ Error al ejecutar consulta: {e}")
-            return None
+            except self.errores as e:
+                print(f"✗ Error al ejecutar consulta: {e}")
+                self._local.con_error = True
+                return None
+            finally:
+                cursor.close()
     
     def obtener_ultimo_id(self) -> Optional[int]:
         """
-        Obtiene el último ID insertado (IDENTITY)
+        Obtiene el último ID insertado por el hilo actual
+        Se captura en insertar_retornando_id junto con el INSERT
         Returns:
             Optional[int]: Último ID generado o None
         """
-        try:
-            self.cursor.execute("SELECT @@IDENTITY")
-            resultado = self.cursor.fetchone()
-            return int(resultado[0]) if resultado else None
-        except Exception as e:
-            print(f"✗ Error al obtener último ID: {e}")
+        return getattr(self._local, 'ultimo_id', None)
+    
+    def version_datos(self) -> Optional[int]:
+        """
+        Versión de los datos confirmados (columna version de cada tabla)
+        Guárdela antes de leer un listado y pásela después a obtener_cambios
+        Returns:
+            Optional[int]: Versión actual o None si hubo error
+        """
+        resultado = self.ejecutar_consulta_una(self.dialecto.sql_version_datos)
+        return int(resultado[0]) if resultado and resultado[0] is not None else None
+    
+    def obtener_cambios(self, query: str, parametros: Optional[Tuple], modelo: type,
+                        tabla: str, columna_id: str, desde_version: int) -> Optional[Cambios]:
+        """
+        Obtiene lo que cambió en un listado desde una versión
+        Args:
+            query: SELECT del listado con sus filtros y la condición
+                dialecto.version_mayor(...) (sin paginación)
+            parametros: Parámetros de la query
+            modelo: Clase a la que se mapea cada fila
+            tabla: Tabla principal del listado (por ejemplo 'CITAS')
+            columna_id: Su clave primaria (por ejemplo 'IDcita')
+            desde_version: Versión de la carga o sincronización anterior
+        Returns:
+            Cambios: actualizados (objetos del modelo que cumplen los filtros),
+                eliminados (set de IDs borrados o que ya no cumplen los
+                filtros) y version; None si hubo error
+        """
+        # La versión se toma primero: lo que cambie durante la lectura se vuelve a enviar
+        version = self.version_datos()
+        if version is None:
             return None
+            
+        actualizados = self.ejecutar_consulta(query, parametros, modelo=modelo)
+        filas = self.ejecutar_consulta(f"""
+        SELECT id, 1 FROM ELIMINADOS WHERE tabla = ? AND {self.dialecto.version_mayor('version')}
+        UNION ALL
+        SELECT {columna_id}, 0 FROM {tabla} WHERE {self.dialecto.version_mayor('version')}
+        """, (tabla, desde_version, desde_version))
+        
+        atributo = nombre_atributo(columna_id)
+        vigentes = {getattr(objeto, atributo) for objeto in actualizados}
+        eliminados = {id_fila for id_fila, _ in filas} - vigentes
+        return Cambios(actualizados, eliminados, version)
     
     def tabla_existe(self, nombre_tabla: str) -> bool:
         """
@@ -171,12 +666,7 @@ class Database:
         Returns:
             bool: True si la tabla existe
         """
-        query = """
-        SELECT COUNT(*) 
-        FROM INFORMATION_SCHEMA.TABLES 
-        WHERE TABLE_NAME = ?
-        """
-        resultado = self.ejecutar_consulta_una(query, (nombre_tabla,))
+        resultado = self.ejecutar_consulta_una(self.dialecto.sql_tabla_existe, (nombre_tabla,))
         return resultado and resultado[0] > 0
     
     def __enter__(self):
@@ -196,21 +686,21 @@ db = Database()
 # Función auxiliar para testing
 def probar_conexion():
     """Prueba la conexión con la base de datos"""
-    print("Probando conexión con SQL Server...")
     db_test = Database()
+    print(f"Probando conexión con {db_test.motor.descripcion}...")
     
     if db_test.conectar():
         print("✓ Conexión establecida correctamente")
         
         # Prueba consulta simple
-        resultado = db_test.ejecutar_consulta_una("SELECT @@VERSION")
+        resultado = db_test.ejecutar_consulta_una(db_test.dialecto.sql_version)
         if resultado:
-            print(f"✓ Versión de SQL Server detectada")
+            print(f"✓ Versión detectada: {resultado[0]}")
         
         db_test.desconectar()
         return True
     else:
-        print("✗ No se pudo conectar a SQL Server")
+        print(f"✗ No se pudo conectar a {db_test.motor.descripcion}")
         print("\nVerifica que:")
         print("1. SQL Server Express esté instalado")
         print("2. El servicio SQL Server esté corriendo")
@@ -0,0 +1,107 @@
+"""
+Mapeo de filas de la base de datos a objetos del modelo
+A partir de cursor.description se genera (una sola vez por combinación de
+modelo y columnas) una función que construye el objeto directamente,
+sin depender de la posición de cada columna en el SELECT
+"""
+
+import re
+import threading
+from typing import Callable, FrozenSet, Optional, Tuple
+
+# Mapeadores ya compilados: (modelo, columnas) -> función
+_mapeadores = {}
+_lock = threading.Lock()
+
+
+def nombre_atributo(columna: str) -> str:
+    """
+    Convierte el nombre de una columna al atributo del modelo
+    'IDcita' -> 'id_cita', 'fecha_regist' -> 'fecha_regist'
+    Args:
+        columna: Nombre (o alias) de la columna en el SELECT
+    Returns:
+        str: Nombre del atributo
+    """
+    if re.match(r'^ID[a-z]', columna):
+        return 'id_' + columna[2:]
+    return columna.lower()
+
+
+def obtener_mapeador(modelo, descripcion) -> Callable:
+    """
+    Devuelve el mapeador de filas para un modelo y un resultado
+    Args:
+        modelo: Clase del modelo (Cita, Paciente, ...) o namedtuple
+        descripcion: cursor.description del resultado
+    Returns:
+        Callable: Función fila -> objeto
+    """
+    columnas = tuple(nombre_atributo(col[0]) for col in descripcion)
+    clave = (modelo, columnas)
+    
+    mapeador = _mapeadores.get(clave)
+    if mapeador is None:
+        with _lock:
+            mapeador = _mapeadores.get(clave)
+            if mapeador is None:
+                mapeador = _compilar(modelo, columnas)
+                _mapeadores[clave] = mapeador
+    return mapeador
+
+
+def _compilar(modelo, columnas: Tuple[str, ...]) -> Callable:
+    """
+    Genera el código de la función de mapeo y lo compila
+    Las columnas que son argumentos del constructor se pasan por nombre;
+    las demás (nombre_paciente, fecha_cita, ...) se asignan después
+    """
+    if issubclass(modelo, tuple):
+        # namedtuple para mostrar: los campos se toman por nombre de columna
+        argumentos = ', '.join(f"fila[{columnas.index(campo)}]" for campo in modelo._fields)
+        codigo = f"def mapear(fila):\n    return Modelo({argumentos})\n"
+    else:
+        parametros = modelo.__init__.__code__.co_varnames[1:modelo.__init__.__code__.co_argcount]
+        atributos = _atributos(modelo)
+        
+        argumentos = []
+        asignaciones = []
+        for indice, columna in enumerate(columnas):
+            if not columna.isidentifier() or columna in columnas[:indice]:
+                continue  # Columnas repetidas o sin nombre: gana la primera
+            if columna in parametros:
+                argumentos.append(f"{columna}=fila[{indice}]")
+            elif atributos is not None and columna not in atributos:
+                continue  # El modelo (con __slots__) no tiene dónde guardarla
+            else:
+                asignaciones.append(f"    objeto.{columna} = fila[{indice}]\n")
+                
+        codigo = (
+            "def mapear(fila):\n"
+            f"    objeto = Modelo({', '.join(argumentos)})\n"
+            + ''.join(asignaciones) +
+            "    return objeto\n"
+        )
+        
+    espacio = {'Modelo': modelo}
+    exec(compile(codigo, f"<mapeador {modelo.__name__}>", 'exec'), espacio)
+    return espacio['mapear']
+
+
+def _atributos(modelo) -> Optional[FrozenSet[str]]:
+    """
+    Atributos que admite un modelo con __slots__
+    Returns:
+        frozenset con los slots de toda la jerarquía, o None si el modelo
+        tiene __dict__ y acepta cualquier atributo
+    """
+    atributos = set()
+    for clase in modelo.__mro__[:-1]:  # Sin object
+        slots = clase.__dict__.get('__slots__')
+        if slots is None:
+            return None
+        slots = (slots,) if isinstance(slots, str) else slots
+        if '__dict__' in slots:
+            return None
+        atributos.update(slots)
+    return frozenset(atributos)
@@ -0,0 +1,528 @@
+"""
+Motores de base de datos soportados por SENSORIUM
+Cada motor sabe abrir conexiones y expone el dialecto SQL que le corresponde
+"""
+
+import os
+import re
+import sqlite3
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Optional
+
+try:
+    import pyodbc # pyright: ignore[reportMissingImports]
+except ImportError:  # Solo es necesario para SQL Server
+    pyodbc = None
+    
+    
+# ========================================================================
+# DIALECTOS
+# ========================================================================
+
+class DialectoSQLServer:
+    """Traduce las construcciones SQL que cambian entre motores (T-SQL)"""
+    
+    sql_version = "SELECT @@VERSION"
+    sql_iniciar_transaccion = None  # pyodbc ya abre la transacción implícitamente
+    sql_crear_punto = "SAVE TRANSACTION {}"
+    sql_revertir_punto = "ROLLBACK TRANSACTION {}"
+    sql_liberar_punto = None  # SQL Server no libera puntos de guardado
+    bloqueo_verificacion = "WITH (UPDLOCK, HOLDLOCK)"  # Retiene el rango leído hasta el INSERT
+    # Mayor ROWVERSION ya confirmada: las transacciones abiertas escribirán valores mayores
+    sql_version_datos = "SELECT CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT) - 1"
+    sql_tabla_existe = """
+    SELECT COUNT(*)
+    FROM INFORMATION_SCHEMA.TABLES
+    WHERE TABLE_NAME = ?
+    """
+    
+    def limitar(self, query: str, limite: int) -> str:
+        """
+        Limita el número de filas de un SELECT
+        Args:
+            query: Consulta SELECT
+            limite: Número máximo de filas
+        Returns:
+            str: Consulta con TOP aplicado
+        """
+        return re.sub(r'^\s*SELECT(\s+DISTINCT)?', lambda m: f"SELECT{m.group(1) or ''} TOP ({int(limite)})",
+                      query, count=1, flags=re.IGNORECASE)
+
+    def retornando_id(self, query: str, columna_id: str) -> str:
+        """
+        Hace que un INSERT devuelva el ID generado en su propio resultado
+        Args:
+            query: INSERT ... VALUES o INSERT ... SELECT
+            columna_id: Columna IDENTITY de la tabla
+        Returns:
+            str: INSERT con OUTPUT INSERTED.<columna_id>
+        """
+        # Las tablas con disparadores (TR_*_Eliminar) no admiten OUTPUT sin INTO
+        insercion = re.sub(r'\)\s*(VALUES|SELECT)\b',
+                           lambda m: f") OUTPUT INSERTED.{columna_id} INTO @ids {m.group(1)}",
+                           query.strip().rstrip(';'), count=1, flags=re.IGNORECASE)
+        return f"SET NOCOUNT ON; DECLARE @ids TABLE (id INT); {insercion}; SELECT id FROM @ids;"
+
+    def minutos(self, columna: str) -> str:
+        """
+        Expresión con los minutos desde las 00:00 de una columna TIME
+        Args:
+            columna: Columna (o alias.columna) de tipo TIME
+        Returns:
+            str: Expresión SQL entera
+        """
+        return f"DATEDIFF(MINUTE, CAST('00:00' AS TIME), {columna})"
+
+    def version_mayor(self, columna: str) -> str:
+        """
+        Condición "la fila cambió después de la versión ?"
+        Args:
+            columna: Columna (o alias.columna) version de la tabla
+        Returns:
+            str: Condición SQL con un parámetro (la versión como entero)
+        """
+        return f"{columna} > CAST(CAST(? AS BIGINT) AS BINARY(8))"
+
+    def empieza_con(self, columna: str, prefijo: str) -> tuple:
+        """
+        Condición "la columna empieza con prefijo" que usa el índice de la columna
+        Args:
+            columna: Columna (o alias.columna) indexada
+            prefijo: Texto ya normalizado como la columna
+        Returns:
+            tuple: (condicion: str, parametros: list)
+        """
+        # LIKE con comodín solo al final es una búsqueda por rango en el índice
+        escapado = re.sub(r'([%_\[])', r'[\1]', prefijo)
+        return f"{columna} LIKE ?", [escapado + '%']
+
+    def unir_texto_completo(self, tabla: str, alias: str, columna_id: str, columnas: list) -> tuple:
+        """
+        JOIN con el índice de texto completo de una tabla
+        Args:
+            tabla: Tabla indexada (ver TEXTO COMPLETO en init_db.sql)
+            alias: Alias de la tabla en el FROM
+            columna_id: Clave del índice (ID de la tabla)
+            columnas: Columnas indexadas en las que se busca
+        Returns:
+            tuple: (join: str con un parámetro para texto_completo(), relevancia: str
+                    con la expresión de relevancia, mayor es más relevante)
+        """
+        return (f"INNER JOIN CONTAINSTABLE({tabla}, ({', '.join(columnas)}), ?) AS ft "
+                f"ON ft.[KEY] = {alias}.{columna_id}", "ft.RANK")
+    
+    def texto_completo(self, terminos: list) -> str:
+        """
+        Condición de búsqueda: cada término como inicio de alguna palabra
+        Args:
+            terminos: Palabras ya separadas (sin comillas ni operadores)
+        Returns:
+            str: Valor del parámetro de unir_texto_completo()
+        """
+        return ' AND '.join(f'"{termino}*"' for termino in terminos)
+
+
+class DialectoSQLite(DialectoSQLServer):
+    """Dialecto de SQLite"""
+    
+    sql_version = "SELECT 'SQLite ' || sqlite_version()"
+    sql_iniciar_transaccion = "BEGIN"  # Para que un RELEASE anidado no confirme todo
+    sql_crear_punto = "SAVEPOINT {}"
+    sql_revertir_punto = "ROLLBACK TO SAVEPOINT {}"
+    sql_liberar_punto = "RELEASE SAVEPOINT {}"
+    bloqueo_verificacion = ""  # SQLite ya serializa las escrituras
+    sql_version_datos = "SELECT valor FROM VERSION_BD"  # Contador de los disparadores TR_*
+    sql_tabla_existe = """
+    SELECT COUNT(*)
+    FROM sqlite_master
+    WHERE type = 'table' AND name = ?
+    """
+    
+    def limitar(self, query: str, limite: int) -> str:
+        return f"{query.rstrip()} LIMIT {int(limite)}"
+    
+    def retornando_id(self, query: str, columna_id: str) -> str:
+        return f"{query.rstrip()} RETURNING {columna_id}"
+    
+    def minutos(self, columna: str) -> str:
+        # TIME se guarda como texto 'HH:MM:SS'
+        return f"(CAST(substr({columna}, 1, 2) AS INTEGER) * 60 + CAST(substr({columna}, 4, 2) AS INTEGER))"
+    
+    def version_mayor(self, columna: str) -> str:
+        return f"{columna} > ?"
+    
+    def empieza_con(self, columna: str, prefijo: str) -> tuple:
+        # LIKE de SQLite no usa índices sin COLLATE NOCASE: se expresa como rango
+        return f"({columna} >= ? AND {columna} < ?)", [prefijo, prefijo + '\uffff']
+    
+    def unir_texto_completo(self, tabla: str, alias: str, columna_id: str, columnas: list) -> tuple:
+        # Tabla FTS5 {tabla}_FTS con todas las columnas indexadas; bm25() es menor si es más relevante
+        fts = f"{tabla}_FTS"
+        return (f"INNER JOIN {fts} ON {fts} MATCH ? AND {fts}.rowid = {alias}.{columna_id}",
+                f"-bm25({fts})")
+    
+    def texto_completo(self, terminos: list) -> str:
+        # Términos separados por espacio: FTS5 exige todos
+        return ' '.join(f'"{termino}"*' for termino in terminos)
+        
+        
+# ========================================================================
+# MOTORES
+# ========================================================================
+
+class MotorSQLServer:
+    """Conexiones a SQL Server por ODBC"""
+    
+    descripcion = "SQL Server"
+    
+    def __init__(self, config: dict):
+        self.config = config
+        self.dialecto = DialectoSQLServer()
+        self.errores = (pyodbc.Error,) if pyodbc else ()
+    
+    def cadena_conexion(self, usuario: Optional[str] = None, contraseña: Optional[str] = None) -> str:
+        """Arma la cadena de conexión ODBC"""
+        cadena = (
+            f"DRIVER={self.config['driver']};"
+            f"SERVER={self.config['server']};"
+            f"DATABASE={self.config['database']};"
+        )
+        usuario = usuario or self.config.get('user')
+        contraseña = contraseña or self.config.get('password')
+        
+        if usuario:
+            cadena += f"UID={usuario};PWD={contraseña};"
+        else:
+            cadena += "Trusted_Connection=yes;"  # Autenticación de Windows
+        return cadena
+    
+    def conectar(self, usuario: Optional[str] = None, contraseña: Optional[str] = None):
+        """
+        Abre una conexión nueva
+        Returns:
+            Conexión pyodbc
+        """
+        if pyodbc is None:
+            raise RuntimeError("pyodbc no está instalado (pip install pyodbc)")
+        return pyodbc.connect(self.cadena_conexion(usuario, contraseña))
+    
+    def preparar(self, conexion):
+        """Prepara la base de datos la primera vez que se conecta"""
+        pass
+
+    def preparar_lote(self, cursor):
+        """Envía los parámetros de executemany en un solo paquete"""
+        cursor.fast_executemany = True
+
+
+def _convertir_hora(valor: bytes) -> time:
+    """Convierte 'HH:MM' o 'HH:MM:SS' almacenado en SQLite a time"""
+    return time.fromisoformat(valor.decode())
+
+
+def _convertir_fecha(valor: bytes) -> date:
+    """Convierte 'AAAA-MM-DD' (con o sin hora) almacenado en SQLite a date"""
+    return date.fromisoformat(valor.decode()[:10])
+    
+    
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(sep=' '))
+sqlite3.register_adapter(time, lambda t: t.isoformat())
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("DATE", _convertir_fecha)
+sqlite3.register_converter("TIME", _convertir_hora)
+sqlite3.register_converter("DECIMAL", lambda valor: Decimal(valor.decode()))
+
+
+# Cambios de esquema para archivos creados con versiones anteriores
+# (tabla, columna o índice nuevo, sentencias que lo agregan; una tabla que
+# no existe no tiene columnas, así que también sirve para tablas nuevas)
+_MIGRACIONES_SQLITE = [
+    ('CITAS', 'duracion', [
+        "ALTER TABLE CITAS ADD COLUMN duracion INT NOT NULL DEFAULT 60 CHECK (duracion BETWEEN 1 AND 240)",
+        "CREATE INDEX IF NOT EXISTS IX_CITAS_Psicologo ON CITAS(IDpsicologo, fecha, hora, duracion)",
+    ]),
+    ('HORARIOS', 'IDhorario', [
+        """CREATE TABLE IF NOT EXISTS HORARIOS (
+            IDhorario INTEGER PRIMARY KEY AUTOINCREMENT,
+            IDpsicologo INTEGER NOT NULL,
+            dia_semana INT NOT NULL CHECK (dia_semana BETWEEN 0 AND 6),
+            hora_inicio TIME NOT NULL,
+            hora_fin TIME NOT NULL,
+            CHECK (hora_fin > hora_inicio),
+            FOREIGN KEY (IDpsicologo) REFERENCES PSICOLOGOS(IDpsicologo) ON DELETE CASCADE
+        )""",
+        "CREATE INDEX IF NOT EXISTS IX_HORARIOS_Psicologo ON HORARIOS(IDpsicologo, dia_semana)",
+    ]),
+    ('CITAS', 'UX_CITAS_Horario', [
+        "CREATE UNIQUE INDEX IF NOT EXISTS UX_CITAS_Horario ON CITAS(IDpsicologo, fecha, hora) "
+        "WHERE estado != 'Cancelada'",
+    ]),
+]
+
+
+def _versionado_sqlite(tabla: str, columna_id: str) -> list:
+    """
+    Sentencias que agregan la columna version y sus disparadores a una tabla
+    (las mismas de la sección SINCRONIZACIÓN INCREMENTAL de init_db_sqlite.sql)
+    """
+    return [
+        "CREATE TABLE IF NOT EXISTS VERSION_BD (id INTEGER PRIMARY KEY CHECK (id = 1), valor INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO VERSION_BD (id, valor) VALUES (1, 0)",
+        """CREATE TABLE IF NOT EXISTS ELIMINADOS (
+            IDeliminado INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabla VARCHAR(20) NOT NULL,
+            id INTEGER NOT NULL,
+            version INTEGER NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS IX_ELIMINADOS_Version ON ELIMINADOS(tabla, version)",
+        f"ALTER TABLE {tabla} ADD COLUMN version INTEGER NOT NULL DEFAULT 0",
+        f"CREATE INDEX IF NOT EXISTS IX_{tabla}_Version ON {tabla}(version)",
+        f"""CREATE TRIGGER IF NOT EXISTS TR_{tabla}_Insertar AFTER INSERT ON {tabla}
+        BEGIN
+            UPDATE VERSION_BD SET valor = valor + 1;
+            UPDATE {tabla} SET version = (SELECT valor FROM VERSION_BD) WHERE {columna_id} = NEW.{columna_id};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS TR_{tabla}_Actualizar AFTER UPDATE ON {tabla}
+        WHEN NEW.version = OLD.version
+        BEGIN
+            UPDATE VERSION_BD SET valor = valor + 1;
+            UPDATE {tabla} SET version = (SELECT valor FROM VERSION_BD) WHERE {columna_id} = NEW.{columna_id};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS TR_{tabla}_Eliminar AFTER DELETE ON {tabla}
+        BEGIN
+            UPDATE VERSION_BD SET valor = valor + 1;
+            INSERT INTO ELIMINADOS (tabla, id, version) SELECT '{tabla}', OLD.{columna_id}, valor FROM VERSION_BD;
+        END""",
+    ]
+
+
+_MIGRACIONES_SQLITE += [
+    (tabla, 'version', _versionado_sqlite(tabla, columna_id))
+    for tabla, columna_id in [('PACIENTES', 'IDpaciente'), ('CITAS', 'IDcita'),
+                              ('CONSULTAS', 'IDconsulta'), ('PAGOS', 'IDpago')]
+]
+
+
+def _sin_acentos_sqlite(expresion: str) -> str:
+    """Quita los acentos del español a una expresión (lower() de SQLite solo cambia ASCII)"""
+    for acentuada, simple in [('á', 'a'), ('é', 'e'), ('í', 'i'), ('ó', 'o'), ('ú', 'u'), ('ü', 'u'), ('ñ', 'n')]:
+        expresion = f"replace(replace({expresion}, '{acentuada}', '{simple}'), '{acentuada.upper()}', '{simple}')"
+    return expresion
+
+
+# Columnas de búsqueda (columnas generadas, ver init_db_sqlite.sql)
+_MIGRACIONES_SQLITE += [
+    ('PACIENTES', 'nombre_busqueda', [
+        "ALTER TABLE PACIENTES ADD COLUMN nombre_busqueda VARCHAR(40) "
+        f"GENERATED ALWAYS AS ({_sin_acentos_sqlite('lower(trim(nombre))')}) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS IX_PACIENTES_NombreBusqueda ON PACIENTES(nombre_busqueda)",
+    ]),
+    ('PACIENTES', 'telefono_busqueda', [
+        "ALTER TABLE PACIENTES ADD COLUMN telefono_busqueda VARCHAR(15) GENERATED ALWAYS AS ("
+        "replace(replace(replace(replace(replace(replace(telefono, "
+        "' ', ''), '-', ''), '(', ''), ')', ''), '+', ''), '.', '')) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS IX_PACIENTES_TelefonoBusqueda ON PACIENTES(telefono_busqueda)",
+    ]),
+    ('PACIENTES', 'correo_busqueda', [
+        "ALTER TABLE PACIENTES ADD COLUMN correo_busqueda VARCHAR(40) "
+        "GENERATED ALWAYS AS (lower(trim(correo))) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS IX_PACIENTES_CorreoBusqueda ON PACIENTES(correo_busqueda)",
+    ]),
+    ('PSICOLOGOS', 'cedula_busqueda', [
+        "ALTER TABLE PSICOLOGOS ADD COLUMN cedula_busqueda VARCHAR(20) GENERATED ALWAYS AS ("
+        "lower(replace(replace(replace(cedula, ' ', ''), '-', ''), '.', ''))) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS IX_PSICOLOGOS_CedulaBusqueda ON PSICOLOGOS(cedula_busqueda)",
+    ]),
+]
+
+
+def _texto_completo_sqlite(tabla: str, columna_id: str, columnas: list) -> list:
+    """
+    Sentencias que crean la tabla FTS5 de una tabla, sus disparadores y la llenan
+    (las mismas de la sección TEXTO COMPLETO de init_db_sqlite.sql)
+    """
+    fts = f"{tabla}_FTS"
+    lista = ', '.join(columnas)
+    nuevos = ', '.join(f"NEW.{columna}" for columna in columnas)
+    viejos = ', '.join(f"OLD.{columna}" for columna in columnas)
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {lista},
+            content = '{tabla}', content_rowid = '{columna_id}',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS TR_{fts}_Insertar AFTER INSERT ON {tabla}
+        BEGIN
+            INSERT INTO {fts} (rowid, {lista}) VALUES (NEW.{columna_id}, {nuevos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS TR_{fts}_Actualizar AFTER UPDATE OF {lista} ON {tabla}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {lista}) VALUES ('delete', OLD.{columna_id}, {viejos});
+            INSERT INTO {fts} (rowid, {lista}) VALUES (NEW.{columna_id}, {nuevos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS TR_{fts}_Eliminar AFTER DELETE ON {tabla}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {lista}) VALUES ('delete', OLD.{columna_id}, {viejos});
+        END""",
+        f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+    ]
+
+
+# Texto completo de las consultas (ConsultaController.buscar_texto)
+_MIGRACIONES_SQLITE.append(
+    ('CONSULTAS_FTS', 'notas', _texto_completo_sqlite('CONSULTAS', 'IDconsulta',
+                                                      ['notas', 'diagnostico', 'recomend']))
+)
+
+
+def _resumen_sqlite(tabla: str, fecha: str, columnas: str, al_actualizar: str = "") -> list:
+    """
+    Disparadores que anotan en RESUMEN_PENDIENTES los días que cambian en una tabla
+    (los mismos de la sección RESÚMENES de init_db_sqlite.sql)
+    Args:
+        tabla: Tabla resumida
+        fecha: Su columna de fecha
+        columnas: Columnas que cambian el resumen (para UPDATE OF)
+        al_actualizar: Sentencias adicionales del disparador de UPDATE
+    """
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS TR_{tabla}_Resumen_Insertar AFTER INSERT ON {tabla}
+        BEGIN
+            INSERT INTO RESUMEN_PENDIENTES (fecha) VALUES (NEW.{fecha});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS TR_{tabla}_Resumen_Actualizar AFTER UPDATE OF {columnas} ON {tabla}
+        BEGIN
+            INSERT INTO RESUMEN_PENDIENTES (fecha) VALUES (OLD.{fecha});
+            INSERT INTO RESUMEN_PENDIENTES (fecha) SELECT NEW.{fecha} WHERE NEW.{fecha} != OLD.{fecha};
+            {al_actualizar}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS TR_{tabla}_Resumen_Eliminar AFTER DELETE ON {tabla}
+        BEGIN
+            INSERT INTO RESUMEN_PENDIENTES (fecha) VALUES (OLD.{fecha});
+        END""",
+    ]
+
+
+# Resúmenes diarios de citas y pagos (ResumenController)
+_MIGRACIONES_SQLITE.append(
+    ('RESUMEN_PENDIENTES', 'IDpendiente', [
+        """CREATE TABLE IF NOT EXISTS RESUMEN_CITAS (
+            fecha DATE NOT NULL,
+            IDpsicologo INTEGER NOT NULL,
+            estado VARCHAR(20) NOT NULL,
+            modalidad VARCHAR(20) NOT NULL,
+            citas INT NOT NULL,
+            PRIMARY KEY (fecha, IDpsicologo, estado, modalidad)
+        )""",
+        """CREATE TABLE IF NOT EXISTS RESUMEN_PAGOS (
+            fecha DATE NOT NULL,
+            IDpsicologo INTEGER NOT NULL,
+            estatus_pago VARCHAR(20) NOT NULL,
+            metodo VARCHAR(20) NOT NULL,
+            pagos INT NOT NULL,
+            monto DECIMAL(12,2) NOT NULL,
+            PRIMARY KEY (fecha, IDpsicologo, estatus_pago, metodo)
+        )""",
+        """CREATE TABLE IF NOT EXISTS RESUMEN_PENDIENTES (
+            IDpendiente INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha DATE NOT NULL
+        )""",
+        *_resumen_sqlite('CITAS', 'fecha', 'fecha, IDpsicologo, estado, modalidad', """
+            INSERT INTO RESUMEN_PENDIENTES (fecha)
+            SELECT DISTINCT p.fecha_pago
+            FROM CONSULTAS co
+            INNER JOIN PAGOS p ON p.IDconsulta = co.IDconsulta
+            WHERE co.IDcita = NEW.IDcita AND NEW.IDpsicologo != OLD.IDpsicologo;"""),
+        *_resumen_sqlite('PAGOS', 'fecha_pago', 'fecha_pago, estatus_pago, metodo, monto'),
+        # Los datos anteriores a los resúmenes se calculan en la primera lectura
+        "INSERT INTO RESUMEN_PENDIENTES (fecha) SELECT fecha FROM CITAS UNION SELECT fecha_pago FROM PAGOS",
+    ])
+)
+
+
+class MotorSQLite:
+    """
+    Base de datos embebida en un archivo local
+    Pensada para consultorios de una sola sede y para pruebas sin SQL Server
+    """
+    
+    descripcion = "SQLite"
+    
+    def __init__(self, config: dict, carpeta: str):
+        self.config = config
+        self.dialecto = DialectoSQLite()
+        self.errores = (sqlite3.Error,)
+        self.ruta = os.path.join(carpeta, config.get('sqlite_archivo', 'sensorium.db'))
+        self.ruta_script = os.path.join(carpeta, 'init_db_sqlite.sql')
+    
+    def conectar(self, usuario: Optional[str] = None, contraseña: Optional[str] = None):
+        """
+        Abre una conexión nueva con los PRAGMA de rendimiento
+        Las credenciales se ignoran: el archivo local no las usa
+        Returns:
+            Conexión sqlite3
+        """
+        conexion = sqlite3.connect(
+            self.ruta,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,  # El pool entrega cada conexión a un solo hilo a la vez
+            timeout=self.config.get('sqlite_busy_timeout', 5)
+        )
+        conexion.execute("PRAGMA journal_mode = WAL")
+        conexion.execute("PRAGMA synchronous = NORMAL")
+        conexion.execute(f"PRAGMA mmap_size = {int(self.config.get('sqlite_mmap', 268435456))}")
+        conexion.execute("PRAGMA temp_store = MEMORY")
+        conexion.execute("PRAGMA foreign_keys = ON")
+        return conexion
+    
+    def preparar(self, conexion):
+        """Crea el esquema si el archivo está vacío o lo actualiza si es anterior"""
+        existe = conexion.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'USUARIO'"
+        ).fetchone()[0]
+        
+        if not existe:
+            with open(self.ruta_script, 'r', encoding='utf-8') as archivo:
+                conexion.executescript(archivo.read())
+            conexion.commit()
+            return
+            
+        for tabla, nombre, sentencias in _MIGRACIONES_SQLITE:
+            # table_xinfo también lista las columnas generadas
+            existentes = {fila[1] for fila in conexion.execute(f"PRAGMA table_xinfo({tabla})")}
+            existentes.update(fila[1] for fila in conexion.execute(f"PRAGMA index_list({tabla})"))
+            if nombre in existentes:
+                continue
+            try:
+                for sentencia in sentencias:
+                    conexion.execute(sentencia)
+                conexion.commit()
+            except sqlite3.IntegrityError as e:
+                # Por ejemplo, citas duplicadas que impiden crear un índice único
+                conexion.rollback()
+                print(f"✗ No se pudo actualizar {tabla} ({nombre}): {e}")
+
+    def preparar_lote(self, cursor):
+        """executemany de sqlite3 ya reutiliza la sentencia preparada"""
+        pass
+
+
+def crear_motor(config: dict, carpeta_bd: str):
+    """
+    Crea el motor indicado en DATABASE_CONFIG['motor']
+    Args:
+        config: Diccionario DATABASE_CONFIG
+        carpeta_bd: Carpeta database/ del proyecto
+    Returns:
+        MotorSQLServer o MotorSQLite
+    """
+    motor = config.get('motor', 'sqlserver').lower()
+    
+    if motor == 'sqlite':
+        return MotorSQLite(config, carpeta_bd)
+    if motor == 'sqlserver':
+        return MotorSQLServer(config)
+        
+    raise ValueError(f"Motor de base de datos no soportado: {motor}")
@@ -6,12 +6,22 @@ Configuraciones generales del sistema SENSORIUM
 # CONFIGURACIÓN DE LA BASE DE DATOS
 # ========================================================================
 
-# Configuración de SQL Server
+# Configuración de la base de datos
 DATABASE_CONFIG = {
+    'motor': 'sqlserver',  # 'sqlserver' o 'sqlite' (archivo local en database/)
     'server': 'localhost',  # o '.\SQLEXPRESS' para SQL Server Express
     'database': 'SENSORIUM',
     'driver': '{ODBC Driver 17 for SQL Server}',
     'trusted_connection': True,  # True para autenticación de Windows
+    'pool_maximo': 5,  # Conexiones simultáneas máximas del pool
+    'pool_timeout': 30,  # Segundos de espera por una conexión libre
+    'pool_verificacion': 60,  # Segundos de inactividad antes de verificar una conexión
+    'tamaño_lote': 500,  # Filas por transacción en escrituras masivas
+    'cache_ttl': 60,  # Segundos que se reutilizan los datos de referencia (0 = sin caché)
+    'cache_maximo': 256,  # Resultados guardados como máximo en la caché
+    'sqlite_archivo': 'sensorium.db',  # Archivo dentro de la carpeta database/
+    'sqlite_mmap': 268435456,  # Bytes mapeados en memoria (256MB)
+    'sqlite_busy_timeout': 5,  # Segundos de espera si otra conexión está escribiendo
 }
 
 # Si prefieres usar usuario y contraseña en lugar de Windows Authentication
@@ -49,6 +59,9 @@ UI_CONFIG = {
     'window_size': '1200x700',  # Tamaño de ventana por defecto
     'font_family': 'Arial',
     'font_size': 10,
+    'filas_por_pagina': 1000,  # Filas por página (las tablas solo dibujan las visibles)
+    'hilos_carga': 4,  # Hilos que leen datos en segundo plano para las vistas
+    'intervalo_carga': 30,  # Milisegundos entre revisiones de las cargas en segundo plano
     'colors': {
         'primary': '#2563eb',  # Azul
         'secondary': '#64748b',  # Gris
@@ -66,14 +79,38 @@ UI_CONFIG = {
 
 CITAS_CONFIG = {
     'duracion_default': 60,  # Duración por defecto en minutos
+    'duracion_maxima': 240,  # Duración máxima de una cita (acota la búsqueda de traslapes)
+    'duraciones': [30, 45, 60, 90, 120],  # Opciones del formulario de citas
+    'frecuencias': {'Semanal': 7, 'Quincenal': 14, 'Cada 4 semanas': 28},  # Días entre sesiones de una serie
+    'sesiones_maximas': 52,  # Citas máximas de una serie
     'horario_inicio': '08:00',  # Hora de inicio de atención
     'horario_fin': '20:00',  # Hora de fin de atención
     'intervalo_citas': 30,  # Intervalo entre citas en minutos
+    'dias_atencion': [0, 1, 2, 3, 4, 5],  # Lunes a sábado (horario por defecto)
     'dias_anticipacion': 30,  # Días máximos de anticipación para agendar
     'modalidades': ['Presencial', 'Virtual'],
     'estados': ['Programada', 'Completada', 'Cancelada']
 }
 
+# ========================================================================
+# CONFIGURACIÓN DE BÚSQUEDA
+# ========================================================================
+
+BUSQUEDA_CONFIG = {
+    'resultados_maximos': 50,  # Resultados de la búsqueda de pacientes mientras se escribe
+    'espera_escritura': 150,  # Milisegundos sin teclear antes de buscar
+    'sincronizar_cada': 30,  # Segundos entre lecturas de cambios hechos por otros equipos
+}
+
+# ========================================================================
+# CONFIGURACIÓN DEL PANEL PRINCIPAL
+# ========================================================================
+
+DASHBOARD_CONFIG = {
+    'ttl_resumen': 15,  # Segundos que se reutilizan las estadísticas del panel (0 = siempre leer)
+    'actualizar_resumenes_cada': 60,  # Segundos entre recálculos en segundo plano de los resúmenes diarios
+}
+
 # ========================================================================
 # CONFIGURACIÓN DE PAGOS
 # ========================================================================
@@ -226,6 +263,8 @@ def get_config(seccion: str) -> dict:
         'SECURITY': SECURITY_CONFIG,
         'UI': UI_CONFIG,
         'CITAS': CITAS_CONFIG,
+        'BUSQUEDA': BUSQUEDA_CONFIG,
+        'DASHBOARD': DASHBOARD_CONFIG,
         'PAGOS': PAGOS_CONFIG,
         'NOTIFICACIONES': NOTIFICACIONES_CONFIG,
         'VALIDACIONES': VALIDACIONES,
@@ -244,6 +283,7 @@ if __name__ == "__main__":
     print("CONFIGURACIÓN DEL SISTEMA SENSORIUM")
     print("=" * 50)
     print(f"\nAplicación: {APP_CONFIG['nombre']} v{APP_CONFIG['version']}")
+    print(f"Motor: {DATABASE_CONFIG['motor']}")
     print(f"Base de datos: {DATABASE_CONFIG['database']}")
     print(f"Servidor: {DATABASE_CONFIG['server']}")
     print(f"Driver: {DATABASE_CONFIG['driver']}")
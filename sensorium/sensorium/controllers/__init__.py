@@ -14,6 +14,8 @@ from .cita_controller import CitaController
 from .consulta_controller import ConsultaController
 from .pago_controller import PagoController
 from .historial_controller import HistorialController
+from .resumen_controller import ResumenController
+from .dashboard_controller import DashboardController
 
 __all__ = [
     'AuthController',
@@ -23,5 +25,7 @@ __all__ = [
     'CitaController',
     'ConsultaController',
     'PagoController',
-    'HistorialController'
+    'HistorialController',
+    'ResumenController',
+    'DashboardController'
 ]
\ No newline at end of file
@@ -31,21 +31,11 @@ class AuthController:
         try:
             # Buscar usuario por correo
             query = "SELECT * FROM USUARIO WHERE correo = ?"
-            resultado = self.db.ejecutar_consulta_una(query, (correo,))
+            usuario = self.db.ejecutar_consulta_una(query, (correo,), modelo=Usuario)
             
-            if not resultado:
+            if not usuario:
                 return False, None, "Usuario no encontrado"
             
-            # Crear objeto usuario
-            usuario = Usuario(
-                id_usuario=resultado[0],
-                nombre=resultado[1],
-                correo=resultado[2],
-                contraseña=resultado[3],
-                rol=resultado[4],
-                fecha_regist=resultado[5]
-            )
-            
             # Verificar contraseña
             if usuario.verificar_contraseña(contraseña):
                 self.usuario_actual = usuario
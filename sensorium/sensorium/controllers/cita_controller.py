@@ -3,14 +3,45 @@ Controlador para gestionar citas
 """
 
 from config.database import db
+from config.settings import CITAS_CONFIG
 from models.cita import Cita
-from datetime import datetime, date
+from controllers.resumen_controller import ResumenController
+from utiles.helpers import convertir_hora, condicion_despues_de, intervalo_cita
+from datetime import datetime, date, time, timedelta
+from collections import namedtuple
+
+# Citas con los nombres que muestran las vistas (alias = atributo de Cita)
+SELECT_CITAS = """
+SELECT c.*, pac.nombre AS nombre_paciente, u.nombre AS nombre_psicologo, ps.especialidad
+FROM CITAS c
+INNER JOIN PACIENTES pac ON c.IDpaciente = pac.IDpaciente
+INNER JOIN PSICOLOGOS ps ON c.IDpsicologo = ps.IDpsicologo
+INNER JOIN USUARIO u ON ps.IDusuario = u.IDusuario
+"""
+
+# Horario disponible para agendar (resultado de buscar_horarios_libres)
+HorarioLibre = namedtuple('HorarioLibre', ['fecha', 'hora', 'id_psicologo', 'nombre_psicologo'])
+
+# Resultado de cada sesión de crear_serie_citas; motivo explica por qué no está disponible
+OcurrenciaSerie = namedtuple('OcurrenciaSerie', ['fecha', 'hora', 'disponible', 'motivo'], defaults=(None,))
+
+
+def _minutos(hora: time) -> int:
+    """Minutos transcurridos desde las 00:00"""
+    return hora.hour * 60 + hora.minute
+
+
+def _bits(desde: int, hasta: int) -> int:
+    """Máscara con los bits desde..hasta-1 encendidos"""
+    return ((1 << (hasta - desde)) - 1) << desde if hasta > desde else 0
+
 
 class CitaController:
     """Controlador para operaciones CRUD de citas"""
     
     def __init__(self):
         self.db = db
+        self.resumen = ResumenController()
     
     def crear_cita(self, cita: Cita) -> tuple:
         """
@@ -25,33 +56,205 @@ class CitaController:
             es_valido, mensaje = cita.validar_datos()
             if not es_valido:
                 return False, mensaje, None
+                
+            # Mismo formato de hora en cualquier motor ('09:00' -> time)
+            cita.hora = convertir_hora(cita.hora)
+            cita.duracion = cita.duracion or CITAS_CONFIG['duracion_default']
             
-            # Verificar disponibilidad
-            if not self.verificar_disponibilidad(cita.id_psicologo, cita.fecha, cita.hora):
-                return False, "El psicólogo no está disponible en ese horario", None
-            
-            query = """
-            INSERT INTO CITAS (IDpaciente, IDpsicologo, fecha, hora, modalidad, estado)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """
-            parametros = (
-                cita.id_paciente,
-                cita.id_psicologo,
-                cita.fecha,
-                cita.hora,
-                cita.modalidad,
-                cita.estado
-            )
-            
-            if self.db.ejecutar_query(query, parametros):
-                id_insertado = self.db.obtener_ultimo_id()
+            id_insertado = self._insertar_si_disponible(cita)
+            if id_insertado:
                 return True, "Cita programada exitosamente", id_insertado
+            elif id_insertado == 0:
+                return False, "El psicólogo no está disponible en ese horario", None
             else:
                 return False, "Error al programar cita", None
                 
         except Exception as e:
             return False, f"Error: {str(e)}", None
     
+    def _insertar_si_disponible(self, cita: Cita):
+        """
+        Inserta una cita solo si el psicólogo está libre en su horario
+        Verificación e inserción en una sola sentencia: dos recepciones no
+        pueden agendar el mismo horario entre la consulta y el INSERT
+        Args:
+            cita: Cita con hora (time) y duracion ya normalizadas
+        Returns:
+            ID de la cita, 0 si el horario estaba ocupado o None si hubo error
+        """
+        traslape, parametros_traslape = self._condicion_traslape(
+            cita.id_psicologo, cita.fecha, cita.hora, cita.duracion)
+        query = f"""
+        INSERT INTO CITAS (IDpaciente, IDpsicologo, fecha, hora, modalidad, estado, duracion)
+        SELECT ?, ?, ?, ?, ?, ?, ?
+        WHERE NOT EXISTS (
+            SELECT 1 FROM CITAS {self.db.dialecto.bloqueo_verificacion}
+            WHERE {traslape}
+        )
+        """
+        parametros = (
+            cita.id_paciente,
+            cita.id_psicologo,
+            cita.fecha,
+            cita.hora,
+            cita.modalidad,
+            cita.estado,
+            cita.duracion
+        ) + parametros_traslape
+        
+        return self.db.insertar_retornando_id(query, parametros, 'IDcita')
+    
+    def crear_citas_lote(self, citas: list) -> tuple:
+        """
+        Crea varias citas en una sola transacción
+        Cada cita se inserta con la misma sentencia condicional de crear_cita,
+        así el horario se verifica al insertar (también contra las citas
+        anteriores del lote). Si alguna no es válida o no está disponible no
+        se crea ninguna
+        Args:
+            citas: Lista de objetos Cita
+        Returns:
+            tuple: (exito: bool, mensaje: str, cantidad: int)
+        """
+        try:
+            # Sin consultas previas de disponibilidad: la verifica cada INSERT
+            for cita in citas:
+                es_valido, mensaje = cita.validar_datos()
+                if not es_valido:
+                    return False, f"{cita.fecha}: {mensaje}", 0
+                    
+                cita.hora = convertir_hora(cita.hora)
+                cita.duracion = cita.duracion or CITAS_CONFIG['duracion_default']
+                
+            # Una sola transacción: se guardan todas o ninguna
+            with self.db.transaccion():
+                for cita in citas:
+                    id_insertado = self._insertar_si_disponible(cita)
+                    if id_insertado == 0:
+                        self.db.cancelar_transaccion()
+                        return False, f"El psicólogo no está disponible el {cita.fecha} a las {cita.hora:%H:%M}", 0
+                    elif not id_insertado:
+                        self.db.cancelar_transaccion()
+                        return False, "Error al programar citas", 0
+                        
+            return True, f"{len(citas)} citas programadas exitosamente", len(citas)
+                
+        except Exception as e:
+            return False, f"Error: {str(e)}", 0
+    
+    def crear_serie_citas(self, id_paciente: int, id_psicologo: int, primera_fecha: date,
+                          hora, frecuencia, n: int, modalidad: str = 'Presencial',
+                          duracion: int = None, omitir_conflictos: bool = False) -> tuple:
+        """
+        Agenda una serie de citas periódicas (por ejemplo terapia semanal)
+        Cada fecha se valida por separado: que no haya pasado, que caiga en el
+        horario de atención del psicólogo y que no choque con otras citas (una
+        sola consulta para todas las fechas). Las que no cumplen se reportan
+        como conflictos; las citas se insertan en un lote dentro de una transacción
+        Args:
+            id_paciente: ID del paciente
+            id_psicologo: ID del psicólogo
+            primera_fecha: Fecha de la primera sesión
+            hora: Hora de todas las sesiones
+            frecuencia: Días entre sesiones o nombre en CITAS_CONFIG['frecuencias']
+            n: Número de sesiones
+            modalidad: 'Presencial' o 'Virtual'
+            duracion: Minutos por sesión (por defecto duracion_default)
+            omitir_conflictos: True para agendar las sesiones disponibles aunque
+                otras tengan conflicto; False para no agendar ninguna si hay conflictos
+        Returns:
+            tuple: (exito: bool, mensaje: str, ocurrencias: list de OcurrenciaSerie)
+        """
+        try:
+            dias = CITAS_CONFIG['frecuencias'].get(frecuencia, frecuencia)
+            if not isinstance(dias, int) or dias < 1:
+                return False, "Frecuencia inválida", []
+            if not 1 <= n <= CITAS_CONFIG['sesiones_maximas']:
+                return False, f"La serie debe tener entre 1 y {CITAS_CONFIG['sesiones_maximas']} sesiones", []
+                
+            primera = Cita(id_paciente=id_paciente, id_psicologo=id_psicologo, fecha=primera_fecha,
+                           hora=hora, modalidad=modalidad, duracion=duracion)
+            es_valido, mensaje = primera.validar_datos()
+            if not es_valido:
+                return False, mensaje, []
+                
+            hora = convertir_hora(hora)
+            duracion = duracion or CITAS_CONFIG['duracion_default']
+            fechas = [primera_fecha + timedelta(days=dias * i) for i in range(n)]
+            ahora = datetime.now()
+            fuera_de_horario = self._fechas_fuera_de_horario(id_psicologo, fechas, hora, duracion)
+            
+            with self.db.transaccion():
+                ocupadas = self._fechas_con_traslape(id_psicologo, fechas, hora, duracion)
+                ocurrencias = []
+                for fecha in fechas:
+                    if datetime.combine(fecha, hora) < ahora:
+                        motivo = "La fecha ya pasó"
+                    elif fecha in fuera_de_horario:
+                        motivo = "Fuera del horario de atención"
+                    elif fecha in ocupadas:
+                        motivo = "Choca con otra cita"
+                    else:
+                        motivo = None
+                    ocurrencias.append(OcurrenciaSerie(fecha, hora, motivo is None, motivo))
+                conflictos = sum(not ocurrencia.disponible for ocurrencia in ocurrencias)
+                
+                if conflictos and not omitir_conflictos:
+                    return False, f"{conflictos} de {n} sesiones no se pueden agendar", ocurrencias
+                    
+                filas = [(id_paciente, id_psicologo, ocurrencia.fecha, hora, modalidad, 'Programada', duracion)
+                         for ocurrencia in ocurrencias if ocurrencia.disponible]
+                query = """
+                INSERT INTO CITAS (IDpaciente, IDpsicologo, fecha, hora, modalidad, estado, duracion)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """
+                if filas and self.db.ejecutar_lote(query, filas) != len(filas):
+                    self.db.cancelar_transaccion()
+                    return False, "Error al programar la serie de citas", ocurrencias
+                    
+            if conflictos:
+                return True, f"{len(filas)} de {n} sesiones programadas ({conflictos} con conflicto)", ocurrencias
+            return True, f"{n} sesiones programadas exitosamente", ocurrencias
+            
+        except Exception as e:
+            return False, f"Error: {str(e)}", []
+    
+    def _fechas_fuera_de_horario(self, id_psicologo: int, fechas: list, hora: time, duracion: int) -> set:
+        """
+        Fechas en las que [hora, hora + duracion) no cabe en el horario de
+        atención del psicólogo (sus bloques en HORARIOS o el de CITAS_CONFIG),
+        con las mismas máscaras por día de la semana que buscar_horarios_libres
+        """
+        intervalo = CITAS_CONFIG['intervalo_citas']
+        plantillas, _ = self._plantillas_horario("p.IDpsicologo = ?", [id_psicologo], intervalo)
+        semana = plantillas.get(id_psicologo, [0] * 7)
+        
+        inicio = _minutos(hora)
+        fin = inicio + duracion
+        if fin > 24 * 60:
+            return set(fechas)
+        necesarios = _bits(inicio // intervalo, -(-fin // intervalo))
+        return {fecha for fecha in fechas if (semana[fecha.weekday()] & necesarios) != necesarios}
+    
+    def _fechas_con_traslape(self, id_psicologo: int, fechas: list, hora: time, duracion: int) -> set:
+        """
+        Fechas en las que [hora, hora + duracion) choca con una cita activa
+        Una sola consulta para todas las fechas; dentro de una transacción
+        en SQL Server el rango leído queda bloqueado hasta confirmar
+        """
+        marcadores = ', '.join('?' * len(fechas))
+        query = f"""
+        SELECT fecha, hora, duracion FROM CITAS {self.db.dialecto.bloqueo_verificacion}
+        WHERE IDpsicologo = ? AND fecha IN ({marcadores}) AND estado != 'Cancelada'
+        """
+        ocupadas = set()
+        for fecha, otra_hora, otra_duracion in self.db.ejecutar_consulta(query, (id_psicologo, *fechas)):
+            inicio, fin = intervalo_cita(fecha, hora, duracion)
+            otro_inicio, otro_fin = intervalo_cita(fecha, otra_hora, otra_duracion)
+            if inicio < otro_fin and otro_inicio < fin:
+                ocupadas.add(fecha)
+        return ocupadas
+    
     def obtener_cita_por_id(self, id_cita: int) -> Cita:
         """
         Obtiene una cita por su ID con datos completos
@@ -61,31 +264,8 @@ class CitaController:
             Cita: Objeto Cita o None
         """
         try:
-            query = """
-            SELECT c.*, pac.nombre, u.nombre, ps.especialidad
-            FROM CITAS c
-            INNER JOIN PACIENTES pac ON c.IDpaciente = pac.IDpaciente
-            INNER JOIN PSICOLOGOS ps ON c.IDpsicologo = ps.IDpsicologo
-            INNER JOIN USUARIO u ON ps.IDusuario = u.IDusuario
-            WHERE c.IDcita = ?
-            """
-            resultado = self.db.ejecutar_consulta_una(query, (id_cita,))
-            
-            if resultado:
-                cita = Cita(
-                    id_cita=resultado[0],
-                    id_paciente=resultado[1],
-                    id_psicologo=resultado[2],
-                    fecha=resultado[3],
-                    hora=resultado[4],
-                    modalidad=resultado[5],
-                    estado=resultado[6]
-                )
-                cita.nombre_paciente = resultado[7]
-                cita.nombre_psicologo = resultado[8]
-                cita.especialidad = resultado[9]
-                return cita
-            return None
+            query = SELECT_CITAS + " WHERE c.IDcita = ?"
+            return self.db.ejecutar_consulta_una(query, (id_cita,), modelo=Cita)
             
         except Exception as e:
             print(f"Error al obtener cita: {e}")
@@ -93,74 +273,111 @@ class CitaController:
     
     def listar_citas(self, fecha_inicio: date = None, fecha_fin: date = None, 
                      id_paciente: int = None, id_psicologo: int = None,
-                     estado: str = None) -> list:
+                     estado: str = None, despues_de: tuple = None,
+                     limite: int = None) -> list:
         """
-        Lista citas con diversos filtros
+        Lista citas con diversos filtros, de la más reciente a la más antigua
         Args:
             fecha_inicio: Fecha de inicio del rango
             fecha_fin: Fecha de fin del rango
             id_paciente: Filtrar por paciente
             id_psicologo: Filtrar por psicólogo
             estado: Filtrar por estado
+            despues_de: (fecha, hora, id_cita) de la última cita de la página
+                anterior; None para la primera página
+            limite: Número máximo de citas (tamaño de página)
         Returns:
             list: Lista de objetos Cita
         """
         try:
-            query = """
-            SELECT c.*, pac.nombre, u.nombre, ps.especialidad
-            FROM CITAS c
-            INNER JOIN PACIENTES pac ON c.IDpaciente = pac.IDpaciente
-            INNER JOIN PSICOLOGOS ps ON c.IDpsicologo = ps.IDpsicologo
-            INNER JOIN USUARIO u ON ps.IDusuario = u.IDusuario
-            WHERE 1=1
-            """
-            parametros = []
+            return list(self.iter_citas(fecha_inicio, fecha_fin, id_paciente, id_psicologo, estado,
+                                        despues_de=despues_de, limite=limite))
             
-            if fecha_inicio:
-                query += " AND c.fecha >= ?"
-                parametros.append(fecha_inicio)
-            
-            if fecha_fin:
-                query += " AND c.fecha <= ?"
-                parametros.append(fecha_fin)
+        except Exception as e:
+            print(f"Error al listar citas: {e}")
+            return []
+    
+    def iter_citas(self, fecha_inicio: date = None, fecha_fin: date = None, 
+                   id_paciente: int = None, id_psicologo: int = None,
+                   estado: str = None, despues_de: tuple = None,
+                   limite: int = None, arraysize: int = 500):
+        """
+        Recorre las citas por bloques sin cargarlas todas en memoria
+        Acepta los mismos filtros y paginación que listar_citas
+        Args:
+            arraysize: Filas que se leen de la base de datos por bloque
+        Yields:
+            Cita: Cada cita con nombre de paciente, psicólogo y especialidad
+        """
+        query, parametros = self._query_citas(fecha_inicio, fecha_fin, id_paciente, id_psicologo,
+                                              estado, despues_de, limite)
+        yield from self.db.ejecutar_consulta_iter(query, parametros, arraysize, modelo=Cita)
+    
+    def listar_citas_cambios(self, desde_version: int, fecha_inicio: date = None,
+                             fecha_fin: date = None, id_paciente: int = None,
+                             id_psicologo: int = None, estado: str = None):
+        """
+        Citas que cambiaron desde una versión, con los filtros de listar_citas
+        Args:
+            desde_version: Versión de la carga anterior (Database.version_datos
+                o Cambios.version de la sincronización anterior)
+        Returns:
+            Cambios: (actualizados, eliminados, version) o None si hubo error
+        """
+        try:
+            query, parametros = self._query_citas(fecha_inicio, fecha_fin, id_paciente, id_psicologo,
+                                                  estado, desde_version=desde_version)
+            return self.db.obtener_cambios(query, parametros, Cita, 'CITAS', 'IDcita', desde_version)
             
-            if id_paciente:
-                query += " AND c.IDpaciente = ?"
-                parametros.append(id_paciente)
+        except Exception as e:
+            print(f"Error al obtener cambios de citas: {e}")
+            return None
+    
+    def _query_citas(self, fecha_inicio: date, fecha_fin: date, id_paciente: int,
+                     id_psicologo: int, estado: str, despues_de: tuple = None,
+                     limite: int = None, desde_version: int = None) -> tuple:
+        """Arma el SELECT de listar_citas / iter_citas / listar_citas_cambios y sus parámetros"""
+        query = SELECT_CITAS + " WHERE 1=1"
+        parametros = []
+        
+        if fecha_inicio:
+            query += " AND c.fecha >= ?"
+            parametros.append(fecha_inicio)
             
-            if id_psicologo:
-                query += " AND c.IDpsicologo = ?"
-                parametros.append(id_psicologo)
+        if fecha_fin:
+            query += " AND c.fecha <= ?"
+            parametros.append(fecha_fin)
             
-            if estado:
-                query += " AND c.estado = ?"
-                parametros.append(estado)
+        if id_paciente:
+            query += " AND c.IDpaciente = ?"
+            parametros.append(id_paciente)
             
-            query += " ORDER BY c.fecha DESC, c.hora DESC"
+        if id_psicologo:
+            query += " AND c.IDpsicologo = ?"
+            parametros.append(id_psicologo)
             
-            resultados = self.db.ejecutar_consulta(query, tuple(parametros) if parametros else None)
+        if estado:
+            query += " AND c.estado = ?"
+            parametros.append(estado)
             
-            citas = []
-            for resultado in resultados:
-                cita = Cita(
-                    id_cita=resultado[0],
-                    id_paciente=resultado[1],
-                    id_psicologo=resultado[2],
-                    fecha=resultado[3],
-                    hora=resultado[4],
-                    modalidad=resultado[5],
-                    estado=resultado[6]
-                )
-                cita.nombre_paciente = resultado[7]
-                cita.nombre_psicologo = resultado[8]
-                cita.especialidad = resultado[9]
-                citas.append(cita)
+        # Solo las filas modificadas después de la versión (IX_CITAS_Version)
+        if desde_version is not None:
+            query += f" AND {self.db.dialecto.version_mayor('c.version')}"
+            parametros.append(desde_version)
             
-            return citas
+        # Paginación por clave: sigue el índice IX_CITAS_Fecha (fecha, hora, IDcita)
+        if despues_de:
+            condicion, valores = condicion_despues_de(['c.fecha', 'c.hora', 'c.IDcita'],
+                                                      despues_de, descendente=True)
+            query += f" AND {condicion}"
+            parametros.extend(valores)
             
-        except Exception as e:
-            print(f"Error al listar citas: {e}")
-            return []
+        query += " ORDER BY c.fecha DESC, c.hora DESC, c.IDcita DESC"
+        
+        if limite:
+            query = self.db.dialecto.limitar(query, limite)
+        
+        return query, tuple(parametros) if parametros else None
     
     def actualizar_cita(self, cita: Cita) -> tuple:
         """
@@ -176,10 +393,18 @@ class CitaController:
             if not es_valido:
                 return False, mensaje
             
+            cita.hora = convertir_hora(cita.hora)
+            cita.duracion = cita.duracion or CITAS_CONFIG['duracion_default']
+            
+            # Al reprogramar no debe chocar con otras citas (se ignora a sí misma)
+            if cita.estado != 'Cancelada' and not self.verificar_disponibilidad(
+                    cita.id_psicologo, cita.fecha, cita.hora, cita.duracion, excluir_cita=cita.id_cita):
+                return False, "El psicólogo no está disponible en ese horario"
+            
             query = """
             UPDATE CITAS 
             SET IDpaciente = ?, IDpsicologo = ?, fecha = ?, 
-                hora = ?, modalidad = ?, estado = ?
+                hora = ?, modalidad = ?, estado = ?, duracion = ?
             WHERE IDcita = ?
             """
             parametros = (
@@ -189,6 +414,7 @@ class CitaController:
                 cita.hora,
                 cita.modalidad,
                 cita.estado,
+                cita.duracion,
                 cita.id_cita
             )
             
@@ -219,6 +445,27 @@ class CitaController:
         except Exception as e:
             return False, f"Error: {str(e)}"
     
+    def cancelar_citas(self, ids_cita: list) -> tuple:
+        """
+        Cancela varias citas en un solo lote
+        Args:
+            ids_cita: Lista de IDs de cita
+        Returns:
+            tuple: (exito: bool, mensaje: str)
+        """
+        try:
+            query = "UPDATE CITAS SET estado = 'Cancelada' WHERE IDcita = ?"
+            filas = [(id_cita,) for id_cita in ids_cita]
+            
+            canceladas = self.db.ejecutar_lote(query, filas)
+            if canceladas == len(filas):
+                return True, f"{canceladas} citas canceladas exitosamente"
+            else:
+                return False, f"Error al cancelar citas ({canceladas} de {len(filas)} canceladas)"
+                
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+    
     def completar_cita(self, id_cita: int) -> tuple:
         """
         Marca una cita como completada
@@ -257,29 +504,176 @@ class CitaController:
         except Exception as e:
             return False, f"Error: {str(e)}"
     
-    def verificar_disponibilidad(self, id_psicologo: int, fecha: date, hora) -> bool:
+    def verificar_disponibilidad(self, id_psicologo: int, fecha: date, hora,
+                                 duracion: int = None, excluir_cita: int = None) -> bool:
         """
-        Verifica si un psicólogo está disponible en una fecha y hora
+        Verifica si un psicólogo está libre durante [hora, hora + duracion)
+        Solo una cita que empieza menos de CITAS_CONFIG['duracion_maxima']
+        minutos antes puede traslaparse, así la búsqueda es un rango de hora
+        sobre IX_CITAS_Psicologo (IDpsicologo, fecha, hora) y no crece con
+        la agenda
         Args:
             id_psicologo: ID del psicólogo
             fecha: Fecha de la cita
-            hora: Hora de la cita
+            hora: Hora de inicio de la cita
+            duracion: Minutos que dura (por defecto CITAS_CONFIG['duracion_default'])
+            excluir_cita: ID de una cita que no cuenta (la que se está editando)
         Returns:
             bool: True si está disponible
         """
         try:
-            query = """
-            SELECT COUNT(*) FROM CITAS 
-            WHERE IDpsicologo = ? AND fecha = ? AND hora = ? 
-            AND estado != 'Cancelada'
-            """
-            resultado = self.db.ejecutar_consulta_una(query, (id_psicologo, fecha, hora))
+            traslape, parametros = self._condicion_traslape(
+                id_psicologo, fecha, hora, duracion or CITAS_CONFIG['duracion_default'])
+            query = f"SELECT COUNT(*) FROM CITAS WHERE {traslape}"
+            if excluir_cita:
+                query += " AND IDcita != ?"
+                parametros += (excluir_cita,)
+                
+            resultado = self.db.ejecutar_consulta_una(query, parametros)
             return resultado[0] == 0 if resultado else True
             
         except Exception as e:
             print(f"Error al verificar disponibilidad: {e}")
             return False
     
+    def _condicion_traslape(self, id_psicologo: int, fecha: date, hora, duracion: int) -> tuple:
+        """
+        Condición WHERE de las citas activas que se traslapan con [hora, hora + duracion)
+        Returns:
+            tuple: (condicion: str, parametros: tuple)
+        """
+        inicio, fin = intervalo_cita(fecha, hora, duracion)
+        desde = max(inicio - timedelta(minutes=CITAS_CONFIG['duracion_maxima']),
+                    datetime.combine(fecha, time.min))
+        hasta = fin.time() if fin.date() == fecha else time.max
+        
+        # Rango sobre el índice y, dentro de él, las que terminan después del inicio
+        condicion = f"""
+            IDpsicologo = ? AND fecha = ? AND hora >= ? AND hora < ?
+            AND estado != 'Cancelada'
+            AND {self.db.dialecto.minutos('hora')} + duracion > ?
+        """
+        return condicion, (id_psicologo, fecha, desde.time(), hasta, _minutos(inicio.time()))
+    
+    def buscar_horarios_libres(self, id_psicologo: int = None, especialidad: str = None,
+                               desde: date = None, hasta: date = None,
+                               duracion: int = None, limite: int = None) -> list:
+        """
+        Busca horarios en los que se puede agendar una cita
+        Cada día de cada psicólogo se representa como un entero donde el bit i
+        es el intervalo i del día (CITAS_CONFIG['intervalo_citas'] minutos):
+        su horario de atención menos las citas ya agendadas. Todo sale de dos
+        consultas (plantillas y citas del rango), sin consultar hora por hora
+        Args:
+            id_psicologo: Buscar solo en la agenda de este psicólogo
+            especialidad: Buscar entre los psicólogos de esta especialidad
+                (sin ninguno de los dos se busca en todos)
+            desde: Primer día (por defecto hoy)
+            hasta: Último día (por defecto CITAS_CONFIG['dias_anticipacion'] días después)
+            duracion: Minutos que debe durar la cita (por defecto duracion_default)
+            limite: Número máximo de horarios a devolver
+        Returns:
+            list: Lista de HorarioLibre ordenada por fecha, hora y psicólogo
+        """
+        try:
+            ahora = datetime.now()
+            desde = desde or ahora.date()
+            hasta = hasta or desde + timedelta(days=CITAS_CONFIG['dias_anticipacion'])
+            intervalo = CITAS_CONFIG['intervalo_citas']
+            necesarios = -(-(duracion or CITAS_CONFIG['duracion_default']) // intervalo)
+            
+            if id_psicologo:
+                filtro, parametros = "p.IDpsicologo = ?", [id_psicologo]
+            elif especialidad:
+                filtro, parametros = "p.especialidad = ?", [especialidad]
+            else:
+                filtro, parametros = "1=1", []
+                
+            plantillas, nombres = self._plantillas_horario(filtro, parametros, intervalo)
+            if not plantillas:
+                return []
+                
+            # Intervalos ocupados por día: (id_psicologo, fecha) -> máscara
+            ocupados = {}
+            query = f"""
+            SELECT c.IDpsicologo, c.fecha, c.hora, c.duracion
+            FROM CITAS c
+            INNER JOIN PSICOLOGOS p ON c.IDpsicologo = p.IDpsicologo
+            WHERE {filtro} AND c.fecha >= ? AND c.fecha <= ? AND c.estado != 'Cancelada'
+            """
+            for id_cita_psicologo, fecha, hora, duracion_cita in self.db.ejecutar_consulta(
+                    query, tuple(parametros + [desde, hasta])):
+                inicio = _minutos(hora)
+                fin = min(inicio + duracion_cita, 24 * 60)
+                clave = (id_cita_psicologo, fecha)
+                ocupados[clave] = ocupados.get(clave, 0) | _bits(inicio // intervalo, -(-fin // intervalo))
+                
+            libres = []
+            fecha = desde
+            while fecha <= hasta and (not limite or len(libres) < limite):
+                del_dia = []
+                for id_libre, semana in plantillas.items():
+                    disponibles = semana[fecha.weekday()] & ~ocupados.get((id_libre, fecha), 0)
+                    if fecha == ahora.date():
+                        # Hoy solo cuentan los intervalos que aún no empiezan
+                        disponibles &= ~_bits(0, -(-_minutos(ahora.time()) // intervalo))
+                        
+                    # Bit i queda encendido si los intervalos i..i+necesarios-1 están libres
+                    inicios = disponibles
+                    for desplazamiento in range(1, necesarios):
+                        inicios &= disponibles >> desplazamiento
+                        
+                    while inicios:
+                        bit = inicios & -inicios
+                        minutos = (bit.bit_length() - 1) * intervalo
+                        del_dia.append(HorarioLibre(fecha, time(minutos // 60, minutos % 60),
+                                                    id_libre, nombres[id_libre]))
+                        inicios ^= bit
+                        
+                del_dia.sort(key=lambda libre: (libre.hora, libre.nombre_psicologo))
+                libres.extend(del_dia)
+                fecha += timedelta(days=1)
+                
+            return libres[:limite] if limite else libres
+            
+        except Exception as e:
+            print(f"Error al buscar horarios libres: {e}")
+            return []
+    
+    def _plantillas_horario(self, filtro: str, parametros: list, intervalo: int) -> tuple:
+        """
+        Máscaras del horario de atención de cada psicólogo por día de la semana
+        Los psicólogos sin bloques en HORARIOS usan el horario de CITAS_CONFIG
+        Returns:
+            tuple: ({id_psicologo: [máscara lunes, ..., máscara domingo]},
+                    {id_psicologo: nombre})
+        """
+        query = f"""
+        SELECT p.IDpsicologo, u.nombre, h.dia_semana, h.hora_inicio, h.hora_fin
+        FROM PSICOLOGOS p
+        INNER JOIN USUARIO u ON p.IDusuario = u.IDusuario
+        LEFT JOIN HORARIOS h ON h.IDpsicologo = p.IDpsicologo
+        WHERE {filtro}
+        """
+        inicio = _minutos(convertir_hora(CITAS_CONFIG['horario_inicio']))
+        fin = _minutos(convertir_hora(CITAS_CONFIG['horario_fin']))
+        por_defecto = _bits(-(-inicio // intervalo), fin // intervalo)
+        
+        plantillas = {}
+        nombres = {}
+        for id_psicologo, nombre, dia_semana, hora_inicio, hora_fin in self.db.ejecutar_consulta(
+                query, tuple(parametros) or None):
+            nombres[id_psicologo] = nombre
+            if dia_semana is None:
+                plantillas[id_psicologo] = [por_defecto if dia in CITAS_CONFIG['dias_atencion'] else 0
+                                            for dia in range(7)]
+                continue
+                
+            semana = plantillas.setdefault(id_psicologo, [0] * 7)
+            semana[dia_semana] |= _bits(-(-_minutos(hora_inicio) // intervalo),
+                                        _minutos(hora_fin) // intervalo)
+        return plantillas, nombres
+    
     def obtener_citas_del_dia(self, fecha: date = None) -> list:
         """
         Obtiene las citas de un día específico
@@ -293,23 +687,23 @@ class CitaController:
         
         return self.listar_citas(fecha_inicio=fecha, fecha_fin=fecha)
     
-    def contar_citas(self, estado: str = None) -> int:
+    def contar_citas(self, estado: str = None, fecha_inicio: date = None, fecha_fin: date = None,
+                     id_psicologo: int = None) -> int:
         """
         Cuenta el número de citas
+        Se suma el resumen diario (RESUMEN_CITAS), no la tabla CITAS
         Args:
             estado: Filtrar por estado (opcional)
+            fecha_inicio: Primer día (opcional)
+            fecha_fin: Último día (opcional)
+            id_psicologo: Filtrar por psicólogo (opcional)
         Returns:
             int: Número de citas
         """
         try:
-            if estado:
-                query = "SELECT COUNT(*) FROM CITAS WHERE estado = ?"
-                resultado = self.db.ejecutar_consulta_una(query, (estado,))
-            else:
-                query = "SELECT COUNT(*) FROM CITAS"
-                resultado = self.db.ejecutar_consulta_una(query)
-            
-            return resultado[0] if resultado else 0
+            totales = self.resumen.totales_citas(fecha_inicio, fecha_fin, id_psicologo=id_psicologo,
+                                                 estado=estado)
+            return int(totales[0].citas or 0) if totales else 0
             
         except Exception as e:
             print(f"Error al contar citas: {e}")
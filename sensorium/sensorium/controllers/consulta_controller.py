@@ -7,6 +7,25 @@ Controlador para gestionar consultas
 
 from config.database import db
 from models.consulta import Consulta
+from utiles.busqueda import palabras_de
+from utiles.helpers import condicion_despues_de
+
+# Consultas con los datos de su cita (alias = atributo de Consulta)
+COLUMNAS_CONSULTAS = """
+co.*, c.fecha AS fecha_cita, c.hora AS hora_cita,
+       pac.nombre AS nombre_paciente, u.nombre AS nombre_psicologo
+"""
+FROM_CONSULTAS = """
+FROM CONSULTAS co
+INNER JOIN CITAS c ON co.IDcita = c.IDcita
+INNER JOIN PACIENTES pac ON c.IDpaciente = pac.IDpaciente
+INNER JOIN PSICOLOGOS ps ON c.IDpsicologo = ps.IDpsicologo
+INNER JOIN USUARIO u ON ps.IDusuario = u.IDusuario
+"""
+SELECT_CONSULTAS = "SELECT" + COLUMNAS_CONSULTAS + FROM_CONSULTAS
+
+# Columnas del índice de texto completo (TEXTO COMPLETO en init_db.sql)
+COLUMNAS_TEXTO = ['notas', 'diagnostico', 'recomend']
 
 class ConsultaController:
     """Controlador para operaciones CRUD de consultas"""
@@ -40,8 +59,8 @@ class ConsultaController:
                 consulta.recomend
             )
             
-            if self.db.ejecutar_query(query, parametros):
-                id_insertado = self.db.obtener_ultimo_id()
+            id_insertado = self.db.insertar_retornando_id(query, parametros, 'IDconsulta')
+            if id_insertado:
                 return True, "Consulta registrada exitosamente", id_insertado
             else:
                 return False, "Error al registrar consulta", None
@@ -54,31 +73,8 @@ class ConsultaController:
         Obtiene una consulta por su ID con datos completos
         """
         try:
-            query = """
-            SELECT co.*, c.fecha, pac.nombre, u.nombre
-            FROM CONSULTAS co
-            INNER JOIN CITAS c ON co.IDcita = c.IDcita
-            INNER JOIN PACIENTES pac ON c.IDpaciente = pac.IDpaciente
-            INNER JOIN PSICOLOGOS ps ON c.IDpsicologo = ps.IDpsicologo
-            INNER JOIN USUARIO u ON ps.IDusuario = u.IDusuario
-            WHERE co.IDconsulta = ?
-            """
-            resultado = self.db.ejecutar_consulta_una(query, (id_consulta,))
-            
-            if resultado:
-                consulta = Consulta(
-                    id_consulta=resultado[0],
-                    id_cita=resultado[1],
-                    notas=resultado[2],
-                    duracion=resultado[3],
-                    diagnostico=resultado[4],
-                    recomend=resultado[5]
-                )
-                consulta.fecha_cita = resultado[6]
-                consulta.nombre_paciente = resultado[7]
-                consulta.nombre_psicologo = resultado[8]
-                return consulta
-            return None
+            query = SELECT_CONSULTAS + " WHERE co.IDconsulta = ?"
+            return self.db.ejecutar_consulta_una(query, (id_consulta,), modelo=Consulta)
             
         except Exception as e:
             print(f"Error al obtener consulta: {e}")
@@ -87,82 +83,135 @@ class ConsultaController:
     def obtener_consulta_por_cita(self, id_cita: int) -> Consulta:
         """Obtiene la consulta asociada a una cita"""
         try:
-            query = """
-            SELECT co.*, c.fecha, pac.nombre, u.nombre
-            FROM CONSULTAS co
-            INNER JOIN CITAS c ON co.IDcita = c.IDcita
-            INNER JOIN PACIENTES pac ON c.IDpaciente = pac.IDpaciente
-            INNER JOIN PSICOLOGOS ps ON c.IDpsicologo = ps.IDpsicologo
-            INNER JOIN USUARIO u ON ps.IDusuario = u.IDusuario
-            WHERE co.IDcita = ?
-            """
-            resultado = self.db.ejecutar_consulta_una(query, (id_cita,))
-            
-            if resultado:
-                consulta = Consulta(
-                    id_consulta=resultado[0],
-                    id_cita=resultado[1],
-                    notas=resultado[2],
-                    duracion=resultado[3],
-                    diagnostico=resultado[4],
-                    recomend=resultado[5]
-                )
-                consulta.fecha_cita = resultado[6]
-                consulta.nombre_paciente = resultado[7]
-                consulta.nombre_psicologo = resultado[8]
-                return consulta
-            return None
+            query = SELECT_CONSULTAS + " WHERE co.IDcita = ?"
+            return self.db.ejecutar_consulta_una(query, (id_cita,), modelo=Consulta)
             
         except Exception as e:
             print(f"Error al obtener consulta: {e}")
             return None
     
-    def listar_consultas(self, id_paciente: int = None, id_psicologo: int = None) -> list:
-        """Lista todas las consultas o filtra por paciente/psicólogo"""
+    def listar_consultas(self, id_paciente: int = None, id_psicologo: int = None,
+                         despues_de: tuple = None, limite: int = None) -> list:
+        """
+        Lista todas las consultas o filtra por paciente/psicólogo
+        Paginación: despues_de=(fecha_cita, hora_cita, id_cita) de la última
+        consulta de la página anterior y limite=tamaño de página
+        """
         try:
-            query = """
-            SELECT co.*, c.fecha, pac.nombre, u.nombre
-            FROM CONSULTAS co
-            INNER JOIN CITAS c ON co.IDcita = c.IDcita
-            INNER JOIN PACIENTES pac ON c.IDpaciente = pac.IDpaciente
-            INNER JOIN PSICOLOGOS ps ON c.IDpsicologo = ps.IDpsicologo
-            INNER JOIN USUARIO u ON ps.IDusuario = u.IDusuario
-            WHERE 1=1
-            """
-            parametros = []
+            return list(self.iter_consultas(id_paciente, id_psicologo,
+                                            despues_de=despues_de, limite=limite))
             
-            if id_paciente:
-                query += " AND c.IDpaciente = ?"
-                parametros.append(id_paciente)
+        except Exception as e:
+            print(f"Error al listar consultas: {e}")
+            return []
+    
+    def iter_consultas(self, id_paciente: int = None, id_psicologo: int = None,
+                       despues_de: tuple = None, limite: int = None, arraysize: int = 500):
+        """Recorre las consultas por bloques sin cargarlas todas en memoria"""
+        query, parametros = self._query_consultas(id_paciente, id_psicologo, despues_de, limite)
+        yield from self.db.ejecutar_consulta_iter(query, parametros, arraysize, modelo=Consulta)
+    
+    def buscar_texto(self, consulta: str, id_psicologo: int = None,
+                     despues_de: tuple = None, limite: int = None) -> list:
+        """
+        Busca consultas por palabras de sus notas, diagnóstico o recomendaciones
+        Cada palabra escrita debe aparecer como inicio de alguna palabra del
+        texto (sin importar acentos ni mayúsculas); se usa el índice de texto
+        completo, no se recorre la tabla
+        Paginación: despues_de=(relevancia, id_consulta) de la última consulta
+        de la página anterior y limite=tamaño de página
+        Args:
+            consulta: Texto escrito por el usuario
+            id_psicologo: Solo las consultas de este psicólogo (un usuario con
+                          rol psicólogo solo puede ver las suyas)
+            despues_de: Clave de la última consulta de la página anterior
+            limite: Número máximo de resultados
+        Returns:
+            list: Consultas de la más a la menos relevante (atributo relevancia)
+        """
+        try:
+            terminos = palabras_de(consulta)
+            if not terminos:
+                return []
+                
+            dialecto = self.db.dialecto
+            union, relevancia = dialecto.unir_texto_completo('CONSULTAS', 'co', 'IDconsulta',
+                                                             COLUMNAS_TEXTO)
+            query = (f"SELECT{COLUMNAS_CONSULTAS}, {relevancia} AS relevancia"
+                     f"{FROM_CONSULTAS}{union} WHERE 1=1")
+            parametros = [dialecto.texto_completo(terminos)]
             
             if id_psicologo:
                 query += " AND c.IDpsicologo = ?"
                 parametros.append(id_psicologo)
+                
+            if despues_de:
+                condicion, valores = condicion_despues_de([relevancia, 'co.IDconsulta'],
+                                                          despues_de, descendente=True)
+                query += f" AND {condicion}"
+                parametros.extend(valores)
+                
+            query += f" ORDER BY {relevancia} DESC, co.IDconsulta DESC"
             
-            query += " ORDER BY c.fecha DESC"
+            if limite:
+                query = dialecto.limitar(query, limite)
+                
+            return self.db.ejecutar_consulta(query, tuple(parametros), modelo=Consulta)
             
-            resultados = self.db.ejecutar_consulta(query, tuple(parametros) if parametros else None)
+        except Exception as e:
+            print(f"Error al buscar consultas: {e}")
+            return []
+    
+    def listar_consultas_cambios(self, desde_version: int, id_paciente: int = None,
+                                 id_psicologo: int = None):
+        """
+        Consultas que cambiaron desde una versión, con los filtros de listar_consultas
+        También se envían las consultas cuya cita cambió (fecha u hora mostradas)
+        Returns:
+            Cambios: (actualizados, eliminados, version) o None si hubo error
+        """
+        try:
+            query, parametros = self._query_consultas(id_paciente, id_psicologo,
+                                                      desde_version=desde_version)
+            return self.db.obtener_cambios(query, parametros, Consulta, 'CONSULTAS', 'IDconsulta',
+                                           desde_version)
+                                           
+        except Exception as e:
+            print(f"Error al obtener cambios de consultas: {e}")
+            return None
+    
+    def _query_consultas(self, id_paciente: int, id_psicologo: int, despues_de: tuple = None,
+                         limite: int = None, desde_version: int = None) -> tuple:
+        """Arma el SELECT de listar_consultas / iter_consultas / listar_consultas_cambios"""
+        query = SELECT_CONSULTAS + " WHERE 1=1"
+        parametros = []
+        
+        if id_paciente:
+            query += " AND c.IDpaciente = ?"
+            parametros.append(id_paciente)
             
-            consultas = []
-            for resultado in resultados:
-                consulta = Consulta(
-                    id_consulta=resultado[0],
-                    id_cita=resultado[1],
-                    notas=resultado[2],
-                    duracion=resultado[3],
-                    diagnostico=resultado[4],
-                    recomend=resultado[5]
-                )
-                consulta.fecha_cita = resultado[6]
-                consulta.nombre_paciente = resultado[7]
-                consulta.nombre_psicologo = resultado[8]
-                consultas.append(consulta)
+        if id_psicologo:
+            query += " AND c.IDpsicologo = ?"
+            parametros.append(id_psicologo)
             
-            return consultas
+        if desde_version is not None:
+            dialecto = self.db.dialecto
+            query += f" AND ({dialecto.version_mayor('co.version')} OR {dialecto.version_mayor('c.version')})"
+            parametros.extend([desde_version, desde_version])
             
-        except Exception as e:
-            print(f"Error al listar consultas: {e}")
-            return []
+        # Cada cita tiene a lo sumo una consulta: se pagina por el índice de CITAS
+        if despues_de:
+            condicion, valores = condicion_despues_de(['c.fecha', 'c.hora', 'c.IDcita'],
+                                                      despues_de, descendente=True)
+            query += f" AND {condicion}"
+            parametros.extend(valores)
+            
+        query += " ORDER BY c.fecha DESC, c.hora DESC, c.IDcita DESC"
+        
+        if limite:
+            query = self.db.dialecto.limitar(query, limite)
+        
+        return query, tuple(parametros) if parametros else None
     
     def actualizar_consulta(self, consulta: Consulta) -> tuple:
         """Actualiza los datos de una consulta"""
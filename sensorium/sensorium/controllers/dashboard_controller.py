@@ -0,0 +1,103 @@
+# ====================================================================================
+# controllers/dashboard_controller.py
+# ====================================================================================
+"""
+Controlador de las estadísticas del panel principal
+Todos los indicadores salen de una sola consulta agregada; los de citas y
+pagos se leen de los resúmenes diarios (ver ResumenController). Ponerse al
+día con los cambios anotados en RESUMEN_PENDIENTES no es parte de esa
+lectura: se hace aparte, en segundo plano (actualizar_resumen)
+"""
+
+import threading
+import time
+from collections import namedtuple
+from datetime import date
+from config.database import db
+from config.settings import DASHBOARD_CONFIG
+from controllers.resumen_controller import ResumenController
+
+# pendiente: hay días sin recalcular, los totales de citas y pagos pueden estar atrasados
+ResumenDashboard = namedtuple('ResumenDashboard', [
+    'pacientes', 'psicologos', 'citas_programadas', 'citas_hoy',
+    'ingresos_hoy', 'pagos_pendientes', 'monto_pendiente', 'pendiente'
+])
+
+RESUMEN_VACIO = ResumenDashboard(0, 0, 0, 0, 0, 0, 0, False)
+
+# La última columna indica si hay días sin recalcular en los resúmenes
+SELECT_RESUMEN = """
+SELECT
+    (SELECT COUNT(*) FROM PACIENTES) AS pacientes,
+    (SELECT COUNT(*) FROM PSICOLOGOS) AS psicologos,
+    (SELECT COALESCE(SUM(citas), 0) FROM RESUMEN_CITAS WHERE estado = 'Programada') AS citas_programadas,
+    (SELECT COALESCE(SUM(citas), 0) FROM RESUMEN_CITAS WHERE fecha = ?) AS citas_hoy,
+    (SELECT COALESCE(SUM(monto), 0) FROM RESUMEN_PAGOS WHERE fecha = ? AND estatus_pago = 'Pagado') AS ingresos_hoy,
+    (SELECT COALESCE(SUM(pagos), 0) FROM RESUMEN_PAGOS WHERE estatus_pago = 'Pendiente') AS pagos_pendientes,
+    (SELECT COALESCE(SUM(monto), 0) FROM RESUMEN_PAGOS WHERE estatus_pago = 'Pendiente') AS monto_pendiente,
+    (SELECT MAX(IDpendiente) FROM RESUMEN_PENDIENTES) AS pendiente
+"""
+
+# Último resumen leído: (expira, fecha, ResumenDashboard)
+_memo = None
+_lock_memo = threading.Lock()
+
+
+class DashboardController:
+    """Indicadores del panel principal"""
+    
+    def __init__(self):
+        self.db = db
+        self.resumen = ResumenController()
+    
+    def obtener_resumen(self, fecha: date = None, forzar: bool = False) -> ResumenDashboard:
+        """
+        Obtiene todos los indicadores del panel en una consulta
+        El resultado se reutiliza durante DASHBOARD_CONFIG['ttl_resumen'] segundos.
+        Si hay días sin recalcular se devuelve igual (con pendiente=True): los
+        resúmenes se ponen al día aparte con actualizar_resumen
+        Args:
+            fecha: Día de "citas hoy" e "ingresos hoy" (por defecto hoy)
+            forzar: Leer de la base de datos aunque haya un resultado vigente
+        Returns:
+            ResumenDashboard: Indicadores (en cero si hubo error)
+        """
+        global _memo
+        fecha = fecha or date.today()
+        
+        with _lock_memo:
+            if not forzar and _memo and _memo[0] > time.monotonic() and _memo[1] == fecha:
+                return _memo[2]
+                
+        try:
+            fila = self.db.ejecutar_consulta_una(SELECT_RESUMEN, (fecha, fecha))
+            if not fila:
+                return RESUMEN_VACIO
+                
+            resumen = ResumenDashboard(*fila[:-1], fila[-1] is not None)
+            with _lock_memo:
+                _memo = (time.monotonic() + DASHBOARD_CONFIG.get('ttl_resumen', 15), fecha, resumen)
+            return resumen
+            
+        except Exception as e:
+            print(f"Error al obtener resumen del panel: {e}")
+            return RESUMEN_VACIO
+    
+    def actualizar_resumen(self, fecha: date = None) -> ResumenDashboard:
+        """
+        Recalcula los días pendientes de los resúmenes y vuelve a leer los indicadores
+        Es lento comparado con obtener_resumen: se ejecuta en segundo plano
+        cuando el resumen mostrado llegó con pendiente=True
+        Args:
+            fecha: Día de "citas hoy" e "ingresos hoy" (por defecto hoy)
+        Returns:
+            ResumenDashboard: Indicadores al día
+        """
+        self.resumen.actualizar_resumenes()
+        return self.obtener_resumen(fecha, forzar=True)
+    
+    def invalidar_resumen(self):
+        """Descarta el resumen guardado (la siguiente lectura va a la base de datos)"""
+        global _memo
+        with _lock_memo:
+            _memo = None
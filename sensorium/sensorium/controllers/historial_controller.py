@@ -34,8 +34,8 @@ class HistorialController:
                 historial.fecha_creacion or datetime.now().date()
             )
             
-            if self.db.ejecutar_query(query, parametros):
-                id_insertado = self.db.obtener_ultimo_id()
+            id_insertado = self.db.insertar_retornando_id(query, parametros, 'IDhistorial')
+            if id_insertado:
                 return True, "Historial creado exitosamente", id_insertado
             else:
                 return False, "Error al crear historial", None
@@ -47,25 +47,12 @@ class HistorialController:
         """Obtiene el historial de un paciente"""
         try:
             query = """
-            SELECT h.*, p.nombre
+            SELECT h.*, p.nombre AS nombre_paciente
             FROM HISTORIAL h
             INNER JOIN PACIENTES p ON h.IDpaciente = p.IDpaciente
             WHERE h.IDpaciente = ?
             """
-            resultado = self.db.ejecutar_consulta_una(query, (id_paciente,))
-            
-            if resultado:
-                historial = Historial(
-                    id_historial=resultado[0],
-                    id_paciente=resultado[1],
-                    antecedentes=resultado[2],
-                    alergias=resultado[3],
-                    tratamientos=resultado[4],
-                    fecha_creacion=resultado[5]
-                )
-                historial.nombre_paciente = resultado[6]
-                return historial
-            return None
+            return self.db.ejecutar_consulta_una(query, (id_paciente,), modelo=Historial)
             
         except Exception as e:
             print(f"Error al obtener historial: {e}")
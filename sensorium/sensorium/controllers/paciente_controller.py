@@ -2,9 +2,20 @@
 Controlador para gestionar pacientes
 """
 
+import threading
+import time
 from config.database import db
+from config.settings import BUSQUEDA_CONFIG
 from models.paciente import Paciente
 from datetime import datetime
+from utiles.busqueda import IndiceBusqueda
+from utiles.helpers import condicion_despues_de, normalizar_texto, parece_telefono, solo_digitos
+
+# Índice de búsqueda compartido por todos los controladores de pacientes
+# (se llena con la primera búsqueda y se mantiene con cada alta, cambio o baja)
+_indice = IndiceBusqueda(lambda p: (p.nombre, (p.correo, solo_digitos(p.telefono))),
+                         BUSQUEDA_CONFIG['resultados_maximos'])
+_lock_indice = threading.Lock()
 
 class PacienteController:
     """Controlador para operaciones CRUD de pacientes"""
@@ -38,8 +49,11 @@ class PacienteController:
                 paciente.fecha_regist or datetime.now().date()
             )
             
-            if self.db.ejecutar_query(query, parametros):
-                id_insertado = self.db.obtener_ultimo_id()
+            id_insertado = self.db.insertar_retornando_id(query, parametros, 'IDpaciente')
+            if id_insertado:
+                paciente.id_paciente = id_insertado
+                if _indice.cargado:
+                    _indice.agregar(id_insertado, paciente)
                 return True, "Paciente registrado exitosamente", id_insertado
             else:
                 return False, "Error al registrar paciente", None
@@ -47,6 +61,53 @@ class PacienteController:
         except Exception as e:
             return False, f"Error: {str(e)}", None
     
+    def importar_pacientes(self, pacientes: list) -> tuple:
+        """
+        Registra una lista de pacientes con inserciones por lotes
+        Los pacientes con datos inválidos se omiten
+        Args:
+            pacientes: Lista de objetos Paciente
+        Returns:
+            tuple: (exito: bool, mensaje: str, cantidad: int)
+        """
+        try:
+            hoy = datetime.now().date()
+            filas = []
+            omitidos = 0
+            
+            for paciente in pacientes:
+                es_valido, _ = paciente.validar_datos()
+                if not es_valido:
+                    omitidos += 1
+                    continue
+                filas.append((
+                    paciente.nombre,
+                    paciente.correo,
+                    paciente.telefono,
+                    paciente.direccion,
+                    paciente.fecha_regist or hoy
+                ))
+                
+            query = """
+            INSERT INTO PACIENTES (nombre, correo, telefono, direccion, fecha_regist)
+            VALUES (?, ?, ?, ?, ?)
+            """
+            
+            importados = self.db.ejecutar_lote(query, filas)
+            if importados:
+                self._sincronizar_indice(forzar=True)
+            mensaje = f"{importados} pacientes importados"
+            if omitidos:
+                mensaje += f", {omitidos} omitidos por datos inválidos"
+                
+            if importados == len(filas):
+                return True, mensaje, importados
+            else:
+                return False, f"Error al importar pacientes: {mensaje}", importados
+                
+        except Exception as e:
+            return False, f"Error: {str(e)}", 0
+    
     def obtener_paciente_por_id(self, id_paciente: int) -> Paciente:
         """
         Obtiene un paciente por su ID
@@ -57,61 +118,152 @@ class PacienteController:
         """
         try:
             query = "SELECT * FROM PACIENTES WHERE IDpaciente = ?"
-            resultado = self.db.ejecutar_consulta_una(query, (id_paciente,))
-            
-            if resultado:
-                return Paciente(
-                    id_paciente=resultado[0],
-                    nombre=resultado[1],
-                    correo=resultado[2],
-                    telefono=resultado[3],
-                    direccion=resultado[4],
-                    fecha_regist=resultado[5]
-                )
-            return None
+            return self.db.ejecutar_consulta_una(query, (id_paciente,), modelo=Paciente)
             
         except Exception as e:
             print(f"Error al obtener paciente: {e}")
             return None
     
-    def listar_pacientes(self, buscar: str = None) -> list:
+    def listar_pacientes(self, buscar: str = None, despues_de: tuple = None,
+                         limite: int = None, cache: bool = True) -> list:
         """
         Lista todos los pacientes o busca por nombre
         Args:
-            buscar: Texto para buscar en nombre (opcional)
+            buscar: Inicio del nombre, correo o teléfono (sin importar acentos ni mayúsculas)
+            despues_de: (nombre, id_paciente) del último paciente de la página
+                anterior; None para la primera página
+            limite: Número máximo de pacientes (tamaño de página)
+            cache: Reutilizar un resultado reciente; False para las páginas que se
+                sincronizan por versión (SincronizadorTabla), que deben leerse
+                después de la versión y no antes
         Returns:
             list: Lista de objetos Paciente
         """
         try:
-            if buscar:
-                query = """
-                SELECT * FROM PACIENTES 
-                WHERE nombre LIKE ? OR telefono LIKE ?
-                ORDER BY nombre
-                """
-                parametro = f"%{buscar}%"
-                resultados = self.db.ejecutar_consulta(query, (parametro, parametro))
-            else:
-                query = "SELECT * FROM PACIENTES ORDER BY nombre"
-                resultados = self.db.ejecutar_consulta(query)
-            
-            pacientes = []
-            for resultado in resultados:
-                pacientes.append(Paciente(
-                    id_paciente=resultado[0],
-                    nombre=resultado[1],
-                    correo=resultado[2],
-                    telefono=resultado[3],
-                    direccion=resultado[4],
-                    fecha_regist=resultado[5]
-                ))
-            
-            return pacientes
+            query, parametros = self._query_pacientes(buscar, despues_de, limite)
+            return self.db.ejecutar_consulta(query, parametros, modelo=Paciente, cache=cache)
             
         except Exception as e:
             print(f"Error al listar pacientes: {e}")
             return []
     
+    def iter_pacientes(self, buscar: str = None, despues_de: tuple = None,
+                       limite: int = None, arraysize: int = 500):
+        """
+        Recorre los pacientes por bloques sin cargarlos todos en memoria
+        Args:
+            buscar: Inicio del nombre, correo o teléfono (opcional)
+            despues_de: Clave (nombre, id_paciente) donde continuar
+            limite: Número máximo de pacientes
+            arraysize: Filas que se leen de la base de datos por bloque
+        Yields:
+            Paciente: Cada paciente ordenado por nombre
+        """
+        query, parametros = self._query_pacientes(buscar, despues_de, limite)
+        yield from self.db.ejecutar_consulta_iter(query, parametros, arraysize, modelo=Paciente)
+    
+    def buscar_pacientes(self, texto: str, limite: int = None, entre: list = None) -> list:
+        """
+        Búsqueda mientras se escribe por nombre, teléfono o correo
+        Usa el índice en memoria en lugar de LIKE '%texto%' (que recorre toda la
+        tabla): no importan acentos ni mayúsculas y cada palabra escrita puede
+        ser el inicio de una palabra del paciente ('mar gonz' -> María González)
+        Args:
+            texto: Texto escrito por el usuario
+            limite: Número máximo de resultados (BUSQUEDA_CONFIG por defecto)
+            entre: IDs del resultado completo de una búsqueda que esta refina
+                   (ver es_refinamiento); se filtra solo entre ellos, sin
+                   consultar cambios en la base de datos
+        Returns:
+            list: Pacientes del más al menos parecido (no deben modificarse)
+        """
+        try:
+            if entre is None:
+                self._sincronizar_indice()
+            return _indice.buscar(texto, limite or BUSQUEDA_CONFIG['resultados_maximos'], entre)
+            
+        except Exception as e:
+            print(f"Error al buscar pacientes: {e}")
+            return []
+    
+    def precargar_busqueda(self):
+        """Llena el índice de búsqueda en segundo plano (la carga recorre toda la tabla)"""
+        if not _indice.cargado:
+            threading.Thread(target=self._sincronizar_indice, daemon=True).start()
+    
+    def _sincronizar_indice(self, forzar: bool = False):
+        """
+        Carga el índice de búsqueda la primera vez; después aplica cada
+        BUSQUEDA_CONFIG['sincronizar_cada'] segundos los cambios hechos desde
+        otros equipos (o de inmediato con forzar)
+        """
+        if not _indice.cargado:
+            if forzar:
+                return  # Se cargará completo en la primera búsqueda
+            with _lock_indice:
+                if not _indice.cargado:
+                    version = self.db.version_datos()
+                    pacientes = self.db.ejecutar_consulta_iter("SELECT * FROM PACIENTES", modelo=Paciente)
+                    _indice.cargar(((p.id_paciente, p) for p in pacientes), version)
+            return
+            
+        vencido = time.monotonic() - _indice.sincronizado >= BUSQUEDA_CONFIG['sincronizar_cada']
+        if (forzar or vencido) and _indice.version is not None:
+            cambios = self.listar_pacientes_cambios(_indice.version)
+            if cambios is not None:
+                _indice.aplicar(((p.id_paciente, p) for p in cambios.actualizados),
+                                cambios.eliminados, cambios.version)
+    
+    def listar_pacientes_cambios(self, desde_version: int, buscar: str = None):
+        """
+        Pacientes que cambiaron desde una versión, con la búsqueda de listar_pacientes
+        Returns:
+            Cambios: (actualizados, eliminados, version) o None si hubo error
+        """
+        try:
+            query, parametros = self._query_pacientes(buscar, None, None, desde_version)
+            return self.db.obtener_cambios(query, parametros, Paciente, 'PACIENTES', 'IDpaciente',
+                                           desde_version)
+                                           
+        except Exception as e:
+            print(f"Error al obtener cambios de pacientes: {e}")
+            return None
+    
+    def _query_pacientes(self, buscar: str, despues_de: tuple, limite: int,
+                         desde_version: int = None) -> tuple:
+        """Arma el SELECT de listar_pacientes / iter_pacientes / listar_pacientes_cambios"""
+        query = "SELECT * FROM PACIENTES WHERE 1=1"
+        parametros = []
+        
+        # Búsqueda por prefijo sobre las columnas normalizadas (cada una con su índice)
+        if buscar:
+            if parece_telefono(buscar):
+                condiciones = [self.db.dialecto.empieza_con('telefono_busqueda', solo_digitos(buscar))]
+            else:
+                texto = normalizar_texto(buscar)
+                condiciones = [self.db.dialecto.empieza_con('nombre_busqueda', texto),
+                               self.db.dialecto.empieza_con('correo_busqueda', texto)]
+            query += " AND (" + " OR ".join(condicion for condicion, _ in condiciones) + ")"
+            for _, valores in condiciones:
+                parametros.extend(valores)
+            
+        if desde_version is not None:
+            query += f" AND {self.db.dialecto.version_mayor('version')}"
+            parametros.append(desde_version)
+            
+        # Paginación por clave sobre IX_PACIENTES_Nombre (nombre, IDpaciente)
+        if despues_de:
+            condicion, valores = condicion_despues_de(['nombre', 'IDpaciente'], despues_de)
+            query += f" AND {condicion}"
+            parametros.extend(valores)
+            
+        query += " ORDER BY nombre, IDpaciente"
+        
+        if limite:
+            query = self.db.dialecto.limitar(query, limite)
+            
+        return query, tuple(parametros) if parametros else None
+    
     def actualizar_paciente(self, paciente: Paciente) -> tuple:
         """
         Actualiza los datos de un paciente
@@ -140,6 +292,8 @@ class PacienteController:
             )
             
             if self.db.ejecutar_query(query, parametros):
+                if _indice.cargado:
+                    _indice.agregar(paciente.id_paciente, paciente)
                 return True, "Paciente actualizado exitosamente"
             else:
                 return False, "Error al actualizar paciente"
@@ -159,6 +313,7 @@ class PacienteController:
             query = "DELETE FROM PACIENTES WHERE IDpaciente = ?"
             
             if self.db.ejecutar_query(query, (id_paciente,)):
+                _indice.quitar(id_paciente)
                 return True, "Paciente eliminado exitosamente"
             else:
                 return False, "Error al eliminar paciente"
@@ -174,7 +329,7 @@ class PacienteController:
         """
         try:
             query = "SELECT COUNT(*) FROM PACIENTES"
-            resultado = self.db.ejecutar_consulta_una(query)
+            resultado = self.db.ejecutar_consulta_una(query, cache=True)
             return resultado[0] if resultado else 0
             
         except Exception as e:
@@ -190,24 +345,11 @@ class PacienteController:
             list: Lista de objetos Paciente
         """
         try:
-            query = """
-            SELECT TOP (?) * FROM PACIENTES 
+            query = self.db.dialecto.limitar("""
+            SELECT * FROM PACIENTES 
             ORDER BY fecha_regist DESC
-            """
-            resultados = self.db.ejecutar_consulta(query, (limite,))
-            
-            pacientes = []
-            for resultado in resultados:
-                pacientes.append(Paciente(
-                    id_paciente=resultado[0],
-                    nombre=resultado[1],
-                    correo=resultado[2],
-                    telefono=resultado[3],
-                    direccion=resultado[4],
-                    fecha_regist=resultado[5]
-                ))
-            
-            return pacientes
+            """, limite)
+            return self.db.ejecutar_consulta(query, modelo=Paciente)
             
         except Exception as e:
             print(f"Error al obtener pacientes recientes: {e}")
@@ -222,19 +364,9 @@ class PacienteController:
             Paciente: Objeto Paciente o None
         """
         try:
-            query = "SELECT * FROM PACIENTES WHERE telefono = ?"
-            resultado = self.db.ejecutar_consulta_una(query, (telefono,))
-            
-            if resultado:
-                return Paciente(
-                    id_paciente=resultado[0],
-                    nombre=resultado[1],
-                    correo=resultado[2],
-                    telefono=resultado[3],
-                    direccion=resultado[4],
-                    fecha_regist=resultado[5]
-                )
-            return None
+            # Se compara sin espacios ni guiones: '55 1234-5678' encuentra '5512345678'
+            query = "SELECT * FROM PACIENTES WHERE telefono_busqueda = ?"
+            return self.db.ejecutar_consulta_una(query, (solo_digitos(telefono),), modelo=Paciente)
             
         except Exception as e:
             print(f"Error al buscar paciente: {e}")
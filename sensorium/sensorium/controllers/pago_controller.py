@@ -7,13 +7,25 @@ Controlador para gestionar pagos
 
 from config.database import db
 from models.pago import Pago
+from controllers.resumen_controller import ResumenController
 from datetime import datetime
+from utiles.helpers import condicion_despues_de
+
+# Pagos con los datos de la consulta (alias = atributo de Pago)
+SELECT_PAGOS = """
+SELECT p.*, pac.nombre AS nombre_paciente, c.fecha AS fecha_consulta
+FROM PAGOS p
+INNER JOIN CONSULTAS co ON p.IDconsulta = co.IDconsulta
+INNER JOIN CITAS c ON co.IDcita = c.IDcita
+INNER JOIN PACIENTES pac ON c.IDpaciente = pac.IDpaciente
+"""
 
 class PagoController:
     """Controlador para operaciones CRUD de pagos"""
     
     def __init__(self):
         self.db = db
+        self.resumen = ResumenController()
     
     def crear_pago(self, pago: Pago) -> tuple:
         """Crea un nuevo pago en la base de datos"""
@@ -34,8 +46,8 @@ class PagoController:
                 pago.estatus_pago
             )
             
-            if self.db.ejecutar_query(query, parametros):
-                id_insertado = self.db.obtener_ultimo_id()
+            id_insertado = self.db.insertar_retornando_id(query, parametros, 'IDpago')
+            if id_insertado:
                 return True, "Pago registrado exitosamente", id_insertado
             else:
                 return False, "Error al registrar pago", None
@@ -46,75 +58,74 @@ class PagoController:
     def obtener_pago_por_id(self, id_pago: int) -> Pago:
         """Obtiene un pago por su ID"""
         try:
-            query = """
-            SELECT p.*, pac.nombre, c.fecha
-            FROM PAGOS p
-            INNER JOIN CONSULTAS co ON p.IDconsulta = co.IDconsulta
-            INNER JOIN CITAS c ON co.IDcita = c.IDcita
-            INNER JOIN PACIENTES pac ON c.IDpaciente = pac.IDpaciente
-            WHERE p.IDpago = ?
-            """
-            resultado = self.db.ejecutar_consulta_una(query, (id_pago,))
-            
-            if resultado:
-                pago = Pago(
-                    id_pago=resultado[0],
-                    id_consulta=resultado[1],
-                    monto=resultado[2],
-                    metodo=resultado[3],
-                    fecha_pago=resultado[4],
-                    estatus_pago=resultado[5]
-                )
-                pago.nombre_paciente = resultado[6]
-                pago.fecha_consulta = resultado[7]
-                return pago
-            return None
+            query = SELECT_PAGOS + " WHERE p.IDpago = ?"
+            return self.db.ejecutar_consulta_una(query, (id_pago,), modelo=Pago)
             
         except Exception as e:
             print(f"Error al obtener pago: {e}")
             return None
     
-    def listar_pagos(self, estatus: str = None) -> list:
-        """Lista todos los pagos o filtra por estatus"""
+    def listar_pagos(self, estatus: str = None, despues_de: tuple = None, limite: int = None) -> list:
+        """
+        Lista todos los pagos o filtra por estatus
+        Paginación: despues_de=(fecha_pago, id_pago) del último pago de la
+        página anterior y limite=tamaño de página
+        """
         try:
-            query = """
-            SELECT p.*, pac.nombre, c.fecha
-            FROM PAGOS p
-            INNER JOIN CONSULTAS co ON p.IDconsulta = co.IDconsulta
-            INNER JOIN CITAS c ON co.IDcita = c.IDcita
-            INNER JOIN PACIENTES pac ON c.IDpaciente = pac.IDpaciente
-            WHERE 1=1
-            """
-            parametros = []
-            
-            if estatus:
-                query += " AND p.estatus_pago = ?"
-                parametros.append(estatus)
-            
-            query += " ORDER BY p.fecha_pago DESC"
-            
-            resultados = self.db.ejecutar_consulta(query, tuple(parametros) if parametros else None)
-            
-            pagos = []
-            for resultado in resultados:
-                pago = Pago(
-                    id_pago=resultado[0],
-                    id_consulta=resultado[1],
-                    monto=resultado[2],
-                    metodo=resultado[3],
-                    fecha_pago=resultado[4],
-                    estatus_pago=resultado[5]
-                )
-                pago.nombre_paciente = resultado[6]
-                pago.fecha_consulta = resultado[7]
-                pagos.append(pago)
-            
-            return pagos
+            return list(self.iter_pagos(estatus, despues_de=despues_de, limite=limite))
             
         except Exception as e:
             print(f"Error al listar pagos: {e}")
             return []
     
+    def iter_pagos(self, estatus: str = None, despues_de: tuple = None,
+                   limite: int = None, arraysize: int = 500):
+        """Recorre los pagos por bloques sin cargarlos todos en memoria"""
+        query, parametros = self._query_pagos(estatus, despues_de, limite)
+        yield from self.db.ejecutar_consulta_iter(query, parametros, arraysize, modelo=Pago)
+    
+    def listar_pagos_cambios(self, desde_version: int, estatus: str = None):
+        """
+        Pagos que cambiaron desde una versión, con el filtro de listar_pagos
+        Returns:
+            Cambios: (actualizados, eliminados, version) o None si hubo error
+        """
+        try:
+            query, parametros = self._query_pagos(estatus, desde_version=desde_version)
+            return self.db.obtener_cambios(query, parametros, Pago, 'PAGOS', 'IDpago', desde_version)
+            
+        except Exception as e:
+            print(f"Error al obtener cambios de pagos: {e}")
+            return None
+    
+    def _query_pagos(self, estatus: str, despues_de: tuple = None, limite: int = None,
+                     desde_version: int = None) -> tuple:
+        """Arma el SELECT de listar_pagos / iter_pagos / listar_pagos_cambios y sus parámetros"""
+        query = SELECT_PAGOS + " WHERE 1=1"
+        parametros = []
+        
+        if estatus:
+            query += " AND p.estatus_pago = ?"
+            parametros.append(estatus)
+            
+        if desde_version is not None:
+            query += f" AND {self.db.dialecto.version_mayor('p.version')}"
+            parametros.append(desde_version)
+            
+        # Paginación por clave sobre IX_PAGOS_Fecha (fecha_pago, IDpago)
+        if despues_de:
+            condicion, valores = condicion_despues_de(['p.fecha_pago', 'p.IDpago'],
+                                                      despues_de, descendente=True)
+            query += f" AND {condicion}"
+            parametros.extend(valores)
+            
+        query += " ORDER BY p.fecha_pago DESC, p.IDpago DESC"
+        
+        if limite:
+            query = self.db.dialecto.limitar(query, limite)
+        
+        return query, tuple(parametros) if parametros else None
+    
     def actualizar_pago(self, pago: Pago) -> tuple:
         """Actualiza los datos de un pago"""
         try:
@@ -160,6 +171,26 @@ class PagoController:
         except Exception as e:
             return False, f"Error: {str(e)}"
     
+    def marcar_como_pagados(self, ids_pago: list) -> tuple:
+        """Marca varios pagos como completados en un solo lote"""
+        try:
+            query = """
+            UPDATE PAGOS 
+            SET estatus_pago = 'Pagado', fecha_pago = ?
+            WHERE IDpago = ?
+            """
+            hoy = datetime.now().date()
+            filas = [(hoy, id_pago) for id_pago in ids_pago]
+            
+            escritos = self.db.ejecutar_lote(query, filas)
+            if escritos == len(filas):
+                return True, f"{escritos} pagos marcados como pagados"
+            else:
+                return False, f"Error al marcar pagos ({escritos} de {len(filas)} actualizados)"
+                
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+    
     def eliminar_pago(self, id_pago: int) -> tuple:
         """Elimina un pago"""
         try:
@@ -173,25 +204,14 @@ class PagoController:
         except Exception as e:
             return False, f"Error: {str(e)}"
     
-    def obtener_total_ingresos(self, fecha_inicio=None, fecha_fin=None) -> float:
-        """Calcula el total de ingresos en un período"""
+    def obtener_total_ingresos(self, fecha_inicio=None, fecha_fin=None, id_psicologo: int = None) -> float:
+        """
+        Calcula el total de ingresos (pagos 'Pagado') en un período
+        Se suma el resumen diario (RESUMEN_PAGOS), no la tabla PAGOS
+        """
         try:
-            query = """
-            SELECT SUM(monto) FROM PAGOS 
-            WHERE estatus_pago = 'Pagado'
-            """
-            parametros = []
-            
-            if fecha_inicio:
-                query += " AND fecha_pago >= ?"
-                parametros.append(fecha_inicio)
-            
-            if fecha_fin:
-                query += " AND fecha_pago <= ?"
-                parametros.append(fecha_fin)
-            
-            resultado = self.db.ejecutar_consulta_una(query, tuple(parametros) if parametros else None)
-            return float(resultado[0]) if resultado and resultado[0] else 0.0
+            totales = self.resumen.totales_pagos(fecha_inicio, fecha_fin, id_psicologo=id_psicologo)
+            return float(totales[0].monto) if totales and totales[0].monto else 0.0
             
         except Exception as e:
             print(f"Error al calcular ingresos: {e}")
@@ -4,6 +4,15 @@ Controlador para gestionar psicólogos
 
 from config.database import db
 from models.psicologo import Psicologo
+from models.horario import Horario
+from utiles.helpers import convertir_hora, normalizar_cedula
+
+# Psicólogos con el nombre y correo de su usuario (alias = atributo de Psicologo)
+SELECT_PSICOLOGOS = """
+SELECT p.*, u.nombre, u.correo
+FROM PSICOLOGOS p
+INNER JOIN USUARIO u ON p.IDusuario = u.IDusuario
+"""
 
 class PsicologoController:
     """Controlador para operaciones CRUD de psicólogos"""
@@ -36,8 +45,8 @@ class PsicologoController:
                 psicologo.cedula
             )
             
-            if self.db.ejecutar_query(query, parametros):
-                id_insertado = self.db.obtener_ultimo_id()
+            id_insertado = self.db.insertar_retornando_id(query, parametros, 'IDpsicologo')
+            if id_insertado:
                 return True, "Psicólogo registrado exitosamente", id_insertado
             else:
                 return False, "Error al registrar psicólogo", None
@@ -54,26 +63,8 @@ class PsicologoController:
             Psicologo: Objeto Psicologo o None
         """
         try:
-            query = """
-            SELECT p.*, u.nombre, u.correo
-            FROM PSICOLOGOS p
-            INNER JOIN USUARIO u ON p.IDusuario = u.IDusuario
-            WHERE p.IDpsicologo = ?
-            """
-            resultado = self.db.ejecutar_consulta_una(query, (id_psicologo,))
-            
-            if resultado:
-                psicologo = Psicologo(
-                    id_psicologo=resultado[0],
-                    id_usuario=resultado[1],
-                    especialidad=resultado[2],
-                    experiencia=resultado[3],
-                    cedula=resultado[4]
-                )
-                psicologo.nombre = resultado[5]
-                psicologo.correo = resultado[6]
-                return psicologo
-            return None
+            query = SELECT_PSICOLOGOS + " WHERE p.IDpsicologo = ?"
+            return self.db.ejecutar_consulta_una(query, (id_psicologo,), modelo=Psicologo)
             
         except Exception as e:
             print(f"Error al obtener psicólogo: {e}")
@@ -88,26 +79,8 @@ class PsicologoController:
             Psicologo: Objeto Psicologo o None
         """
         try:
-            query = """
-            SELECT p.*, u.nombre, u.correo
-            FROM PSICOLOGOS p
-            INNER JOIN USUARIO u ON p.IDusuario = u.IDusuario
-            WHERE p.IDusuario = ?
-            """
-            resultado = self.db.ejecutar_consulta_una(query, (id_usuario,))
-            
-            if resultado:
-                psicologo = Psicologo(
-                    id_psicologo=resultado[0],
-                    id_usuario=resultado[1],
-                    especialidad=resultado[2],
-                    experiencia=resultado[3],
-                    cedula=resultado[4]
-                )
-                psicologo.nombre = resultado[5]
-                psicologo.correo = resultado[6]
-                return psicologo
-            return None
+            query = SELECT_PSICOLOGOS + " WHERE p.IDusuario = ?"
+            return self.db.ejecutar_consulta_una(query, (id_usuario,), modelo=Psicologo)
             
         except Exception as e:
             print(f"Error al obtener psicólogo: {e}")
@@ -123,37 +96,11 @@ class PsicologoController:
         """
         try:
             if especialidad:
-                query = """
-                SELECT p.*, u.nombre, u.correo
-                FROM PSICOLOGOS p
-                INNER JOIN USUARIO u ON p.IDusuario = u.IDusuario
-                WHERE p.especialidad = ?
-                ORDER BY u.nombre
-                """
-                resultados = self.db.ejecutar_consulta(query, (especialidad,))
+                query = SELECT_PSICOLOGOS + " WHERE p.especialidad = ? ORDER BY u.nombre"
+                return self.db.ejecutar_consulta(query, (especialidad,), modelo=Psicologo, cache=True)
             else:
-                query = """
-                SELECT p.*, u.nombre, u.correo
-                FROM PSICOLOGOS p
-                INNER JOIN USUARIO u ON p.IDusuario = u.IDusuario
-                ORDER BY u.nombre
-                """
-                resultados = self.db.ejecutar_consulta(query)
-            
-            psicologos = []
-            for resultado in resultados:
-                psicologo = Psicologo(
-                    id_psicologo=resultado[0],
-                    id_usuario=resultado[1],
-                    especialidad=resultado[2],
-                    experiencia=resultado[3],
-                    cedula=resultado[4]
-                )
-                psicologo.nombre = resultado[5]
-                psicologo.correo = resultado[6]
-                psicologos.append(psicologo)
-            
-            return psicologos
+                query = SELECT_PSICOLOGOS + " ORDER BY u.nombre"
+                return self.db.ejecutar_consulta(query, modelo=Psicologo, cache=True)
             
         except Exception as e:
             print(f"Error al listar psicólogos: {e}")
@@ -220,7 +167,7 @@ class PsicologoController:
         """
         try:
             query = "SELECT DISTINCT especialidad FROM PSICOLOGOS ORDER BY especialidad"
-            resultados = self.db.ejecutar_consulta(query)
+            resultados = self.db.ejecutar_consulta(query, cache=True)
             return [r[0] for r in resultados]
             
         except Exception as e:
@@ -235,7 +182,7 @@ class PsicologoController:
         """
         try:
             query = "SELECT COUNT(*) FROM PSICOLOGOS"
-            resultado = self.db.ejecutar_consulta_una(query)
+            resultado = self.db.ejecutar_consulta_una(query, cache=True)
             return resultado[0] if resultado else 0
             
         except Exception as e:
@@ -251,27 +198,64 @@ class PsicologoController:
             Psicologo: Objeto Psicologo o None
         """
         try:
+            # Columna normalizada: no importan espacios, guiones, puntos ni mayúsculas
+            query = SELECT_PSICOLOGOS + " WHERE p.cedula_busqueda = ?"
+            return self.db.ejecutar_consulta_una(query, (normalizar_cedula(cedula),), modelo=Psicologo)
+            
+        except Exception as e:
+            print(f"Error al buscar psicólogo: {e}")
+            return None
+    
+    def obtener_horario(self, id_psicologo: int) -> list:
+        """
+        Obtiene los bloques del horario semanal de un psicólogo
+        Args:
+            id_psicologo: ID del psicólogo
+        Returns:
+            list: Lista de objetos Horario (vacía si usa el horario por defecto)
+        """
+        try:
+            query = "SELECT * FROM HORARIOS WHERE IDpsicologo = ? ORDER BY dia_semana, hora_inicio"
+            return self.db.ejecutar_consulta(query, (id_psicologo,), modelo=Horario)
+            
+        except Exception as e:
+            print(f"Error al obtener horario: {e}")
+            return []
+    
+    def guardar_horario(self, id_psicologo: int, horarios: list) -> tuple:
+        """
+        Reemplaza el horario semanal de un psicólogo
+        Args:
+            id_psicologo: ID del psicólogo
+            horarios: Lista de objetos Horario; vacía para volver al horario
+                por defecto (CITAS_CONFIG)
+        Returns:
+            tuple: (exito: bool, mensaje: str)
+        """
+        try:
+            filas = []
+            for horario in horarios:
+                horario.id_psicologo = id_psicologo
+                horario.hora_inicio = convertir_hora(horario.hora_inicio)
+                horario.hora_fin = convertir_hora(horario.hora_fin)
+                
+                es_valido, mensaje = horario.validar_datos()
+                if not es_valido:
+                    return False, mensaje
+                filas.append((id_psicologo, horario.dia_semana, horario.hora_inicio, horario.hora_fin))
+                
             query = """
-            SELECT p.*, u.nombre, u.correo
-            FROM PSICOLOGOS p
-            INNER JOIN USUARIO u ON p.IDusuario = u.IDusuario
-            WHERE p.cedula = ?
+            INSERT INTO HORARIOS (IDpsicologo, dia_semana, hora_inicio, hora_fin)
+            VALUES (?, ?, ?, ?)
             """
-            resultado = self.db.ejecutar_consulta_una(query, (cedula,))
             
-            if resultado:
-                psicologo = Psicologo(
-                    id_psicologo=resultado[0],
-                    id_usuario=resultado[1],
-                    especialidad=resultado[2],
-                    experiencia=resultado[3],
-                    cedula=resultado[4]
-                )
-                psicologo.nombre = resultado[5]
-                psicologo.correo = resultado[6]
-                return psicologo
-            return None
+            with self.db.transaccion():
+                borrado = self.db.ejecutar_query("DELETE FROM HORARIOS WHERE IDpsicologo = ?", (id_psicologo,))
+                if not borrado or self.db.ejecutar_lote(query, filas) != len(filas):
+                    self.db.cancelar_transaccion()
+                    return False, "Error al guardar horario"
+                    
+            return True, "Horario guardado exitosamente"
             
         except Exception as e:
-            print(f"Error al buscar psicólogo: {e}")
-            return None
\ No newline at end of file
+            return False, f"Error: {str(e)}"
@@ -0,0 +1,202 @@
+# ====================================================================================
+# controllers/resumen_controller.py
+# ====================================================================================
+"""
+Controlador de los resúmenes diarios de citas y pagos
+Los totales se leen de RESUMEN_CITAS y RESUMEN_PAGOS (una fila por día y
+combinación de psicólogo, estado, método...), no de CITAS ni PAGOS: el costo
+depende de los días del período y no del número de citas o pagos.
+Las lecturas no recalculan nada: los días anotados en RESUMEN_PENDIENTES se
+recalculan aparte (actualizar_resumenes, o periódicamente en segundo plano
+con iniciar_actualizacion_periodica)
+"""
+
+import threading
+from collections import namedtuple
+from config.database import db
+from config.settings import DASHBOARD_CONFIG
+
+# Fila de totales; clave es el valor agrupado (None si no se agrupó)
+TotalCitas = namedtuple('TotalCitas', ['clave', 'citas'])
+TotalPagos = namedtuple('TotalPagos', ['clave', 'pagos', 'monto'])
+
+# Agrupaciones permitidas -> columna del resumen
+AGRUPAR_CITAS = {'fecha': 'fecha', 'psicologo': 'IDpsicologo', 'estado': 'estado', 'modalidad': 'modalidad'}
+AGRUPAR_PAGOS = {'fecha': 'fecha', 'psicologo': 'IDpsicologo', 'estatus': 'estatus_pago', 'metodo': 'metodo'}
+
+# Días anotados por los disparadores hasta el IDpendiente indicado
+_DIAS_PENDIENTES = "SELECT fecha FROM RESUMEN_PENDIENTES WHERE IDpendiente <= ?"
+
+# Un solo hilo recalcula a la vez; los demás leen lo ya recalculado
+_lock_actualizacion = threading.Lock()
+
+# Hilo de la actualización periódica (uno por proceso)
+_hilo_periodico = None
+_lock_hilo = threading.Lock()
+
+
+class ResumenController:
+    """Lectura y mantenimiento de los resúmenes diarios"""
+    
+    def __init__(self):
+        self.db = db
+    
+    def actualizar_resumenes(self) -> bool:
+        """
+        Vuelve a calcular los días anotados en RESUMEN_PENDIENTES
+        Solo se leen las citas y pagos de esos días. Escribe en una
+        transacción: no se llama al leer totales, sino en segundo plano
+        (iniciar_actualizacion_periodica) o cuando se pide explícitamente
+        Returns:
+            bool: True si los resúmenes quedaron al día
+        """
+        with _lock_actualizacion:
+            try:
+                resultado = self.db.ejecutar_consulta_una("SELECT MAX(IDpendiente) FROM RESUMEN_PENDIENTES")
+                if not resultado or resultado[0] is None:
+                    return True
+                    
+                # Lo anotado después de leer el máximo queda para la siguiente vez
+                hasta = resultado[0]
+                sentencias = [
+                    f"DELETE FROM RESUMEN_CITAS WHERE fecha IN ({_DIAS_PENDIENTES})",
+                    f"""
+                    INSERT INTO RESUMEN_CITAS (fecha, IDpsicologo, estado, modalidad, citas)
+                    SELECT fecha, IDpsicologo, estado, modalidad, COUNT(*)
+                    FROM CITAS
+                    WHERE fecha IN ({_DIAS_PENDIENTES})
+                    GROUP BY fecha, IDpsicologo, estado, modalidad
+                    """,
+                    f"DELETE FROM RESUMEN_PAGOS WHERE fecha IN ({_DIAS_PENDIENTES})",
+                    f"""
+                    INSERT INTO RESUMEN_PAGOS (fecha, IDpsicologo, estatus_pago, metodo, pagos, monto)
+                    SELECT p.fecha_pago, c.IDpsicologo, p.estatus_pago, p.metodo, COUNT(*), ROUND(SUM(p.monto), 2)
+                    FROM PAGOS p
+                    INNER JOIN CONSULTAS co ON p.IDconsulta = co.IDconsulta
+                    INNER JOIN CITAS c ON co.IDcita = c.IDcita
+                    WHERE p.fecha_pago IN ({_DIAS_PENDIENTES})
+                    GROUP BY p.fecha_pago, c.IDpsicologo, p.estatus_pago, p.metodo
+                    """,
+                    "DELETE FROM RESUMEN_PENDIENTES WHERE IDpendiente <= ?",
+                ]
+                
+                with self.db.transaccion():
+                    if not all(self.db.ejecutar_query(sentencia, (hasta,)) for sentencia in sentencias):
+                        self.db.cancelar_transaccion()
+                        return False
+                return True
+                
+            except Exception as e:
+                print(f"Error al actualizar resúmenes: {e}")
+                return False
+    
+    def hay_pendientes(self) -> bool:
+        """Indica si hay días sin recalcular (los totales pueden estar atrasados)"""
+        try:
+            resultado = self.db.ejecutar_consulta_una("SELECT MAX(IDpendiente) FROM RESUMEN_PENDIENTES")
+            return bool(resultado) and resultado[0] is not None
+            
+        except Exception as e:
+            print(f"Error al revisar resúmenes pendientes: {e}")
+            return False
+    
+    def iniciar_actualizacion_periodica(self):
+        """
+        Recalcula los días pendientes cada DASHBOARD_CONFIG['actualizar_resumenes_cada']
+        segundos en un hilo de fondo (solo se inicia una vez por proceso)
+        """
+        global _hilo_periodico
+        intervalo = DASHBOARD_CONFIG.get('actualizar_resumenes_cada', 60)
+        if not intervalo:
+            return
+            
+        with _lock_hilo:
+            if _hilo_periodico is not None:
+                return
+            _hilo_periodico = threading.Thread(target=self._actualizar_periodicamente, args=(intervalo,),
+                                               name='resumenes', daemon=True)
+            _hilo_periodico.start()
+    
+    def _actualizar_periodicamente(self, intervalo: float):
+        """Cuerpo del hilo de iniciar_actualizacion_periodica"""
+        espera = threading.Event()
+        while not espera.wait(intervalo):
+            self.actualizar_resumenes()
+    
+    def totales_citas(self, fecha_inicio=None, fecha_fin=None, por: str = None,
+                      id_psicologo: int = None, estado: str = None) -> list:
+        """
+        Número de citas de un período
+        Solo lee: los días que aún no se recalculan (hay_pendientes) cuentan
+        con sus valores anteriores
+        Args:
+            fecha_inicio: Primer día (opcional)
+            fecha_fin: Último día (opcional)
+            por: Agrupar por 'fecha', 'psicologo', 'estado' o 'modalidad' (opcional)
+            id_psicologo: Solo las citas de este psicólogo (opcional)
+            estado: Solo las citas en este estado (opcional)
+        Returns:
+            list: TotalCitas(clave, citas); sin agrupar, una sola fila con clave None
+        """
+        try:
+            filtros = {'IDpsicologo': id_psicologo, 'estado': estado}
+            query, parametros = self._query_totales('RESUMEN_CITAS', "SUM(citas) AS citas",
+                                                    AGRUPAR_CITAS, por, fecha_inicio, fecha_fin, filtros)
+            return self.db.ejecutar_consulta(query, parametros, cache=True, modelo=TotalCitas)
+            
+        except Exception as e:
+            print(f"Error al obtener totales de citas: {e}")
+            return []
+    
+    def totales_pagos(self, fecha_inicio=None, fecha_fin=None, por: str = None,
+                      id_psicologo: int = None, estatus: str = 'Pagado', metodo: str = None) -> list:
+        """
+        Número y monto de los pagos de un período (por defecto los ingresos: pagos 'Pagado')
+        Solo lee, igual que totales_citas
+        Args:
+            fecha_inicio: Primer día (opcional)
+            fecha_fin: Último día (opcional)
+            por: Agrupar por 'fecha', 'psicologo', 'estatus' o 'metodo' (opcional)
+            id_psicologo: Solo los pagos de consultas de este psicólogo (opcional)
+            estatus: Estatus del pago; None para todos
+            metodo: Solo los pagos con este método (opcional)
+        Returns:
+            list: TotalPagos(clave, pagos, monto); sin agrupar, una sola fila con clave None
+        """
+        try:
+            filtros = {'IDpsicologo': id_psicologo, 'estatus_pago': estatus, 'metodo': metodo}
+            query, parametros = self._query_totales('RESUMEN_PAGOS', "SUM(pagos) AS pagos, SUM(monto) AS monto",
+                                                    AGRUPAR_PAGOS, por, fecha_inicio, fecha_fin, filtros)
+            return self.db.ejecutar_consulta(query, parametros, cache=True, modelo=TotalPagos)
+            
+        except Exception as e:
+            print(f"Error al obtener totales de pagos: {e}")
+            return []
+    
+    def _query_totales(self, tabla: str, totales: str, agrupaciones: dict, por: str,
+                       fecha_inicio, fecha_fin, filtros: dict) -> tuple:
+        """Arma el SELECT de totales_citas / totales_pagos"""
+        if por is not None and por not in agrupaciones:
+            raise ValueError(f"No se puede agrupar por '{por}' (opciones: {', '.join(agrupaciones)})")
+        columna = agrupaciones.get(por)
+        
+        query = f"SELECT {columna or 'NULL'} AS clave, {totales} FROM {tabla} WHERE 1=1"
+        parametros = []
+        
+        if fecha_inicio:
+            query += " AND fecha >= ?"
+            parametros.append(fecha_inicio)
+            
+        if fecha_fin:
+            query += " AND fecha <= ?"
+            parametros.append(fecha_fin)
+            
+        for nombre, valor in filtros.items():
+            if valor is not None:
+                query += f" AND {nombre} = ?"
+                parametros.append(valor)
+                
+        if columna:
+            query += f" GROUP BY {columna} ORDER BY {columna}"
+            
+        return query, tuple(parametros) if parametros else None
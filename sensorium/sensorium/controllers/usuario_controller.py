@@ -36,8 +36,8 @@ class UsuarioController:
                 usuario.fecha_regist or datetime.now().date()
             )
             
-            if self.db.ejecutar_query(query, parametros):
-                id_insertado = self.db.obtener_ultimo_id()
+            id_insertado = self.db.insertar_retornando_id(query, parametros, 'IDusuario')
+            if id_insertado:
                 return True, "Usuario creado exitosamente", id_insertado
             else:
                 return False, "Error al crear usuario", None
@@ -55,18 +55,7 @@ class UsuarioController:
         """
         try:
             query = "SELECT * FROM USUARIO WHERE IDusuario = ?"
-            resultado = self.db.ejecutar_consulta_una(query, (id_usuario,))
-            
-            if resultado:
-                return Usuario(
-                    id_usuario=resultado[0],
-                    nombre=resultado[1],
-                    correo=resultado[2],
-                    contraseña=resultado[3],
-                    rol=resultado[4],
-                    fecha_regist=resultado[5]
-                )
-            return None
+            return self.db.ejecutar_consulta_una(query, (id_usuario,), modelo=Usuario)
             
         except Exception as e:
             print(f"Error al obtener usuario: {e}")
@@ -82,18 +71,7 @@ class UsuarioController:
         """
         try:
             query = "SELECT * FROM USUARIO WHERE correo = ?"
-            resultado = self.db.ejecutar_consulta_una(query, (correo,))
-            
-            if resultado:
-                return Usuario(
-                    id_usuario=resultado[0],
-                    nombre=resultado[1],
-                    correo=resultado[2],
-                    contraseña=resultado[3],
-                    rol=resultado[4],
-                    fecha_regist=resultado[5]
-                )
-            return None
+            return self.db.ejecutar_consulta_una(query, (correo,), modelo=Usuario)
             
         except Exception as e:
             print(f"Error al obtener usuario: {e}")
@@ -110,23 +88,10 @@ class UsuarioController:
         try:
             if rol:
                 query = "SELECT * FROM USUARIO WHERE rol = ? ORDER BY nombre"
-                resultados = self.db.ejecutar_consulta(query, (rol,))
+                return self.db.ejecutar_consulta(query, (rol,), modelo=Usuario)
             else:
                 query = "SELECT * FROM USUARIO ORDER BY nombre"
-                resultados = self.db.ejecutar_consulta(query)
-            
-            usuarios = []
-            for resultado in resultados:
-                usuarios.append(Usuario(
-                    id_usuario=resultado[0],
-                    nombre=resultado[1],
-                    correo=resultado[2],
-                    contraseña=resultado[3],
-                    rol=resultado[4],
-                    fecha_regist=resultado[5]
-                ))
-            
-            return usuarios
+                return self.db.ejecutar_consulta(query, modelo=Usuario)
             
         except Exception as e:
             print(f"Error al listar usuarios: {e}")
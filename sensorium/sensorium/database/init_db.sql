@@ -82,6 +82,7 @@ BEGIN
         hora TIME NOT NULL,
         modalidad VARCHAR(20) NOT NULL CHECK (modalidad IN ('Presencial', 'Virtual')),
         estado VARCHAR(20) NOT NULL DEFAULT 'Programada' CHECK (estado IN ('Programada', 'Completada', 'Cancelada')),
+        duracion INT NOT NULL DEFAULT 60 CHECK (duracion BETWEEN 1 AND 240),  -- Duración en minutos
         FOREIGN KEY (IDpaciente) REFERENCES PACIENTES(IDpaciente) ON DELETE CASCADE,
         FOREIGN KEY (IDpsicologo) REFERENCES PSICOLOGOS(IDpsicologo) ON DELETE NO ACTION
     );
@@ -89,6 +90,16 @@ BEGIN
 END
 GO
 
+-- Bases creadas antes de registrar la duración de cada cita
+IF COL_LENGTH('CITAS', 'duracion') IS NULL
+BEGIN
+    ALTER TABLE CITAS ADD duracion INT NOT NULL
+        CONSTRAINT DF_CITAS_Duracion DEFAULT 60 WITH VALUES
+        CONSTRAINT CK_CITAS_Duracion CHECK (duracion BETWEEN 1 AND 240);
+    PRINT '✓ Columna CITAS.duracion agregada';
+END
+GO
+
 -- ========================================================================
 -- TABLA: CONSULTAS
 -- Almacena el registro de las consultas realizadas
@@ -146,6 +157,318 @@ BEGIN
 END
 GO
 
+-- ========================================================================
+-- TABLA: HORARIOS
+-- Bloques de atención semanales de cada psicólogo (0 = lunes ... 6 = domingo)
+-- Sin bloques registrados se usa el horario de CITAS_CONFIG
+-- ========================================================================
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[HORARIOS]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE HORARIOS (
+        IDhorario INT IDENTITY(1,1) PRIMARY KEY,
+        IDpsicologo INT NOT NULL,
+        dia_semana TINYINT NOT NULL CHECK (dia_semana BETWEEN 0 AND 6),
+        hora_inicio TIME NOT NULL,
+        hora_fin TIME NOT NULL,
+        CHECK (hora_fin > hora_inicio),
+        FOREIGN KEY (IDpsicologo) REFERENCES PSICOLOGOS(IDpsicologo) ON DELETE CASCADE
+    );
+    CREATE INDEX IX_HORARIOS_Psicologo ON HORARIOS(IDpsicologo, dia_semana);
+    PRINT '✓ Tabla HORARIOS creada';
+END
+GO
+
+-- ========================================================================
+-- SINCRONIZACIÓN INCREMENTAL
+-- Cada tabla que se lista en pantalla lleva una columna ROWVERSION que el
+-- servidor cambia en cada INSERT y UPDATE; los borrados quedan registrados en
+-- ELIMINADOS mediante disparadores. Así las vistas piden solo lo que cambió
+-- desde la última versión que vieron (listar_*_cambios)
+-- ========================================================================
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[ELIMINADOS]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE ELIMINADOS (
+        IDeliminado INT IDENTITY(1,1) PRIMARY KEY,
+        tabla VARCHAR(20) NOT NULL,
+        id INT NOT NULL,
+        version ROWVERSION
+    );
+    CREATE INDEX IX_ELIMINADOS_Version ON ELIMINADOS(tabla, version) INCLUDE (id);
+    PRINT '✓ Tabla ELIMINADOS creada';
+END
+GO
+
+IF COL_LENGTH('PACIENTES', 'version') IS NULL
+BEGIN
+    ALTER TABLE PACIENTES ADD version ROWVERSION;
+    PRINT '✓ Columna PACIENTES.version agregada';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PACIENTES_Version')
+BEGIN
+    CREATE INDEX IX_PACIENTES_Version ON PACIENTES(version);
+    PRINT '✓ Índice IX_PACIENTES_Version creado';
+END
+GO
+
+IF OBJECT_ID(N'[dbo].[TR_PACIENTES_Eliminar]', N'TR') IS NULL
+BEGIN
+    EXEC('CREATE TRIGGER TR_PACIENTES_Eliminar ON PACIENTES AFTER DELETE AS
+          SET NOCOUNT ON;
+          INSERT INTO ELIMINADOS (tabla, id) SELECT ''PACIENTES'', IDpaciente FROM deleted;');
+    PRINT '✓ Disparador TR_PACIENTES_Eliminar creado';
+END
+GO
+
+IF COL_LENGTH('CITAS', 'version') IS NULL
+BEGIN
+    ALTER TABLE CITAS ADD version ROWVERSION;
+    PRINT '✓ Columna CITAS.version agregada';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_CITAS_Version')
+BEGIN
+    CREATE INDEX IX_CITAS_Version ON CITAS(version);
+    PRINT '✓ Índice IX_CITAS_Version creado';
+END
+GO
+
+IF OBJECT_ID(N'[dbo].[TR_CITAS_Eliminar]', N'TR') IS NULL
+BEGIN
+    EXEC('CREATE TRIGGER TR_CITAS_Eliminar ON CITAS AFTER DELETE AS
+          SET NOCOUNT ON;
+          INSERT INTO ELIMINADOS (tabla, id) SELECT ''CITAS'', IDcita FROM deleted;');
+    PRINT '✓ Disparador TR_CITAS_Eliminar creado';
+END
+GO
+
+IF COL_LENGTH('CONSULTAS', 'version') IS NULL
+BEGIN
+    ALTER TABLE CONSULTAS ADD version ROWVERSION;
+    PRINT '✓ Columna CONSULTAS.version agregada';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_CONSULTAS_Version')
+BEGIN
+    CREATE INDEX IX_CONSULTAS_Version ON CONSULTAS(version);
+    PRINT '✓ Índice IX_CONSULTAS_Version creado';
+END
+GO
+
+IF OBJECT_ID(N'[dbo].[TR_CONSULTAS_Eliminar]', N'TR') IS NULL
+BEGIN
+    EXEC('CREATE TRIGGER TR_CONSULTAS_Eliminar ON CONSULTAS AFTER DELETE AS
+          SET NOCOUNT ON;
+          INSERT INTO ELIMINADOS (tabla, id) SELECT ''CONSULTAS'', IDconsulta FROM deleted;');
+    PRINT '✓ Disparador TR_CONSULTAS_Eliminar creado';
+END
+GO
+
+IF COL_LENGTH('PAGOS', 'version') IS NULL
+BEGIN
+    ALTER TABLE PAGOS ADD version ROWVERSION;
+    PRINT '✓ Columna PAGOS.version agregada';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PAGOS_Version')
+BEGIN
+    CREATE INDEX IX_PAGOS_Version ON PAGOS(version);
+    PRINT '✓ Índice IX_PAGOS_Version creado';
+END
+GO
+
+IF OBJECT_ID(N'[dbo].[TR_PAGOS_Eliminar]', N'TR') IS NULL
+BEGIN
+    EXEC('CREATE TRIGGER TR_PAGOS_Eliminar ON PAGOS AFTER DELETE AS
+          SET NOCOUNT ON;
+          INSERT INTO ELIMINADOS (tabla, id) SELECT ''PAGOS'', IDpago FROM deleted;');
+    PRINT '✓ Disparador TR_PAGOS_Eliminar creado';
+END
+GO
+
+-- ========================================================================
+-- COLUMNAS DE BÚSQUEDA
+-- Copias normalizadas (sin acentos, en minúsculas, teléfono solo con dígitos)
+-- calculadas por el servidor; con un índice encima, las búsquedas por
+-- prefijo (LIKE 'texto%') son búsquedas en el índice y no dependen de la
+-- intercalación de la columna original
+-- ========================================================================
+IF COL_LENGTH('PACIENTES', 'nombre_busqueda') IS NULL
+BEGIN
+    ALTER TABLE PACIENTES ADD nombre_busqueda AS CAST(
+        REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(LOWER(LTRIM(RTRIM(nombre))),
+            'á', 'a'), 'é', 'e'), 'í', 'i'), 'ó', 'o'), 'ú', 'u'), 'ü', 'u'), 'ñ', 'n')
+        AS VARCHAR(40)) PERSISTED;
+    PRINT '✓ Columna PACIENTES.nombre_busqueda agregada';
+END
+GO
+
+IF COL_LENGTH('PACIENTES', 'telefono_busqueda') IS NULL
+BEGIN
+    ALTER TABLE PACIENTES ADD telefono_busqueda AS CAST(
+        REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(telefono,
+            ' ', ''), '-', ''), '(', ''), ')', ''), '+', ''), '.', '')
+        AS VARCHAR(15)) PERSISTED;
+    PRINT '✓ Columna PACIENTES.telefono_busqueda agregada';
+END
+GO
+
+IF COL_LENGTH('PACIENTES', 'correo_busqueda') IS NULL
+BEGIN
+    ALTER TABLE PACIENTES ADD correo_busqueda AS CAST(LOWER(LTRIM(RTRIM(correo))) AS VARCHAR(40)) PERSISTED;
+    PRINT '✓ Columna PACIENTES.correo_busqueda agregada';
+END
+GO
+
+IF COL_LENGTH('PSICOLOGOS', 'cedula_busqueda') IS NULL
+BEGIN
+    ALTER TABLE PSICOLOGOS ADD cedula_busqueda AS CAST(
+        LOWER(REPLACE(REPLACE(REPLACE(cedula, ' ', ''), '-', ''), '.', ''))
+        AS VARCHAR(20)) PERSISTED;
+    PRINT '✓ Columna PSICOLOGOS.cedula_busqueda agregada';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PACIENTES_NombreBusqueda')
+BEGIN
+    CREATE INDEX IX_PACIENTES_NombreBusqueda ON PACIENTES(nombre_busqueda);
+    PRINT '✓ Índice IX_PACIENTES_NombreBusqueda creado';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PACIENTES_TelefonoBusqueda')
+BEGIN
+    CREATE INDEX IX_PACIENTES_TelefonoBusqueda ON PACIENTES(telefono_busqueda);
+    PRINT '✓ Índice IX_PACIENTES_TelefonoBusqueda creado';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PACIENTES_CorreoBusqueda')
+BEGIN
+    CREATE INDEX IX_PACIENTES_CorreoBusqueda ON PACIENTES(correo_busqueda);
+    PRINT '✓ Índice IX_PACIENTES_CorreoBusqueda creado';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PSICOLOGOS_CedulaBusqueda')
+BEGIN
+    CREATE INDEX IX_PSICOLOGOS_CedulaBusqueda ON PSICOLOGOS(cedula_busqueda);
+    PRINT '✓ Índice IX_PSICOLOGOS_CedulaBusqueda creado';
+END
+GO
+
+-- ========================================================================
+-- TEXTO COMPLETO
+-- Índice de texto completo sobre notas, diagnóstico y recomendaciones de
+-- CONSULTAS para ConsultaController.buscar_texto (CONTAINSTABLE). El
+-- servidor lo actualiza en segundo plano (CHANGE_TRACKING AUTO): una
+-- consulta recién guardada tarda unos segundos en aparecer en la búsqueda.
+-- Requiere el componente Full-Text Search instalado en la instancia
+-- ========================================================================
+IF FULLTEXTSERVICEPROPERTY('IsFullTextInstalled') = 1
+   AND NOT EXISTS (SELECT * FROM sys.fulltext_catalogs WHERE name = 'FT_SENSORIUM')
+BEGIN
+    EXEC('CREATE FULLTEXT CATALOG FT_SENSORIUM WITH ACCENT_SENSITIVITY = OFF');
+    PRINT '✓ Catálogo de texto completo FT_SENSORIUM creado';
+END
+GO
+
+IF FULLTEXTSERVICEPROPERTY('IsFullTextInstalled') = 1
+   AND NOT EXISTS (SELECT * FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('CONSULTAS'))
+BEGIN
+    -- La clave del índice es la llave primaria (su nombre lo genera el servidor)
+    DECLARE @llave SYSNAME = (SELECT name FROM sys.indexes
+                              WHERE object_id = OBJECT_ID('CONSULTAS') AND is_primary_key = 1);
+    EXEC('CREATE FULLTEXT INDEX ON CONSULTAS
+              (notas LANGUAGE 3082, diagnostico LANGUAGE 3082, recomend LANGUAGE 3082)
+          KEY INDEX ' + @llave + ' ON FT_SENSORIUM
+          WITH CHANGE_TRACKING AUTO');
+    PRINT '✓ Índice de texto completo de CONSULTAS creado';
+END
+GO
+
+-- ========================================================================
+-- RESÚMENES
+-- Totales por día para reportes y el panel principal (ResumenController):
+-- RESUMEN_CITAS cuenta citas por día, psicólogo, estado y modalidad;
+-- RESUMEN_PAGOS suma pagos por día, psicólogo, estatus y método. Los
+-- disparadores solo anotan en RESUMEN_PENDIENTES los días que cambiaron;
+-- ResumenController.actualizar_resumenes vuelve a calcular esos días antes
+-- de leer, así un total de un período cuesta tantas filas como días tiene
+-- ========================================================================
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[RESUMEN_CITAS]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE RESUMEN_CITAS (
+        fecha DATE NOT NULL,
+        IDpsicologo INT NOT NULL,
+        estado VARCHAR(20) NOT NULL,
+        modalidad VARCHAR(20) NOT NULL,
+        citas INT NOT NULL,
+        PRIMARY KEY (fecha, IDpsicologo, estado, modalidad)
+    );
+    PRINT '✓ Tabla RESUMEN_CITAS creada';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[RESUMEN_PAGOS]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE RESUMEN_PAGOS (
+        fecha DATE NOT NULL,
+        IDpsicologo INT NOT NULL,
+        estatus_pago VARCHAR(20) NOT NULL,
+        metodo VARCHAR(20) NOT NULL,
+        pagos INT NOT NULL,
+        monto DECIMAL(12,2) NOT NULL,
+        PRIMARY KEY (fecha, IDpsicologo, estatus_pago, metodo)
+    );
+    PRINT '✓ Tabla RESUMEN_PAGOS creada';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[RESUMEN_PENDIENTES]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE RESUMEN_PENDIENTES (
+        IDpendiente INT IDENTITY(1,1) PRIMARY KEY,
+        fecha DATE NOT NULL
+    );
+    -- Los datos anteriores a los resúmenes se calculan en la primera lectura
+    INSERT INTO RESUMEN_PENDIENTES (fecha)
+    SELECT fecha FROM CITAS UNION SELECT fecha_pago FROM PAGOS;
+    PRINT '✓ Tabla RESUMEN_PENDIENTES creada';
+END
+GO
+
+IF OBJECT_ID(N'[dbo].[TR_CITAS_Resumen]', N'TR') IS NULL
+BEGIN
+    EXEC('CREATE TRIGGER TR_CITAS_Resumen ON CITAS AFTER INSERT, UPDATE, DELETE AS
+          SET NOCOUNT ON;
+          INSERT INTO RESUMEN_PENDIENTES (fecha)
+          SELECT fecha FROM inserted UNION SELECT fecha FROM deleted;
+          -- Los pagos se resumen por el psicólogo de su cita
+          IF UPDATE(IDpsicologo) AND EXISTS (SELECT * FROM deleted)
+              INSERT INTO RESUMEN_PENDIENTES (fecha)
+              SELECT DISTINCT p.fecha_pago
+              FROM inserted i
+              INNER JOIN CONSULTAS co ON co.IDcita = i.IDcita
+              INNER JOIN PAGOS p ON p.IDconsulta = co.IDconsulta;');
+    PRINT '✓ Disparador TR_CITAS_Resumen creado';
+END
+GO
+
+IF OBJECT_ID(N'[dbo].[TR_PAGOS_Resumen]', N'TR') IS NULL
+BEGIN
+    EXEC('CREATE TRIGGER TR_PAGOS_Resumen ON PAGOS AFTER INSERT, UPDATE, DELETE AS
+          SET NOCOUNT ON;
+          INSERT INTO RESUMEN_PENDIENTES (fecha)
+          SELECT fecha_pago FROM inserted UNION SELECT fecha_pago FROM deleted;');
+    PRINT '✓ Disparador TR_PAGOS_Resumen creado';
+END
+GO
+
 -- ========================================================================
 -- ÍNDICES para mejorar el rendimiento
 -- ========================================================================
@@ -167,6 +490,7 @@ END
 GO
 
 -- Índice para búsqueda de citas por fecha
+-- (IDcita va implícito como clave agrupada: sirve a la paginación de citas y consultas)
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_CITAS_Fecha')
 BEGIN
     CREATE INDEX IX_CITAS_Fecha ON CITAS(fecha, hora);
@@ -174,6 +498,25 @@ BEGIN
 END
 GO
 
+-- Índice para detectar traslapes en la agenda de cada psicólogo
+-- (búsqueda por rango de hora dentro del día)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_CITAS_Psicologo')
+BEGIN
+    CREATE INDEX IX_CITAS_Psicologo ON CITAS(IDpsicologo, fecha, hora) INCLUDE (duracion, estado);
+    PRINT '✓ Índice IX_CITAS_Psicologo creado';
+END
+GO
+
+-- Un psicólogo no puede tener dos citas activas que empiecen a la misma hora
+-- (respaldo del INSERT condicional de CitaController.crear_cita)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'UX_CITAS_Horario')
+BEGIN
+    CREATE UNIQUE INDEX UX_CITAS_Horario ON CITAS(IDpsicologo, fecha, hora)
+    WHERE estado <> 'Cancelada';
+    PRINT '✓ Índice UX_CITAS_Horario creado';
+END
+GO
+
 -- Índice para búsqueda de citas por estado
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_CITAS_Estado')
 BEGIN
@@ -182,6 +525,22 @@ BEGIN
 END
 GO
 
+-- Índice para el listado paginado de pacientes por nombre
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PACIENTES_Nombre')
+BEGIN
+    CREATE INDEX IX_PACIENTES_Nombre ON PACIENTES(nombre, IDpaciente);
+    PRINT '✓ Índice IX_PACIENTES_Nombre creado';
+END
+GO
+
+-- Índice para el listado paginado de pagos por fecha
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_PAGOS_Fecha')
+BEGIN
+    CREATE INDEX IX_PAGOS_Fecha ON PAGOS(fecha_pago, IDpago);
+    PRINT '✓ Índice IX_PAGOS_Fecha creado';
+END
+GO
+
 -- ========================================================================
 -- DATOS INICIALES - Usuario administrador por defecto
 -- Contraseña: admin123 (encriptada en SHA256)
@@ -0,0 +1,461 @@
+-- ========================================================================
+-- Script de inicialización de la base de datos SENSORIUM
+-- SQLite (motor embebido, DATABASE_CONFIG['motor'] = 'sqlite')
+-- Equivalente a init_db.sql; se ejecuta automáticamente si el archivo
+-- sensorium.db está vacío
+-- ========================================================================
+
+-- ========================================================================
+-- TABLA: USUARIO
+-- Almacena los usuarios del sistema (administradores y psicólogos)
+-- ========================================================================
+CREATE TABLE IF NOT EXISTS USUARIO (
+    IDusuario INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(40) NOT NULL,
+    correo VARCHAR(40) NOT NULL UNIQUE,
+    contraseña VARCHAR(100) NOT NULL,
+    rol VARCHAR(20) NOT NULL CHECK (rol IN ('administrador', 'psicologo')),
+    fecha_regist DATE NOT NULL DEFAULT (date('now', 'localtime'))
+);
+
+-- ========================================================================
+-- TABLA: PSICOLOGOS
+-- Almacena información adicional de los psicólogos
+-- ========================================================================
+CREATE TABLE IF NOT EXISTS PSICOLOGOS (
+    IDpsicologo INTEGER PRIMARY KEY AUTOINCREMENT,
+    IDusuario INTEGER NOT NULL,
+    especialidad VARCHAR(40) NOT NULL,
+    experiencia VARCHAR(150),
+    cedula VARCHAR(20) NOT NULL UNIQUE,
+    cedula_busqueda VARCHAR(20) GENERATED ALWAYS AS (
+        lower(replace(replace(replace(cedula, ' ', ''), '-', ''), '.', ''))
+    ) VIRTUAL,
+    FOREIGN KEY (IDusuario) REFERENCES USUARIO(IDusuario) ON DELETE CASCADE
+);
+
+-- ========================================================================
+-- TABLA: PACIENTES
+-- Almacena información de los pacientes
+-- ========================================================================
+CREATE TABLE IF NOT EXISTS PACIENTES (
+    IDpaciente INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(40) NOT NULL,
+    correo VARCHAR(40),
+    telefono VARCHAR(15) NOT NULL,
+    direccion VARCHAR(80),
+    fecha_regist DATE NOT NULL DEFAULT (date('now', 'localtime')),
+    version INTEGER NOT NULL DEFAULT 0,  -- VERSION_BD.valor de su último cambio
+    -- Copias normalizadas para buscar por prefijo con índice (ver COLUMNAS DE BÚSQUEDA)
+    nombre_busqueda VARCHAR(40) GENERATED ALWAYS AS (
+        replace(replace(replace(replace(replace(replace(replace(
+        replace(replace(replace(replace(replace(replace(replace(lower(trim(nombre)),
+            'á', 'a'), 'Á', 'a'), 'é', 'e'), 'É', 'e'), 'í', 'i'), 'Í', 'i'), 'ó', 'o'),
+            'Ó', 'o'), 'ú', 'u'), 'Ú', 'u'), 'ü', 'u'), 'Ü', 'u'), 'ñ', 'n'), 'Ñ', 'n')
+    ) VIRTUAL,
+    telefono_busqueda VARCHAR(15) GENERATED ALWAYS AS (
+        replace(replace(replace(replace(replace(replace(telefono,
+            ' ', ''), '-', ''), '(', ''), ')', ''), '+', ''), '.', '')
+    ) VIRTUAL,
+    correo_busqueda VARCHAR(40) GENERATED ALWAYS AS (lower(trim(correo))) VIRTUAL
+);
+
+-- ========================================================================
+-- TABLA: CITAS
+-- Almacena las citas programadas entre pacientes y psicólogos
+-- ========================================================================
+CREATE TABLE IF NOT EXISTS CITAS (
+    IDcita INTEGER PRIMARY KEY AUTOINCREMENT,
+    IDpaciente INTEGER NOT NULL,
+    IDpsicologo INTEGER NOT NULL,
+    fecha DATE NOT NULL,
+    hora TIME NOT NULL,
+    modalidad VARCHAR(20) NOT NULL CHECK (modalidad IN ('Presencial', 'Virtual')),
+    estado VARCHAR(20) NOT NULL DEFAULT 'Programada' CHECK (estado IN ('Programada', 'Completada', 'Cancelada')),
+    duracion INT NOT NULL DEFAULT 60 CHECK (duracion BETWEEN 1 AND 240),  -- Duración en minutos
+    version INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (IDpaciente) REFERENCES PACIENTES(IDpaciente) ON DELETE CASCADE,
+    FOREIGN KEY (IDpsicologo) REFERENCES PSICOLOGOS(IDpsicologo) ON DELETE NO ACTION
+);
+
+-- ========================================================================
+-- TABLA: CONSULTAS
+-- Almacena el registro de las consultas realizadas
+-- ========================================================================
+CREATE TABLE IF NOT EXISTS CONSULTAS (
+    IDconsulta INTEGER PRIMARY KEY AUTOINCREMENT,
+    IDcita INTEGER NOT NULL UNIQUE,
+    notas VARCHAR(200),
+    duracion INT,  -- Duración en minutos
+    diagnostico VARCHAR(150),
+    recomend VARCHAR(150),
+    version INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (IDcita) REFERENCES CITAS(IDcita) ON DELETE CASCADE
+);
+
+-- ========================================================================
+-- TABLA: PAGOS
+-- Almacena los pagos realizados por las consultas
+-- ========================================================================
+CREATE TABLE IF NOT EXISTS PAGOS (
+    IDpago INTEGER PRIMARY KEY AUTOINCREMENT,
+    IDconsulta INTEGER NOT NULL,
+    monto DECIMAL(10,2) NOT NULL CHECK (monto > 0),
+    metodo VARCHAR(20) NOT NULL CHECK (metodo IN ('Efectivo', 'Tarjeta', 'Transferencia')),
+    fecha_pago DATE NOT NULL DEFAULT (date('now', 'localtime')),
+    estatus_pago VARCHAR(20) NOT NULL DEFAULT 'Pendiente' CHECK (estatus_pago IN ('Pendiente', 'Pagado', 'Cancelado')),
+    version INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (IDconsulta) REFERENCES CONSULTAS(IDconsulta) ON DELETE CASCADE
+);
+
+-- ========================================================================
+-- TABLA: HISTORIAL
+-- Almacena el historial clínico de los pacientes
+-- ========================================================================
+CREATE TABLE IF NOT EXISTS HISTORIAL (
+    IDhistorial INTEGER PRIMARY KEY AUTOINCREMENT,
+    IDpaciente INTEGER NOT NULL UNIQUE,
+    antecedentes VARCHAR(150),
+    alergias VARCHAR(100),
+    tratamientos VARCHAR(200),
+    fecha_creacion DATE NOT NULL DEFAULT (date('now', 'localtime')),
+    FOREIGN KEY (IDpaciente) REFERENCES PACIENTES(IDpaciente) ON DELETE CASCADE
+);
+
+-- ========================================================================
+-- TABLA: HORARIOS
+-- Bloques de atención semanales de cada psicólogo (0 = lunes ... 6 = domingo)
+-- Sin bloques registrados se usa el horario de CITAS_CONFIG
+-- ========================================================================
+CREATE TABLE IF NOT EXISTS HORARIOS (
+    IDhorario INTEGER PRIMARY KEY AUTOINCREMENT,
+    IDpsicologo INTEGER NOT NULL,
+    dia_semana INT NOT NULL CHECK (dia_semana BETWEEN 0 AND 6),
+    hora_inicio TIME NOT NULL,
+    hora_fin TIME NOT NULL,
+    CHECK (hora_fin > hora_inicio),
+    FOREIGN KEY (IDpsicologo) REFERENCES PSICOLOGOS(IDpsicologo) ON DELETE CASCADE
+);
+
+-- ========================================================================
+-- SINCRONIZACIÓN INCREMENTAL
+-- VERSION_BD es un contador que aumenta con cada cambio; los disparadores
+-- copian su valor a la columna version de la fila insertada o modificada y
+-- registran las filas borradas en ELIMINADOS. Así las vistas piden solo lo
+-- que cambió desde la última versión que vieron (listar_*_cambios)
+-- ========================================================================
+CREATE TABLE IF NOT EXISTS VERSION_BD (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    valor INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO VERSION_BD (id, valor) VALUES (1, 0);
+
+CREATE TABLE IF NOT EXISTS ELIMINADOS (
+    IDeliminado INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabla VARCHAR(20) NOT NULL,
+    id INTEGER NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_ELIMINADOS_Version ON ELIMINADOS(tabla, version);
+
+-- PACIENTES
+CREATE INDEX IF NOT EXISTS IX_PACIENTES_Version ON PACIENTES(version);
+
+CREATE TRIGGER IF NOT EXISTS TR_PACIENTES_Insertar AFTER INSERT ON PACIENTES
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    UPDATE PACIENTES SET version = (SELECT valor FROM VERSION_BD) WHERE IDpaciente = NEW.IDpaciente;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_PACIENTES_Actualizar AFTER UPDATE ON PACIENTES
+WHEN NEW.version = OLD.version  -- No se dispara con su propio cambio de version
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    UPDATE PACIENTES SET version = (SELECT valor FROM VERSION_BD) WHERE IDpaciente = NEW.IDpaciente;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_PACIENTES_Eliminar AFTER DELETE ON PACIENTES
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    INSERT INTO ELIMINADOS (tabla, id, version) SELECT 'PACIENTES', OLD.IDpaciente, valor FROM VERSION_BD;
+END;
+
+-- CITAS
+CREATE INDEX IF NOT EXISTS IX_CITAS_Version ON CITAS(version);
+
+CREATE TRIGGER IF NOT EXISTS TR_CITAS_Insertar AFTER INSERT ON CITAS
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    UPDATE CITAS SET version = (SELECT valor FROM VERSION_BD) WHERE IDcita = NEW.IDcita;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_CITAS_Actualizar AFTER UPDATE ON CITAS
+WHEN NEW.version = OLD.version  -- No se dispara con su propio cambio de version
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    UPDATE CITAS SET version = (SELECT valor FROM VERSION_BD) WHERE IDcita = NEW.IDcita;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_CITAS_Eliminar AFTER DELETE ON CITAS
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    INSERT INTO ELIMINADOS (tabla, id, version) SELECT 'CITAS', OLD.IDcita, valor FROM VERSION_BD;
+END;
+
+-- CONSULTAS
+CREATE INDEX IF NOT EXISTS IX_CONSULTAS_Version ON CONSULTAS(version);
+
+CREATE TRIGGER IF NOT EXISTS TR_CONSULTAS_Insertar AFTER INSERT ON CONSULTAS
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    UPDATE CONSULTAS SET version = (SELECT valor FROM VERSION_BD) WHERE IDconsulta = NEW.IDconsulta;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_CONSULTAS_Actualizar AFTER UPDATE ON CONSULTAS
+WHEN NEW.version = OLD.version  -- No se dispara con su propio cambio de version
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    UPDATE CONSULTAS SET version = (SELECT valor FROM VERSION_BD) WHERE IDconsulta = NEW.IDconsulta;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_CONSULTAS_Eliminar AFTER DELETE ON CONSULTAS
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    INSERT INTO ELIMINADOS (tabla, id, version) SELECT 'CONSULTAS', OLD.IDconsulta, valor FROM VERSION_BD;
+END;
+
+-- PAGOS
+CREATE INDEX IF NOT EXISTS IX_PAGOS_Version ON PAGOS(version);
+
+CREATE TRIGGER IF NOT EXISTS TR_PAGOS_Insertar AFTER INSERT ON PAGOS
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    UPDATE PAGOS SET version = (SELECT valor FROM VERSION_BD) WHERE IDpago = NEW.IDpago;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_PAGOS_Actualizar AFTER UPDATE ON PAGOS
+WHEN NEW.version = OLD.version  -- No se dispara con su propio cambio de version
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    UPDATE PAGOS SET version = (SELECT valor FROM VERSION_BD) WHERE IDpago = NEW.IDpago;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_PAGOS_Eliminar AFTER DELETE ON PAGOS
+BEGIN
+    UPDATE VERSION_BD SET valor = valor + 1;
+    INSERT INTO ELIMINADOS (tabla, id, version) SELECT 'PAGOS', OLD.IDpago, valor FROM VERSION_BD;
+END;
+
+-- ========================================================================
+-- COLUMNAS DE BÚSQUEDA
+-- nombre_busqueda, telefono_busqueda, correo_busqueda y cedula_busqueda son
+-- columnas generadas (sin acentos, en minúsculas, teléfono solo con dígitos);
+-- sus índices guardan el valor calculado, así la búsqueda por prefijo
+-- (columna >= 'texto' AND columna < 'texto' || char(65535)) recorre solo
+-- el rango del índice
+-- ========================================================================
+CREATE INDEX IF NOT EXISTS IX_PACIENTES_NombreBusqueda ON PACIENTES(nombre_busqueda);
+CREATE INDEX IF NOT EXISTS IX_PACIENTES_TelefonoBusqueda ON PACIENTES(telefono_busqueda);
+CREATE INDEX IF NOT EXISTS IX_PACIENTES_CorreoBusqueda ON PACIENTES(correo_busqueda);
+CREATE INDEX IF NOT EXISTS IX_PSICOLOGOS_CedulaBusqueda ON PSICOLOGOS(cedula_busqueda);
+
+-- ========================================================================
+-- TEXTO COMPLETO
+-- CONSULTAS_FTS indexa las palabras de notas, diagnóstico y recomendaciones
+-- (FTS5, sin acentos ni mayúsculas) para ConsultaController.buscar_texto;
+-- guarda solo el índice y lee el texto de CONSULTAS. Los disparadores lo
+-- mantienen al día
+-- ========================================================================
+CREATE VIRTUAL TABLE IF NOT EXISTS CONSULTAS_FTS USING fts5(
+    notas, diagnostico, recomend,
+    content = 'CONSULTAS', content_rowid = 'IDconsulta',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS TR_CONSULTAS_FTS_Insertar AFTER INSERT ON CONSULTAS
+BEGIN
+    INSERT INTO CONSULTAS_FTS (rowid, notas, diagnostico, recomend)
+    VALUES (NEW.IDconsulta, NEW.notas, NEW.diagnostico, NEW.recomend);
+END;
+
+-- Solo cuando cambia el texto (no con la columna version)
+CREATE TRIGGER IF NOT EXISTS TR_CONSULTAS_FTS_Actualizar AFTER UPDATE OF notas, diagnostico, recomend ON CONSULTAS
+BEGIN
+    INSERT INTO CONSULTAS_FTS (CONSULTAS_FTS, rowid, notas, diagnostico, recomend)
+    VALUES ('delete', OLD.IDconsulta, OLD.notas, OLD.diagnostico, OLD.recomend);
+    INSERT INTO CONSULTAS_FTS (rowid, notas, diagnostico, recomend)
+    VALUES (NEW.IDconsulta, NEW.notas, NEW.diagnostico, NEW.recomend);
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_CONSULTAS_FTS_Eliminar AFTER DELETE ON CONSULTAS
+BEGIN
+    INSERT INTO CONSULTAS_FTS (CONSULTAS_FTS, rowid, notas, diagnostico, recomend)
+    VALUES ('delete', OLD.IDconsulta, OLD.notas, OLD.diagnostico, OLD.recomend);
+END;
+
+-- ========================================================================
+-- RESÚMENES
+-- Totales por día para reportes y el panel principal (ResumenController):
+-- RESUMEN_CITAS cuenta citas por día, psicólogo, estado y modalidad;
+-- RESUMEN_PAGOS suma pagos por día, psicólogo, estatus y método. Los
+-- disparadores solo anotan en RESUMEN_PENDIENTES los días que cambiaron;
+-- ResumenController.actualizar_resumenes vuelve a calcular esos días antes
+-- de leer
+-- ========================================================================
+CREATE TABLE IF NOT EXISTS RESUMEN_CITAS (
+    fecha DATE NOT NULL,
+    IDpsicologo INTEGER NOT NULL,
+    estado VARCHAR(20) NOT NULL,
+    modalidad VARCHAR(20) NOT NULL,
+    citas INT NOT NULL,
+    PRIMARY KEY (fecha, IDpsicologo, estado, modalidad)
+);
+
+CREATE TABLE IF NOT EXISTS RESUMEN_PAGOS (
+    fecha DATE NOT NULL,
+    IDpsicologo INTEGER NOT NULL,
+    estatus_pago VARCHAR(20) NOT NULL,
+    metodo VARCHAR(20) NOT NULL,
+    pagos INT NOT NULL,
+    monto DECIMAL(12,2) NOT NULL,
+    PRIMARY KEY (fecha, IDpsicologo, estatus_pago, metodo)
+);
+
+CREATE TABLE IF NOT EXISTS RESUMEN_PENDIENTES (
+    IDpendiente INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha DATE NOT NULL
+);
+
+-- CITAS
+CREATE TRIGGER IF NOT EXISTS TR_CITAS_Resumen_Insertar AFTER INSERT ON CITAS
+BEGIN
+    INSERT INTO RESUMEN_PENDIENTES (fecha) VALUES (NEW.fecha);
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_CITAS_Resumen_Actualizar AFTER UPDATE OF fecha, IDpsicologo, estado, modalidad ON CITAS
+BEGIN
+    INSERT INTO RESUMEN_PENDIENTES (fecha) VALUES (OLD.fecha);
+    INSERT INTO RESUMEN_PENDIENTES (fecha) SELECT NEW.fecha WHERE NEW.fecha != OLD.fecha;
+    -- Los pagos se resumen por el psicólogo de su cita
+    INSERT INTO RESUMEN_PENDIENTES (fecha)
+    SELECT DISTINCT p.fecha_pago
+    FROM CONSULTAS co
+    INNER JOIN PAGOS p ON p.IDconsulta = co.IDconsulta
+    WHERE co.IDcita = NEW.IDcita AND NEW.IDpsicologo != OLD.IDpsicologo;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_CITAS_Resumen_Eliminar AFTER DELETE ON CITAS
+BEGIN
+    INSERT INTO RESUMEN_PENDIENTES (fecha) VALUES (OLD.fecha);
+END;
+
+-- PAGOS
+CREATE TRIGGER IF NOT EXISTS TR_PAGOS_Resumen_Insertar AFTER INSERT ON PAGOS
+BEGIN
+    INSERT INTO RESUMEN_PENDIENTES (fecha) VALUES (NEW.fecha_pago);
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_PAGOS_Resumen_Actualizar AFTER UPDATE OF fecha_pago, estatus_pago, metodo, monto ON PAGOS
+BEGIN
+    INSERT INTO RESUMEN_PENDIENTES (fecha) VALUES (OLD.fecha_pago);
+    INSERT INTO RESUMEN_PENDIENTES (fecha) SELECT NEW.fecha_pago WHERE NEW.fecha_pago != OLD.fecha_pago;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_PAGOS_Resumen_Eliminar AFTER DELETE ON PAGOS
+BEGIN
+    INSERT INTO RESUMEN_PENDIENTES (fecha) VALUES (OLD.fecha_pago);
+END;
+
+-- ========================================================================
+-- ÍNDICES para mejorar el rendimiento
+-- ========================================================================
+
+-- Índice para búsqueda de usuarios por correo
+CREATE INDEX IF NOT EXISTS IX_USUARIO_Correo ON USUARIO(correo);
+
+-- Índice para búsqueda de psicólogos por especialidad
+CREATE INDEX IF NOT EXISTS IX_PSICOLOGOS_Especialidad ON PSICOLOGOS(especialidad);
+
+-- Índice para búsqueda de citas por fecha
+-- (incluye IDcita implícitamente: sirve a la paginación de citas y consultas)
+CREATE INDEX IF NOT EXISTS IX_CITAS_Fecha ON CITAS(fecha, hora);
+
+-- Índice para detectar traslapes en la agenda de cada psicólogo
+-- (búsqueda por rango de hora dentro del día)
+CREATE INDEX IF NOT EXISTS IX_CITAS_Psicologo ON CITAS(IDpsicologo, fecha, hora, duracion);
+
+-- Un psicólogo no puede tener dos citas activas que empiecen a la misma hora
+-- (respaldo del INSERT condicional de CitaController.crear_cita)
+CREATE UNIQUE INDEX IF NOT EXISTS UX_CITAS_Horario ON CITAS(IDpsicologo, fecha, hora)
+WHERE estado != 'Cancelada';
+
+-- Índice para leer el horario semanal de un psicólogo
+CREATE INDEX IF NOT EXISTS IX_HORARIOS_Psicologo ON HORARIOS(IDpsicologo, dia_semana);
+
+-- Índice para búsqueda de citas por estado
+CREATE INDEX IF NOT EXISTS IX_CITAS_Estado ON CITAS(estado);
+
+-- Índice para el listado paginado de pacientes por nombre
+CREATE INDEX IF NOT EXISTS IX_PACIENTES_Nombre ON PACIENTES(nombre, IDpaciente);
+
+-- Índice para el listado paginado de pagos por fecha
+CREATE INDEX IF NOT EXISTS IX_PAGOS_Fecha ON PAGOS(fecha_pago, IDpago);
+
+-- ========================================================================
+-- DATOS INICIALES - Usuario administrador por defecto
+-- Contraseña: admin123 (encriptada en SHA256)
+-- ========================================================================
+INSERT OR IGNORE INTO USUARIO (nombre, correo, contraseña, rol)
+VALUES (
+    'Administrador',
+    'admin@sensorium.com',
+    '240be518fabd2724ddb6f04eeb1da5967448d7e831c08c8fa822809f74c720a9',  -- admin123 en SHA256
+    'administrador'
+);
+
+-- ========================================================================
+-- VISTAS útiles para consultas comunes
+-- ========================================================================
+
+-- Vista de citas con información completa
+DROP VIEW IF EXISTS V_CITAS_COMPLETAS;
+CREATE VIEW V_CITAS_COMPLETAS AS
+SELECT
+    c.IDcita,
+    c.fecha,
+    c.hora,
+    c.modalidad,
+    c.estado,
+    p.IDpaciente,
+    p.nombre AS nombre_paciente,
+    p.telefono AS telefono_paciente,
+    ps.IDpsicologo,
+    u.nombre AS nombre_psicologo,
+    ps.especialidad
+FROM CITAS c
+INNER JOIN PACIENTES p ON c.IDpaciente = p.IDpaciente
+INNER JOIN PSICOLOGOS ps ON c.IDpsicologo = ps.IDpsicologo
+INNER JOIN USUARIO u ON ps.IDusuario = u.IDusuario;
+
+-- Vista de consultas con información de pago
+DROP VIEW IF EXISTS V_CONSULTAS_PAGOS;
+CREATE VIEW V_CONSULTAS_PAGOS AS
+SELECT
+    co.IDconsulta,
+    co.notas,
+    co.diagnostico,
+    co.duracion,
+    c.fecha AS fecha_consulta,
+    p.nombre AS nombre_paciente,
+    u.nombre AS nombre_psicologo,
+    pg.IDpago,
+    pg.monto,
+    pg.metodo,
+    pg.estatus_pago,
+    pg.fecha_pago
+FROM CONSULTAS co
+INNER JOIN CITAS c ON co.IDcita = c.IDcita
+INNER JOIN PACIENTES p ON c.IDpaciente = p.IDpaciente
+INNER JOIN PSICOLOGOS ps ON c.IDpsicologo = ps.IDpsicologo
+INNER JOIN USUARIO u ON ps.IDusuario = u.IDusuario
+LEFT JOIN PAGOS pg ON co.IDconsulta = pg.IDconsulta;
@@ -4,8 +4,14 @@ class Cita:
     """
     Clase que representa una cita entre paciente y psicólogo
     """
+    __slots__ = (
+        'id_cita', 'id_paciente', 'id_psicologo', 'fecha', 'hora', 'modalidad', 'estado', 'duracion',
+        # Datos relacionados (se llenan al consultar)
+        'nombre_paciente', 'nombre_psicologo', 'especialidad'
+    )
+    
     def __init__(self, id_cita=None, id_paciente=None, id_psicologo=None,
-                 fecha=None, hora=None, modalidad=None, estado="Programada"):
+                 fecha=None, hora=None, modalidad=None, estado="Programada", duracion=None):
         self.id_cita = id_cita
         self.id_paciente = id_paciente  # Foreign Key a Paciente
         self.id_psicologo = id_psicologo  # Foreign Key a Psicologo
@@ -13,6 +19,7 @@ class Cita:
         self.hora = hora
         self.modalidad = modalidad  # 'Presencial', 'Virtual'
         self.estado = estado  # 'Programada', 'Completada', 'Cancelada'
+        self.duracion = duracion  # Minutos (None = CITAS_CONFIG['duracion_default'])
         
         # Datos relacionados (se llenan al consultar)
         self.nombre_paciente = None
@@ -35,6 +42,9 @@ class Cita:
         
         if self.modalidad not in ['Presencial', 'Virtual']:
             return False, "La modalidad debe ser Presencial o Virtual"
+            
+        if self.duracion is not None and not 0 < int(self.duracion) <= 240:
+            return False, "La duración debe estar entre 1 y 240 minutos"
         
         return True, "Datos válidos"
     
@@ -60,6 +70,7 @@ class Cita:
             'hora': str(self.hora) if self.hora else None,
             'modalidad': self.modalidad,
             'estado': self.estado,
+            'duracion': self.duracion,
             'nombre_paciente': self.nombre_paciente,
             'nombre_psicologo': self.nombre_psicologo,
             'especialidad': self.especialidad
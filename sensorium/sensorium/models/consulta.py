@@ -2,6 +2,13 @@ class Consulta:
     """
     Clase que representa una consulta realizada (sesión completada)
     """
+    __slots__ = (
+        'id_consulta', 'id_cita', 'notas', 'duracion', 'diagnostico', 'recomend',
+        # Datos relacionados (se llenan al consultar)
+        'fecha_cita', 'hora_cita', 'nombre_paciente', 'nombre_psicologo',
+        'relevancia'  # Solo en los resultados de ConsultaController.buscar_texto
+    )
+    
     def __init__(self, id_consulta=None, id_cita=None, notas=None,
                  duracion=None, diagnostico=None, recomend=None):
         self.id_consulta = id_consulta
@@ -13,8 +20,10 @@ class Consulta:
         
         # Datos relacionados (se llenan al consultar)
         self.fecha_cita = None
+        self.hora_cita = None
         self.nombre_paciente = None
         self.nombre_psicologo = None
+        self.relevancia = None
     
     def validar_datos(self):
         """Valida que los datos de la consulta sean correctos"""
@@ -4,6 +4,12 @@ class Historial:
     """
     Clase que representa el historial clínico de un paciente
     """
+    __slots__ = (
+        'id_historial', 'id_paciente', 'antecedentes', 'alergias', 'tratamientos', 'fecha_creacion',
+        # Datos relacionados (se llenan al consultar)
+        'nombre_paciente',
+    )
+    
     def __init__(self, id_historial=None, id_paciente=None, 
                  antecedentes=None, alergias=None, tratamientos=None,
                  fecha_creacion=None):
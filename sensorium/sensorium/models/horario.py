@@ -0,0 +1,47 @@
+from datetime import time
+
+class Horario:
+    """
+    Clase que representa un bloque del horario de atención semanal de un psicólogo
+    Un psicólogo puede tener varios bloques el mismo día (mañana y tarde)
+    """
+    __slots__ = ('id_horario', 'id_psicologo', 'dia_semana', 'hora_inicio', 'hora_fin')
+    
+    DIAS = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+    
+    def __init__(self, id_horario=None, id_psicologo=None, dia_semana=None,
+                 hora_inicio=None, hora_fin=None):
+        self.id_horario = id_horario
+        self.id_psicologo = id_psicologo  # Foreign Key a Psicologo
+        self.dia_semana = dia_semana  # 0 = lunes ... 6 = domingo (date.weekday())
+        self.hora_inicio = hora_inicio
+        self.hora_fin = hora_fin
+    
+    def validar_datos(self):
+        """Valida que los datos del bloque sean correctos"""
+        if not self.id_psicologo:
+            return False, "Debe asociarse a un psicólogo"
+            
+        if self.dia_semana not in range(7):
+            return False, "El día debe estar entre 0 (lunes) y 6 (domingo)"
+            
+        if not isinstance(self.hora_inicio, time) or not isinstance(self.hora_fin, time):
+            return False, "Las horas de inicio y fin son obligatorias"
+            
+        if self.hora_fin <= self.hora_inicio:
+            return False, "La hora de fin debe ser posterior a la de inicio"
+            
+        return True, "Datos válidos"
+    
+    def to_dict(self):
+        """Convierte el objeto a diccionario"""
+        return {
+            'id_horario': self.id_horario,
+            'id_psicologo': self.id_psicologo,
+            'dia_semana': self.dia_semana,
+            'hora_inicio': str(self.hora_inicio) if self.hora_inicio else None,
+            'hora_fin': str(self.hora_fin) if self.hora_fin else None
+        }
+    
+    def __str__(self):
+        return f"Horario({self.DIAS[self.dia_semana]} {self.hora_inicio}-{self.hora_fin})"
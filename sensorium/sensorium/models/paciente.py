@@ -4,6 +4,8 @@ class Paciente:
     """
     Clase que representa un paciente del consultorio
     """
+    __slots__ = ('id_paciente', 'nombre', 'correo', 'telefono', 'direccion', 'fecha_regist')
+    
     def __init__(self, id_paciente=None, nombre=None, correo=None, 
                  telefono=None, direccion=None, fecha_regist=None):
         self.id_paciente = id_paciente
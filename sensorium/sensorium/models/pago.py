@@ -5,6 +5,12 @@ class Pago:
     """
     Clase que representa un pago realizado por una consulta
     """
+    __slots__ = (
+        'id_pago', 'id_consulta', 'monto', 'metodo', 'fecha_pago', 'estatus_pago',
+        # Datos relacionados (se llenan al consultar)
+        'nombre_paciente', 'fecha_consulta'
+    )
+    
     def __init__(self, id_pago=None, id_consulta=None, monto=None,
                  metodo=None, fecha_pago=None, estatus_pago="Pendiente"):
         self.id_pago = id_pago
@@ -3,6 +3,12 @@ class Psicologo:
     Clase que representa un psicólogo del consultorio
     Relacionado con la tabla USUARIO
     """
+    __slots__ = (
+        'id_psicologo', 'id_usuario', 'especialidad', 'experiencia', 'cedula',
+        # Datos del usuario relacionado (se llenan al consultar)
+        'nombre', 'correo'
+    )
+    
     def __init__(self, id_psicologo=None, id_usuario=None, 
                  especialidad=None, experiencia=None, cedula=None):
         self.id_psicologo = id_psicologo
@@ -5,6 +5,8 @@ class Usuario:
     """
     Clase que representa un usuario del sistema SENSORIUM
     """
+    __slots__ = ('id_usuario', 'nombre', 'correo', 'contraseña', 'rol', 'fecha_regist')
+    
     def __init__(self, id_usuario=None, nombre=None, correo=None, 
                  contraseña=None, rol=None, fecha_regist=None):
         self.id_usuario = id_usuario
@@ -1,11 +1,11 @@
 """
-Script para inicializar la base de datos SENSORIUM en SQL Server
+Script para inicializar la base de datos SENSORIUM en SQL Server o SQLite
 Ejecuta el script SQL y crea todas las tablas necesarias
 """
 
-import pyodbc
 import os
 from config.settings import DATABASE_CONFIG, PATHS
+from config.motores import pyodbc
 
 def leer_script_sql():
     """Lee el archivo init_db.sql"""
@@ -205,10 +205,43 @@ def inicializar_base_datos():
         print("\nRevisa los mensajes de error anteriores")
         return False
 
+def inicializar_sqlite():
+    """
+    Inicializa la base de datos embebida (DATABASE_CONFIG['motor'] = 'sqlite')
+    Al conectar se aplica init_db_sqlite.sql si el archivo está vacío
+    """
+    from config.database import Database
+    
+    print("=" * 60)
+    print("INICIALIZACIÓN DE BASE DE DATOS SENSORIUM (SQLite)")
+    print("=" * 60)
+    
+    base = Database()
+    print(f"\nArchivo: {base.motor.ruta}")
+    
+    if not base.conectar():
+        return False
+        
+    tablas = ['USUARIO', 'PSICOLOGOS', 'PACIENTES', 'CITAS', 'CONSULTAS', 'PAGOS', 'HISTORIAL']
+    faltantes = [tabla for tabla in tablas if not base.tabla_existe(tabla)]
+    base.desconectar()
+    
+    if faltantes:
+        print(f"✗ Faltan tablas: {', '.join(faltantes)}")
+        return False
+        
+    print("✓ BASE DE DATOS INICIALIZADA CORRECTAMENTE")
+    print("  Usuario: admin@sensorium.com")
+    print("  Contraseña: admin123")
+    return True
+
 def main():
     """Punto de entrada del script"""
     try:
-        exito = inicializar_base_datos()
+        if DATABASE_CONFIG.get('motor') == 'sqlite':
+            exito = inicializar_sqlite()
+        else:
+            exito = inicializar_base_datos()
         
         if exito:
             print("\n✓ Proceso completado exitosamente")
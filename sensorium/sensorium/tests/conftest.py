@@ -0,0 +1,76 @@
+"""
+Fixtures de las pruebas
+Cada prueba usa una base SQLite temporal (como benchmark_memoria.py) para
+no tocar los datos reales
+
+Uso: python -m pytest tests
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DATABASE_CONFIG
+from config.database import Database
+from controllers.cita_controller import CitaController
+from controllers.paciente_controller import PacienteController
+
+
+@pytest.fixture
+def base(tmp_path):
+    """Base SQLite vacía (solo el esquema) en una carpeta temporal"""
+    config = dict(DATABASE_CONFIG, motor='sqlite', sqlite_archivo=str(tmp_path / 'pruebas.db'))
+    base = Database(config)
+    assert base.conectar()
+    yield base
+    base.desconectar()
+
+
+@pytest.fixture
+def datos(base):
+    """Un psicólogo y tres pacientes; devuelve sus IDs"""
+    id_usuario = base.insertar_retornando_id(
+        "INSERT INTO USUARIO (nombre, correo, contraseña, rol) VALUES (?, ?, ?, ?)",
+        ('Psicóloga de prueba', 'psicologa@prueba.com', 'x' * 64, 'psicologo'),
+        'IDusuario'
+    )
+    id_psicologo = base.insertar_retornando_id(
+        "INSERT INTO PSICOLOGOS (IDusuario, especialidad, cedula) VALUES (?, 'Clínica', '00000001')",
+        (id_usuario,), 'IDpsicologo'
+    )
+    pacientes = [
+        base.insertar_retornando_id(
+            "INSERT INTO PACIENTES (nombre, telefono, correo) VALUES (?, ?, ?)",
+            (nombre, f"55{i:08d}", f"paciente{i}@prueba.com"), 'IDpaciente'
+        )
+        for i, nombre in enumerate(['Ana López', 'Mario Pérez', 'María González'])
+    ]
+    return {'psicologo': id_psicologo, 'pacientes': pacientes}
+
+
+@pytest.fixture
+def citas(base):
+    """CitaController que usa la base temporal"""
+    controlador = CitaController()
+    controlador.db = base
+    controlador.resumen.db = base
+    return controlador
+
+
+@pytest.fixture
+def pacientes(base):
+    """PacienteController que usa la base temporal"""
+    controlador = PacienteController()
+    controlador.db = base
+    return controlador
+
+
+@pytest.fixture
+def lunes():
+    """Un lunes futuro (día de atención en el horario por defecto)"""
+    dia = date.today() + timedelta(days=7)
+    return dia - timedelta(days=dia.weekday())
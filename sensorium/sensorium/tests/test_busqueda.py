@@ -0,0 +1,92 @@
+"""
+Pruebas del índice de búsqueda de pacientes (IndiceBusqueda)
+"""
+
+import pytest
+
+from models.paciente import Paciente
+from utiles.busqueda import IndiceBusqueda, es_refinamiento
+from utiles.helpers import solo_digitos
+
+PACIENTES = [
+    Paciente(1, 'Mario Pérez', 'mperez@correo.com', '5511112222'),
+    Paciente(2, 'María González', 'maria.g@correo.com', '5522223333'),
+    Paciente(3, 'Ana Marín', 'ana@correo.com', '5533334444'),
+    Paciente(4, 'Luis Ortega', 'mar.luis@correo.com', '5544445555'),
+    Paciente(5, 'Mariana Ruiz', 'mruiz@correo.com', '5555556666'),
+    Paciente(6, 'José María López', 'jlopez@correo.com', '5566667777'),
+]
+
+
+def nombres(resultados):
+    return [paciente.nombre for paciente in resultados]
+
+
+@pytest.fixture
+def indice():
+    """Índice con los mismos campos que el de PacienteController"""
+    indice = IndiceBusqueda(lambda p: (p.nombre, (p.correo, solo_digitos(p.telefono))), precalculados=3)
+    indice.cargar((paciente.id_paciente, paciente) for paciente in PACIENTES)
+    return indice
+
+
+def test_ordena_por_puntaje_y_nombre(indice):
+    # Palabra completa del nombre, inicio en el nombre, palabra completa de
+    # otro campo, inicio en otro campo; empates por nombre normalizado
+    assert nombres(indice.buscar('maria')) == ['José María López', 'María González', 'Mariana Ruiz']
+    assert nombres(indice.buscar('mar')) == [
+        'Ana Marín', 'José María López', 'María González', 'Mariana Ruiz', 'Mario Pérez', 'Luis Ortega'
+    ]
+
+
+def test_acentos_mayusculas_y_varios_terminos(indice):
+    assert nombres(indice.buscar('GONZÁLEZ')) == ['María González']
+    assert nombres(indice.buscar('mar gon')) == ['María González']
+    assert nombres(indice.buscar('maria lo')) == ['José María López']
+    assert indice.buscar('mar xyz') == []
+    assert indice.buscar('  ') == []
+
+
+def test_telefono_y_correo(indice):
+    assert nombres(indice.buscar('55 2222-3')) == ['María González']
+    assert nombres(indice.buscar('mruiz')) == ['Mariana Ruiz']
+
+
+def test_limite_y_prefijos_precalculados(indice):
+    completos = nombres(indice.buscar('m', limite=10))
+    assert len(completos) == 6
+    # Los prefijos cortos usan los resultados precalculados (3) en el mismo orden
+    assert nombres(indice.buscar('m', limite=2)) == completos[:2]
+    assert nombres(indice.buscar('m', limite=3)) == completos[:3]
+    assert nombres(indice.buscar('mar', limite=2)) == ['Ana Marín', 'José María López']
+
+
+def test_refinamiento_entre_resultados_anteriores(indice):
+    anterior = indice.buscar('mar', limite=50)
+    ids = [paciente.id_paciente for paciente in anterior]
+    
+    assert es_refinamiento('maria g', 'mar')
+    assert not es_refinamiento('ana', 'mar')
+    for consulta in ('mari', 'maria g', 'mar correo'):
+        assert indice.buscar(consulta, entre=ids) == indice.buscar(consulta)
+        
+    # Solo se busca entre los IDs dados
+    assert nombres(indice.buscar('mari', entre=[1, 4])) == ['Mario Pérez']
+
+
+def test_altas_cambios_y_bajas(indice):
+    indice.agregar(7, Paciente(7, 'Marco Antonio Díaz', 'marco@correo.com', '5577778888'))
+    assert nombres(indice.buscar('marc')) == ['Marco Antonio Díaz']
+    assert 'Marco Antonio Díaz' in nombres(indice.buscar('m', limite=10))
+    
+    indice.agregar(2, Paciente(2, 'María Gómez', 'maria.g@correo.com', '5522223333'))
+    assert indice.buscar('gonzalez') == []
+    assert nombres(indice.buscar('gom')) == ['María Gómez']
+    
+    indice.quitar(1)
+    assert 'Mario Pérez' not in nombres(indice.buscar('m', limite=10))
+    
+    indice.aplicar([(8, Paciente(8, 'Ana Martínez', 'amtz@correo.com', '5588889999'))], [3], version=10)
+    assert nombres(indice.buscar('ana')) == ['Ana Martínez']
+    assert indice.version == 10
+    assert len(indice) == 6
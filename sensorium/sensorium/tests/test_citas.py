@@ -0,0 +1,201 @@
+"""
+Pruebas de la agenda: traslapes, horarios libres y paginación por clave
+"""
+
+from datetime import datetime, time, timedelta
+
+from models.cita import Cita
+from utiles.helpers import intervalo_cita
+
+
+def nueva_cita(datos, fecha, hora, duracion=60, paciente=0):
+    """Cita programada del psicólogo de prueba"""
+    return Cita(id_paciente=datos['pacientes'][paciente], id_psicologo=datos['psicologo'],
+                fecha=fecha, hora=hora, modalidad='Presencial', duracion=duracion)
+
+
+def contar_citas(base):
+    """Citas guardadas en la base"""
+    return base.ejecutar_consulta_una("SELECT COUNT(*) FROM CITAS")[0]
+
+
+# ===== TRASLAPES =====
+
+def test_intervalo_cita(lunes):
+    inicio, fin = intervalo_cita(lunes, '09:30', 45)
+    assert inicio == datetime.combine(lunes, time(9, 30))
+    assert fin == datetime.combine(lunes, time(10, 15))
+
+
+def test_traslapes_con_citas_existentes(citas, datos, lunes):
+    assert citas.crear_cita(nueva_cita(datos, lunes, '10:00'))[0]
+    psicologo = datos['psicologo']
+    
+    # Las citas contiguas no se traslapan
+    assert citas.verificar_disponibilidad(psicologo, lunes, '09:00', 60)
+    assert citas.verificar_disponibilidad(psicologo, lunes, '11:00', 30)
+    # Empieza antes y termina dentro, empieza dentro, la contiene
+    assert not citas.verificar_disponibilidad(psicologo, lunes, '09:30', 60)
+    assert not citas.verificar_disponibilidad(psicologo, lunes, '10:30', 30)
+    assert not citas.verificar_disponibilidad(psicologo, lunes, '09:00', 180)
+    # Otro día está libre
+    assert citas.verificar_disponibilidad(psicologo, lunes + timedelta(days=1), '10:00', 60)
+
+
+def test_traslape_con_cita_larga(citas, datos, lunes):
+    # Una cita que empezó hasta duracion_maxima minutos antes sigue ocupando
+    assert citas.crear_cita(nueva_cita(datos, lunes, '12:00', duracion=240))[0]
+    assert not citas.verificar_disponibilidad(datos['psicologo'], lunes, '15:30', 30)
+    assert citas.verificar_disponibilidad(datos['psicologo'], lunes, '16:00', 30)
+
+
+def test_canceladas_y_cita_excluida_no_ocupan(citas, datos, lunes):
+    exito, _, id_cita = citas.crear_cita(nueva_cita(datos, lunes, '10:00'))
+    assert exito
+    assert citas.verificar_disponibilidad(datos['psicologo'], lunes, '10:00', 60, excluir_cita=id_cita)
+    
+    assert citas.cancelar_cita(id_cita)[0]
+    assert citas.verificar_disponibilidad(datos['psicologo'], lunes, '10:00', 60)
+
+
+def test_crear_cita_rechaza_traslape(citas, datos, base, lunes):
+    assert citas.crear_cita(nueva_cita(datos, lunes, '10:00'))[0]
+    exito, _, id_cita = citas.crear_cita(nueva_cita(datos, lunes, '10:30', paciente=1))
+    assert not exito and id_cita is None
+    assert contar_citas(base) == 1
+
+
+def test_lote_con_traslape_no_guarda_ninguna(citas, datos, base, lunes):
+    lote = [nueva_cita(datos, lunes, '09:00'), nueva_cita(datos, lunes, '12:00'),
+            nueva_cita(datos, lunes, '12:30', paciente=1)]
+    exito, mensaje, creadas = citas.crear_citas_lote(lote)
+    assert not exito and creadas == 0
+    assert '12:30' in mensaje
+    assert contar_citas(base) == 0
+    
+    exito, _, creadas = citas.crear_citas_lote(lote[:2])
+    assert exito and creadas == 2
+    assert contar_citas(base) == 2
+
+
+# ===== HORARIOS LIBRES =====
+
+def horas_libres(citas, datos, fecha, duracion=60):
+    """Horas de inicio libres de un día"""
+    return [libre.hora for libre in citas.buscar_horarios_libres(
+        id_psicologo=datos['psicologo'], desde=fecha, hasta=fecha, duracion=duracion)]
+
+
+def test_horarios_libres_con_horario_por_defecto(citas, datos, lunes):
+    # 08:00 a 20:00 cada 30 minutos; la última cita de una hora empieza a las 19:00
+    horas = horas_libres(citas, datos, lunes)
+    assert horas[0] == time(8, 0) and horas[-1] == time(19, 0)
+    assert len(horas) == 23
+    
+    # El domingo no es día de atención
+    assert horas_libres(citas, datos, lunes + timedelta(days=6)) == []
+
+
+def test_horarios_libres_descuentan_citas(citas, datos, lunes):
+    assert citas.crear_cita(nueva_cita(datos, lunes, '10:00'))[0]
+    horas = horas_libres(citas, datos, lunes)
+    assert time(9, 0) in horas and time(11, 0) in horas
+    for ocupada in (time(9, 30), time(10, 0), time(10, 30)):
+        assert ocupada not in horas
+        
+    # Una cita de 15 minutos ocupa todo su intervalo de 30
+    assert citas.crear_cita(nueva_cita(datos, lunes, '15:00', duracion=15))[0]
+    assert time(15, 0) not in horas_libres(citas, datos, lunes, duracion=30)
+    assert time(15, 30) in horas_libres(citas, datos, lunes, duracion=30)
+
+
+def test_horarios_libres_con_bloques_del_psicologo(citas, datos, base, lunes):
+    base.ejecutar_lote(
+        "INSERT INTO HORARIOS (IDpsicologo, dia_semana, hora_inicio, hora_fin) VALUES (?, ?, ?, ?)",
+        [(datos['psicologo'], 0, time(9, 0), time(11, 0)), (datos['psicologo'], 0, time(16, 0), time(17, 0))]
+    )
+    assert horas_libres(citas, datos, lunes) == [time(9, 0), time(9, 30), time(10, 0), time(16, 0)]
+    assert horas_libres(citas, datos, lunes + timedelta(days=1)) == []
+    
+    libres = citas.buscar_horarios_libres(id_psicologo=datos['psicologo'], desde=lunes,
+                                          hasta=lunes + timedelta(days=14), limite=3)
+    assert [libre.hora for libre in libres] == [time(9, 0), time(9, 30), time(10, 0)]
+
+
+# ===== PAGINACIÓN POR CLAVE =====
+
+def test_paginacion_de_citas(citas, datos, base, lunes):
+    # Varias citas por día: las páginas se cortan a media fecha
+    base.ejecutar_lote(
+        "INSERT INTO CITAS (IDpaciente, IDpsicologo, fecha, hora, modalidad) VALUES (?, ?, ?, ?, ?)",
+        [(datos['pacientes'][i % 3], datos['psicologo'], lunes + timedelta(days=i % 4),
+          time(8 + i // 4), 'Presencial') for i in range(25)]
+    )
+    todas = [cita.id_cita for cita in citas.listar_citas()]
+    assert len(todas) == 25
+    
+    paginas = []
+    despues_de = None
+    while True:
+        pagina = citas.listar_citas(despues_de=despues_de, limite=7)
+        if not pagina:
+            break
+        paginas.append([cita.id_cita for cita in pagina])
+        ultima = pagina[-1]
+        despues_de = (ultima.fecha, ultima.hora, ultima.id_cita)
+        
+    assert [len(pagina) for pagina in paginas] == [7, 7, 7, 4]
+    assert [id_cita for pagina in paginas for id_cita in pagina] == todas
+
+
+def test_paginacion_de_pacientes(pacientes, base):
+    base.ejecutar_lote(
+        "INSERT INTO PACIENTES (nombre, telefono) VALUES (?, ?)",
+        [(f"Paciente {i % 6}", f"55{i:08d}") for i in range(20)]
+    )
+    todos = [paciente.id_paciente for paciente in pacientes.listar_pacientes(cache=False)]
+    
+    leidos = []
+    despues_de = None
+    while True:
+        pagina = pacientes.listar_pacientes(despues_de=despues_de, limite=6, cache=False)
+        if not pagina:
+            break
+        leidos.extend(paciente.id_paciente for paciente in pagina)
+        despues_de = (pagina[-1].nombre, pagina[-1].id_paciente)
+        
+    assert leidos == todos and len(leidos) == 20
+
+
+# ===== SERIES =====
+
+def test_serie_valida_cada_fecha(citas, datos, base, lunes):
+    # Tercera sesión (domingo) fuera de los días de atención y cuarta ocupada
+    assert citas.crear_cita(nueva_cita(datos, lunes + timedelta(days=30), '10:00', paciente=1))[0]
+    argumentos = (datos['pacientes'][0], datos['psicologo'], lunes, '10:00', 10, 4)
+    
+    exito, mensaje, ocurrencias = citas.crear_serie_citas(*argumentos)
+    assert not exito and mensaje.startswith('2 de 4')
+    assert [ocurrencia.disponible for ocurrencia in ocurrencias] == [True, True, False, False]
+    assert ocurrencias[2].motivo == "Fuera del horario de atención"
+    assert ocurrencias[3].motivo == "Choca con otra cita"
+    assert contar_citas(base) == 1
+    
+    exito, _, _ = citas.crear_serie_citas(*argumentos, omitir_conflictos=True)
+    assert exito
+    assert contar_citas(base) == 3
+
+
+def test_serie_respeta_bloques_y_fechas_pasadas(citas, datos, base, lunes):
+    base.ejecutar_query("INSERT INTO HORARIOS (IDpsicologo, dia_semana, hora_inicio, hora_fin) "
+                        "VALUES (?, 0, '09:00', '11:00')", (datos['psicologo'],))
+                        
+    # Los lunes de 09:00 a 11:00: una sesión de 90 minutos a las 10:00 no cabe
+    _, _, ocurrencias = citas.crear_serie_citas(datos['pacientes'][0], datos['psicologo'], lunes,
+                                               '10:00', 'Semanal', 2, duracion=90)
+    assert [ocurrencia.motivo for ocurrencia in ocurrencias] == ["Fuera del horario de atención"] * 2
+    
+    _, _, ocurrencias = citas.crear_serie_citas(datos['pacientes'][0], datos['psicologo'],
+                                               lunes - timedelta(days=14), '09:00', 'Semanal', 3)
+    assert [ocurrencia.motivo for ocurrencia in ocurrencias] == ["La fecha ya pasó", "La fecha ya pasó", None]
+    assert contar_citas(base) == 0
@@ -0,0 +1,134 @@
+"""
+Pruebas de la capa de datos: cambios incrementales (obtener_cambios) y
+caché de consultas con invalidación por tabla
+"""
+
+from config.cache import tablas_leidas, tablas_modificadas
+from controllers.cita_controller import SELECT_CITAS
+from models.cita import Cita
+
+
+def ids(objetos, atributo='id_paciente'):
+    return {getattr(objeto, atributo) for objeto in objetos}
+
+
+# ===== CAMBIOS INCREMENTALES =====
+
+def test_cambios_de_pacientes(pacientes, datos, base):
+    ana, mario, maria = datos['pacientes']
+    version = base.version_datos()
+    
+    sin_cambios = pacientes.listar_pacientes_cambios(version)
+    assert sin_cambios.actualizados == [] and sin_cambios.eliminados == set()
+    assert sin_cambios.version == version
+    
+    assert base.ejecutar_query("UPDATE PACIENTES SET telefono = '5599990000' WHERE IDpaciente = ?", (mario,))
+    assert base.ejecutar_query("DELETE FROM PACIENTES WHERE IDpaciente = ?", (maria,))
+    nuevo = base.insertar_retornando_id(
+        "INSERT INTO PACIENTES (nombre, telefono) VALUES ('Luis Ortega', '5512341234')", None, 'IDpaciente')
+        
+    cambios = pacientes.listar_pacientes_cambios(version)
+    assert ids(cambios.actualizados) == {mario, nuevo}
+    assert cambios.eliminados == {maria}
+    assert cambios.version > version
+    
+    # Desde la nueva versión ya no hay nada pendiente
+    siguiente = pacientes.listar_pacientes_cambios(cambios.version)
+    assert siguiente.actualizados == [] and siguiente.eliminados == set()
+    assert ana not in ids(cambios.actualizados)
+
+
+def test_cambios_respetan_los_filtros(pacientes, citas, datos, base, lunes):
+    ana, mario, _ = datos['pacientes']
+    version = base.version_datos()
+    
+    # Un paciente que deja de coincidir con la búsqueda sale como eliminado
+    assert base.ejecutar_query("UPDATE PACIENTES SET nombre = 'Ana Ruiz' WHERE IDpaciente = ?", (ana,))
+    assert base.ejecutar_query("UPDATE PACIENTES SET nombre = 'Mario Marín' WHERE IDpaciente = ?", (mario,))
+    cambios = pacientes.listar_pacientes_cambios(version, buscar='mar')
+    assert ids(cambios.actualizados) == {mario}
+    assert cambios.eliminados == {ana}
+    
+    # Una cita cancelada sale del listado de programadas
+    exito, _, id_cita = citas.crear_cita(Cita(id_paciente=ana, id_psicologo=datos['psicologo'], fecha=lunes,
+                                              hora='10:00', modalidad='Presencial'))
+    assert exito
+    version = base.version_datos()
+    assert citas.cancelar_cita(id_cita)[0]
+    
+    programadas = citas.listar_citas_cambios(version, estado='Programada')
+    assert programadas.actualizados == [] and programadas.eliminados == {id_cita}
+    canceladas = citas.listar_citas_cambios(version, estado='Cancelada')
+    assert ids(canceladas.actualizados, 'id_cita') == {id_cita}
+    assert canceladas.eliminados == set()
+
+
+# ===== CACHÉ DE CONSULTAS =====
+
+def leer(base, query):
+    """Consulta con caché; devuelve (filas, si salió de la caché)"""
+    aciertos = base.cache.aciertos
+    filas = base.ejecutar_consulta(query, cache=True)
+    return filas, base.cache.aciertos > aciertos
+
+
+def test_tablas_de_cada_sentencia():
+    assert tablas_leidas(SELECT_CITAS) == {'CITAS', 'PACIENTES', 'PSICOLOGOS', 'USUARIO'}
+    assert tablas_modificadas("UPDATE PACIENTES SET nombre = ?") == {'PACIENTES', 'CITAS', 'CONSULTAS',
+                                                                    'PAGOS', 'HISTORIAL'}
+    assert tablas_modificadas("INSERT INTO PAGOS (monto) VALUES (?)") == {'PAGOS'}
+    assert tablas_modificadas("EXEC sp_algo") is None
+
+
+def test_escritura_invalida_solo_sus_tablas(base, datos):
+    consulta_pacientes = "SELECT nombre FROM PACIENTES ORDER BY IDpaciente"
+    consulta_horarios = "SELECT COUNT(*) FROM HORARIOS"
+    
+    antes, en_cache = leer(base, consulta_pacientes)
+    assert not en_cache
+    assert leer(base, consulta_pacientes) == (antes, True)
+    leer(base, consulta_horarios)
+    
+    # Escribir en otra tabla no descarta el resultado
+    assert base.ejecutar_query("INSERT INTO HORARIOS (IDpsicologo, dia_semana, hora_inicio, hora_fin) "
+                               "VALUES (?, 0, '09:00', '10:00')", (datos['psicologo'],))
+    assert leer(base, consulta_pacientes) == (antes, True)
+    assert leer(base, consulta_horarios) == ([(1,)], False)
+    
+    # Escribir en PACIENTES sí, y se lee el dato nuevo
+    assert base.ejecutar_query("UPDATE PACIENTES SET nombre = 'Ana Ruiz' WHERE IDpaciente = ?",
+                               (datos['pacientes'][0],))
+    despues, en_cache = leer(base, consulta_pacientes)
+    assert not en_cache
+    assert despues[0] == ('Ana Ruiz',) and despues[1:] == antes[1:]
+
+
+def test_invalidacion_por_join_y_cascada(base, citas, datos, lunes):
+    consulta_citas = SELECT_CITAS + " ORDER BY c.IDcita"
+    assert citas.crear_cita(Cita(id_paciente=datos['pacientes'][0], id_psicologo=datos['psicologo'],
+                                 fecha=lunes, hora='10:00', modalidad='Presencial'))[0]
+    filas, _ = leer(base, consulta_citas)
+    assert len(filas) == 1
+    assert leer(base, consulta_citas)[1]
+    
+    # USUARIO solo aparece en un JOIN del listado de citas
+    assert base.ejecutar_query("UPDATE USUARIO SET nombre = 'Otra psicóloga'")
+    assert not leer(base, consulta_citas)[1]
+    
+    # Borrar el paciente borra sus citas en cascada
+    assert base.ejecutar_query("DELETE FROM PACIENTES WHERE IDpaciente = ?", (datos['pacientes'][0],))
+    assert leer(base, consulta_citas) == ([], False)
+
+
+def test_transaccion_invalida_al_confirmar(base, datos):
+    consulta = "SELECT COUNT(*) FROM PACIENTES"
+    assert leer(base, consulta) == ([(3,)], False)
+    
+    with base.transaccion():
+        assert base.ejecutar_query("INSERT INTO PACIENTES (nombre, telefono) VALUES ('Luis', '5512341234')")
+    assert leer(base, consulta) == ([(4,)], False)
+    
+    with base.transaccion():
+        assert base.ejecutar_query("INSERT INTO PACIENTES (nombre, telefono) VALUES ('Eva', '5543214321')")
+        base.cancelar_transaccion()
+    assert leer(base, consulta) == ([(4,)], False)
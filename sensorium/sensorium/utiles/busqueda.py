@@ -0,0 +1,488 @@
+"""
+Índice de búsqueda en memoria para buscar mientras se escribe
+Cada registro se parte en palabras normalizadas (sin acentos, en minúsculas);
+una lista ordenada de palabras permite encontrar con bisect todas las que
+empiezan con lo escrito, y cada palabra guarda la lista de sus registros ya
+ordenada por relevancia: se recorren solo los primeros resultados, sin
+recorrer la tabla en la base de datos ni puntuar todas las coincidencias
+"""
+
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import chain, product
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+from utiles.helpers import normalizar_texto, parece_telefono, solo_digitos
+
+_PATRON_PALABRA = re.compile(r'\w+')
+
+
+def palabras_de(texto: str) -> List[str]:
+    """Palabras normalizadas de un texto ('Ana.Núñez@correo.com' -> ana, nunez, correo, com)"""
+    if texto and texto.isascii():
+        return _PATRON_PALABRA.findall(texto.lower())
+    return _PATRON_PALABRA.findall(normalizar_texto(texto))
+
+
+def terminos_de(consulta: str) -> List[str]:
+    """
+    Términos de una búsqueda; un teléfono escrito con espacios o guiones
+    ('55 1234-56') es un solo término de dígitos
+    """
+    if parece_telefono(consulta):
+        return [solo_digitos(consulta)]
+    return _PATRON_PALABRA.findall(normalizar_texto(consulta))
+
+
+def es_refinamiento(consulta: str, anterior: str) -> bool:
+    """
+    Indica si una búsqueda solo agrega letras o palabras a otra
+    ('mar' -> 'maria g'): cada término anterior es el inicio de alguno nuevo,
+    así que sus resultados están entre los de la búsqueda anterior
+    """
+    nuevos = terminos_de(consulta)
+    previos = terminos_de(anterior)
+    return bool(nuevos) and bool(previos) and all(
+        any(nuevo.startswith(previo) for nuevo in nuevos) for previo in previos
+    )
+
+
+# Separación entre los rangos consecutivos al cargar: deja lugar para
+# insertar registros entre dos sin renumerar el índice
+_ESPACIO_RANGO = 1 << 16
+
+
+class _Campo:
+    """
+    Palabras de un campo, ordenadas, y los rangos de los registros que tienen
+    cada una (alineados con las palabras): las palabras que empiezan con un
+    término son un tramo contiguo de las dos listas
+    La mayoría de las palabras (correos, teléfonos) son de un solo registro:
+    se guarda el rango directamente y solo se crea una lista cuando se repite
+    """
+    
+    __slots__ = ('palabras', 'rangos')
+    
+    def __init__(self, rangos_por_palabra: dict = None):
+        """
+        Args:
+            rangos_por_palabra: palabra -> rango o lista ordenada de rangos
+        """
+        rangos_por_palabra = rangos_por_palabra or {}
+        self.palabras = sorted(rangos_por_palabra)
+        self.rangos = [rangos_por_palabra[palabra] for palabra in self.palabras]
+    
+    def exactos(self, palabra: str):
+        """Rangos de una palabra (rango, lista o None si no está)"""
+        posicion = bisect_left(self.palabras, palabra)
+        if posicion < len(self.palabras) and self.palabras[posicion] == palabra:
+            return self.rangos[posicion]
+        return None
+    
+    def tramo(self, termino: str) -> Tuple[int, int]:
+        """Posiciones de las palabras que empiezan con termino sin ser termino"""
+        inicio = bisect_left(self.palabras, termino)
+        if inicio < len(self.palabras) and self.palabras[inicio] == termino:
+            inicio += 1
+        return inicio, bisect_left(self.palabras, termino + '\uffff', inicio)
+    
+    def agregar(self, palabra: str, rango: int):
+        """Agrega el rango de un registro a una palabra, en su lugar"""
+        posicion = bisect_left(self.palabras, palabra)
+        if posicion == len(self.palabras) or self.palabras[posicion] != palabra:
+            self.palabras.insert(posicion, palabra)
+            self.rangos.insert(posicion, rango)
+            return
+        rangos = self.rangos[posicion]
+        if type(rangos) is list:
+            insort(rangos, rango)
+        elif rangos != rango:
+            self.rangos[posicion] = sorted((rangos, rango))
+    
+    def quitar(self, palabra: str, rango: int):
+        """Quita el rango de un registro de una palabra"""
+        posicion = bisect_left(self.palabras, palabra)
+        if posicion == len(self.palabras) or self.palabras[posicion] != palabra:
+            return
+        rangos = self.rangos[posicion]
+        if type(rangos) is list:
+            indice = bisect_left(rangos, rango)
+            if indice < len(rangos) and rangos[indice] == rango:
+                del rangos[indice]
+            if len(rangos) == 1:
+                self.rangos[posicion] = rangos[0]
+        elif rangos == rango:
+            del self.palabras[posicion]
+            del self.rangos[posicion]
+
+
+def _lista(rangos) -> list:
+    """Rangos guardados para una palabra como lista"""
+    if rangos is None:
+        return []
+    return rangos if type(rangos) is list else [rangos]
+
+
+def _patrones(terminos: List[str]) -> List[Tuple[str, str]]:
+    """(' termino', ' termino ') de cada término, para buscarlos en las palabras de un registro"""
+    return [(' ' + termino, ' ' + termino + ' ') for termino in terminos]
+
+
+def _puntajes(registro: tuple, patrones: List[Tuple[str, str]]):
+    """Puntaje de cada término en un registro (None si alguno no coincide)"""
+    _, palabras, otras, _ = registro
+    puntajes = []
+    for prefijo, completa in patrones:
+        if completa in palabras:
+            puntajes.append(0)
+        elif prefijo in palabras:
+            puntajes.append(1)
+        elif completa in otras:
+            puntajes.append(2)
+        elif prefijo in otras:
+            puntajes.append(3)
+        else:
+            return None
+    return tuple(puntajes)
+
+
+def _sin_repetidos(rangos: Iterable[int]) -> Iterator[int]:
+    """Quita los rangos repetidos de una secuencia ordenada"""
+    anterior = None
+    for rango in rangos:
+        if rango != anterior:
+            anterior = rango
+            yield rango
+
+
+class IndiceBusqueda:
+    """
+    Índice por prefijo de palabra, seguro entre hilos
+    Un registro coincide si cada término es el inicio de alguna de sus
+    palabras. Cada término suma al puntaje (menor es mejor):
+    0 palabra completa del campo principal, 1 inicio de una palabra del
+    campo principal, 2 palabra completa de otro campo, 3 inicio en otro campo.
+    Los empates se ordenan por el campo principal normalizado
+    
+    Cada registro tiene un rango entero que sigue ese orden de desempate, y
+    cada palabra guarda la lista ordenada de los rangos de sus registros, por
+    separado para el campo principal y para los otros. Así cada combinación
+    de puntajes por término sale ya ordenada de la lista más corta de la
+    combinación; se recorren de menor a mayor puntaje total y la búsqueda
+    termina al juntar el límite, sin puntuar todas las coincidencias
+    """
+    
+    def __init__(self, campos: Callable[[Any], Tuple[str, Iterable[str]]], precalculados: int = 50):
+        """
+        Args:
+            campos: Función objeto -> (texto principal, otros textos) a indexar
+            precalculados: Resultados que se guardan para los prefijos de una y dos
+                           letras (los que abarcan más registros)
+        """
+        self.campos = campos
+        self.precalculados = precalculados
+        self.version = None  # Versión de los datos indexados (Database.version_datos)
+        self.sincronizado = None  # time.monotonic() de la última carga o sincronización
+        
+        # id -> (objeto, ' palabras principales ', ' otras palabras ', rango)
+        # Las palabras van entre espacios: ' termino' in texto indica que alguna empieza con él
+        self._registros = {}
+        self._por_rango = {}  # rango -> registro
+        self._orden = []  # (' palabras principales ', id) de cada registro, ordenados
+        self._rangos = []  # Rango de cada elemento de self._orden (también ordenados)
+        
+        self._principales = _Campo()  # Palabras del campo principal
+        self._otras = _Campo()  # Palabras de los otros campos
+        
+        self._cortos = {}  # Prefijo de 1 o 2 letras -> rangos de sus mejores resultados
+        self._conjuntos = {}  # (puntaje 0 o 2, palabra) -> frozenset de rangos, para intersectar
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self._registros)
+    
+    @property
+    def cargado(self) -> bool:
+        """Indica si el índice ya se llenó con cargar()"""
+        return self.sincronizado is not None
+    
+    def cargar(self, elementos: Iterable[Tuple[int, Any]], version: int = None):
+        """
+        Reemplaza el contenido del índice
+        Args:
+            elementos: Pares (id, objeto)
+            version: Versión de los datos leídos
+        """
+        entradas = [self._entrada(objeto) + (id_registro,) for id_registro, objeto in elementos]
+        # Orden de desempate (palabras principales, id) en dos pasadas estables,
+        # más rápidas que comparar tuplas
+        entradas.sort(key=itemgetter(3))
+        entradas.sort(key=itemgetter(1))
+        
+        registros = {}
+        por_rango = {}
+        principales = {}
+        otras = {}
+        # Recorriendo los registros en orden las listas quedan ordenadas al agregarlas
+        for numero, (objeto, palabras, otras_palabras, id_registro) in enumerate(entradas, 1):
+            rango = numero * _ESPACIO_RANGO
+            registros[id_registro] = por_rango[rango] = (objeto, palabras, otras_palabras, rango)
+            for rangos_por_palabra, texto in ((principales, palabras), (otras, otras_palabras)):
+                for palabra in set(texto.split()):
+                    rangos = rangos_por_palabra.get(palabra)
+                    if rangos is None:
+                        rangos_por_palabra[palabra] = rango
+                    elif type(rangos) is list:
+                        rangos.append(rango)
+                    else:
+                        rangos_por_palabra[palabra] = [rangos, rango]
+                
+        with self._lock:
+            self._registros = registros
+            self._por_rango = por_rango
+            self._orden = [(entrada[1], entrada[3]) for entrada in entradas]
+            self._rangos = sorted(por_rango)
+            self._principales = _Campo(principales)
+            self._otras = _Campo(otras)
+            self._cortos = {}
+            self._conjuntos = {}
+            for prefijo in {palabra[:largo] for palabra in principales for largo in (1, 2)}:
+                self._precalcular(prefijo)
+            self.version = version
+            self.sincronizado = time.monotonic()
+    
+    def agregar(self, id_registro: int, objeto: Any):
+        """Agrega un registro o reemplaza el que tenga el mismo ID"""
+        objeto, palabras, otras = self._entrada(objeto)
+        with self._lock:
+            self._quitar(id_registro)
+            
+            # El rango queda entre los de sus vecinos en el orden de desempate
+            posicion = bisect_left(self._orden, (palabras, id_registro))
+            anterior = self._rangos[posicion - 1] if posicion else 0
+            siguiente = self._rangos[posicion] if posicion < len(self._rangos) else anterior + 2 * _ESPACIO_RANGO
+            if siguiente - anterior < 2:
+                self._renumerar()
+                anterior = self._rangos[posicion - 1] if posicion else 0
+                siguiente = self._rangos[posicion] if posicion < len(self._rangos) else anterior + 2 * _ESPACIO_RANGO
+            rango = (anterior + siguiente) // 2
+            
+            registro = (objeto, palabras, otras, rango)
+            self._registros[id_registro] = self._por_rango[rango] = registro
+            self._orden.insert(posicion, (palabras, id_registro))
+            self._rangos.insert(posicion, rango)
+            for puntaje, texto in ((0, palabras), (2, otras)):
+                campo = self._campo(puntaje)
+                for palabra in set(texto.split()):
+                    campo.agregar(palabra, rango)
+            self._descartar_precalculados(registro)
+    
+    def quitar(self, id_registro: int):
+        """Quita un registro del índice (si está)"""
+        with self._lock:
+            self._quitar(id_registro)
+    
+    def aplicar(self, actualizados: Iterable[Tuple[int, Any]], eliminados: Iterable[int], version: int):
+        """
+        Aplica los cambios de una sincronización
+        Args:
+            actualizados: Pares (id, objeto) nuevos o modificados
+            eliminados: IDs borrados
+            version: Versión de los datos después de los cambios
+        """
+        with self._lock:
+            for id_registro in eliminados:
+                self._quitar(id_registro)
+            for id_registro, objeto in actualizados:
+                self.agregar(id_registro, objeto)
+            self.version = version
+            self.sincronizado = time.monotonic()
+    
+    def buscar(self, consulta: str, limite: int = 50, entre: Iterable[int] = None) -> list:
+        """
+        Busca registros cuyo contenido empiece con cada término escrito
+        Args:
+            consulta: Texto escrito por el usuario (acentos y mayúsculas no importan)
+            limite: Número máximo de resultados
+            entre: IDs a los que se limita la búsqueda (los de una búsqueda
+                   anterior que esta refina); None para buscar en todo el índice
+        Returns:
+            list: Objetos ordenados del más al menos relevante
+        """
+        terminos = terminos_de(consulta)
+        if not terminos:
+            return []
+        
+        with self._lock:
+            if entre is not None:
+                rangos = self._ordenar_entre(terminos, entre, limite)
+            elif len(terminos) == 1 and len(terminos[0]) <= 2 and limite <= self.precalculados:
+                rangos = self._precalcular(terminos[0])[:limite]
+            else:
+                rangos = self._buscar_por_puntaje(terminos, limite)
+            return [self._por_rango[rango][0] for rango in rangos]
+                        
+    # ===== BÚSQUEDA (con el lock tomado) =====
+                    
+    def _buscar_por_puntaje(self, terminos: List[str], limite: int) -> List[int]:
+        """
+        Rangos de los mejores registros, de menor a mayor puntaje total
+        Cada combinación de puntajes por término (0, 1, 0...) sale de la lista
+        más corta de la combinación; las del mismo total se mezclan por rango y
+        no se pasa al siguiente total si ya se juntó el límite
+        """
+        tamaños = {}
+                    
+        def tamaño(posicion: int, puntaje: int) -> int:
+            if (posicion, puntaje) not in tamaños:
+                tamaños[posicion, puntaje] = self._tamaño(terminos[posicion], puntaje)
+            return tamaños[posicion, puntaje]
+    
+        niveles = [[] for _ in range(3 * len(terminos) + 1)]
+        for puntajes in product(range(4), repeat=len(terminos)):
+            niveles[sum(puntajes)].append(puntajes)
+            
+        rangos = []
+        for combinaciones in niveles:
+            flujos = []
+            for puntajes in combinaciones:
+                if all(tamaño(posicion, puntaje) for posicion, puntaje in enumerate(puntajes)):
+                    guia = min(range(len(terminos)), key=lambda posicion: tamaño(posicion, puntajes[posicion]))
+                    flujos.append(self._coincidencias(terminos, puntajes, guia))
+            for rango in heapq.merge(*flujos):
+                rangos.append(rango)
+                if len(rangos) == limite:
+                    return rangos
+        return rangos
+    
+    def _coincidencias(self, terminos: List[str], puntajes: tuple, guia: int) -> Iterator[int]:
+        """
+        Rangos, en orden, de los registros cuyos puntajes por término son exactamente puntajes
+        La lista guía se intersecta primero con las de los términos que deben
+        ser palabra completa (sin recorrerlas en Python); solo los rangos que
+        quedan se revisan término por término
+        """
+        rangos = self._rangos_termino(terminos[guia], puntajes[guia])
+        for posicion, puntaje in enumerate(puntajes):
+            if posicion != guia and puntaje % 2 == 0:
+                rangos = filter(self._conjunto(terminos[posicion], puntaje).__contains__, rangos)
+                
+        patrones = _patrones(terminos)
+        por_rango = self._por_rango
+        for rango in rangos:
+            if _puntajes(por_rango[rango], patrones) == puntajes:
+                yield rango
+    
+    def _rangos_termino(self, termino: str, puntaje: int) -> Iterator[int]:
+        """
+        Rangos ordenados de los registros que tienen un término con un puntaje
+        (o con uno menor: _coincidencias los descarta)
+        """
+        campo = self._campo(puntaje)
+        if puntaje % 2 == 0:
+            return iter(_lista(campo.exactos(termino)))
+            
+        inicio, fin = campo.tramo(termino)
+        encontradas = campo.rangos[inicio:fin]
+        if len(encontradas) == 1:
+            return iter(_lista(encontradas[0]))
+        if len(encontradas) > 64:
+            # Muchas palabras de pocos registros (correos, teléfonos): ordenar
+            # todos los rangos juntos es más rápido que mezclar tantas listas
+            todos = [rangos for rangos in encontradas if type(rangos) is not list]
+            todos.extend(chain.from_iterable(rangos for rangos in encontradas if type(rangos) is list))
+            todos.sort()
+            return _sin_repetidos(todos)
+        return _sin_repetidos(heapq.merge(*map(_lista, encontradas)))
+    
+    def _tamaño(self, termino: str, puntaje: int) -> int:
+        """Registros que pueden tener un término con un puntaje (se deja de contar en 64 palabras)"""
+        campo = self._campo(puntaje)
+        if puntaje % 2 == 0:
+            return len(_lista(campo.exactos(termino)))
+            
+        inicio, fin = campo.tramo(termino)
+        if fin - inicio > 64:
+            return len(self._registros) + fin - inicio
+        return sum(len(_lista(rangos)) for rangos in campo.rangos[inicio:fin])
+    
+    def _conjunto(self, termino: str, puntaje: int) -> frozenset:
+        """Rangos de los registros que tienen el término como palabra completa en el campo del puntaje"""
+        conjunto = self._conjuntos.get((puntaje, termino))
+        if conjunto is None:
+            conjunto = frozenset(_lista(self._campo(puntaje).exactos(termino)))
+            self._conjuntos[puntaje, termino] = conjunto
+        return conjunto
+    
+    def _ordenar_entre(self, terminos: List[str], entre: Iterable[int], limite: int) -> List[int]:
+        """Rangos de los mejores registros entre unos IDs (los de una búsqueda anterior)"""
+        patrones = _patrones(terminos)
+        resultados = []
+        for id_registro in entre:
+            registro = self._registros.get(id_registro)
+            if registro is not None:
+                puntajes = _puntajes(registro, patrones)
+                if puntajes is not None:
+                    resultados.append((sum(puntajes), registro[3]))
+        return [resultado[1] for resultado in heapq.nsmallest(limite, resultados)]
+    
+    def _precalcular(self, prefijo: str) -> List[int]:
+        """Mejores resultados de un prefijo de 1 o 2 letras (se guardan hasta que cambie alguno de sus registros)"""
+        rangos = self._cortos.get(prefijo)
+        if rangos is None:
+            rangos = self._cortos[prefijo] = self._buscar_por_puntaje([prefijo], self.precalculados)
+        return rangos
+        
+    # ===== MANTENIMIENTO (con el lock tomado) =====
+    
+    def _entrada(self, objeto: Any) -> tuple:
+        """(objeto, ' palabras principales ', ' otras palabras ') de un objeto"""
+        principal, otros = self.campos(objeto)
+        otras = ' '.join(palabra for texto in otros for palabra in palabras_de(texto))
+        return objeto, f" {' '.join(palabras_de(principal))} ", f" {otras} "
+    
+    def _quitar(self, id_registro: int):
+        """Quita un registro"""
+        registro = self._registros.pop(id_registro, None)
+        if registro is None:
+            return
+        _, palabras, otras, rango = registro
+        del self._por_rango[rango]
+        posicion = bisect_left(self._rangos, rango)
+        del self._orden[posicion]
+        del self._rangos[posicion]
+        for puntaje, texto in ((0, palabras), (2, otras)):
+            campo = self._campo(puntaje)
+            for palabra in set(texto.split()):
+                campo.quitar(palabra, rango)
+        self._descartar_precalculados(registro)
+    
+    def _renumerar(self):
+        """Vuelve a separar los rangos (cuando ya no cabe uno entre dos vecinos)"""
+        nuevos = {rango: numero * _ESPACIO_RANGO for numero, rango in enumerate(self._rangos, 1)}
+        self._rangos = [nuevos[rango] for rango in self._rangos]
+        for id_registro, (objeto, palabras, otras, rango) in list(self._registros.items()):
+            self._registros[id_registro] = (objeto, palabras, otras, nuevos[rango])
+        self._por_rango = {registro[3]: registro for registro in self._registros.values()}
+        # El orden se conserva: las listas siguen ordenadas
+        for campo in (self._principales, self._otras):
+            campo.rangos = [[nuevos[rango] for rango in rangos] if type(rangos) is list else nuevos[rangos]
+                            for rangos in campo.rangos]
+        self._cortos = {prefijo: [nuevos[rango] for rango in rangos] for prefijo, rangos in self._cortos.items()}
+        self._conjuntos = {}
+    
+    def _descartar_precalculados(self, registro: tuple):
+        """Olvida los resultados y conjuntos precalculados que pueden incluir un registro"""
+        for puntaje, texto in ((0, registro[1]), (2, registro[2])):
+            for palabra in texto.split():
+                self._cortos.pop(palabra[:1], None)
+                self._cortos.pop(palabra[:2], None)
+                self._conjuntos.pop((puntaje, palabra), None)
+
+    def _campo(self, puntaje: int) -> _Campo:
+        """Campo al que corresponde un puntaje"""
+        return self._principales if puntaje < 2 else self._otras
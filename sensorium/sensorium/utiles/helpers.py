@@ -0,0 +1,103 @@
+"""
+Funciones auxiliares compartidas por controladores y vistas
+"""
+
+import re
+import unicodedata
+from datetime import date, datetime, time, timedelta
+
+
+def convertir_hora(valor) -> time:
+    """
+    Normaliza una hora a datetime.time
+    Acepta time, datetime o texto 'HH:MM' / 'HH:MM:SS' (como llega de los formularios)
+    Args:
+        valor: Hora a convertir
+    Returns:
+        time: Hora normalizada o None si no hay valor
+    """
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, datetime):
+        return valor.time()
+    if isinstance(valor, time):
+        return valor
+    return time.fromisoformat(str(valor).strip())
+
+
+# Marcas diacríticas combinables (acentos, tilde, diéresis) que deja NFKD
+_PATRON_DIACRITICOS = re.compile('[\u0300-\u036f]')
+
+
+def normalizar_texto(texto) -> str:
+    """
+    Texto para comparar en búsquedas: sin acentos, en minúsculas y con los
+    espacios unidos ('José  Núñez' -> 'jose nunez')
+    Args:
+        texto: Texto a normalizar (None se toma como vacío)
+    Returns:
+        str: Texto normalizado
+    """
+    if not texto:
+        return ''
+    texto = str(texto)
+    if texto.isascii():
+        return ' '.join(texto.lower().split())
+    sin_acentos = _PATRON_DIACRITICOS.sub('', unicodedata.normalize('NFKD', texto))
+    if not sin_acentos.isascii():
+        # Otras marcas combinables (poco comunes): se revisa carácter por carácter
+        sin_acentos = ''.join(c for c in sin_acentos if not unicodedata.combining(c))
+    return ' '.join(sin_acentos.casefold().split())
+
+
+def solo_digitos(texto) -> str:
+    """Deja solo los dígitos de un texto ('55 1234-5678' -> '5512345678')"""
+    return re.sub(r'\D', '', str(texto)) if texto else ''
+
+
+def parece_telefono(texto) -> bool:
+    """Indica si un texto tiene solo dígitos y separadores de teléfono ('(55) 1234-56')"""
+    return bool(texto) and bool(re.match(r'^[\d\s()+.-]+$', str(texto))) and bool(solo_digitos(texto))
+
+
+def normalizar_cedula(cedula) -> str:
+    """Cédula sin espacios, guiones ni puntos y en minúsculas (como PSICOLOGOS.cedula_busqueda)"""
+    return re.sub(r'[\s.-]', '', str(cedula)).lower() if cedula else ''
+
+
+def intervalo_cita(fecha: date, hora, duracion: int) -> tuple:
+    """
+    Intervalo que ocupa una cita: [inicio, fin)
+    Args:
+        fecha: Fecha de la cita
+        hora: Hora de inicio (time o 'HH:MM')
+        duracion: Duración en minutos
+    Returns:
+        tuple: (inicio: datetime, fin: datetime)
+    """
+    inicio = datetime.combine(fecha, convertir_hora(hora))
+    return inicio, inicio + timedelta(minutes=duracion)
+
+
+def condicion_despues_de(columnas: list, valores, descendente: bool = False) -> tuple:
+    """
+    Arma la condición de paginación por clave (keyset) para un ORDER BY
+    La comparación de tuplas se expande en OR/AND y se antepone un rango
+    sobre la primera columna para que ambos motores busquen en el índice
+    en lugar de recorrer las páginas anteriores
+    Args:
+        columnas: Columnas del ORDER BY, terminando en el ID (desempate)
+        valores: Valores de esas columnas en la última fila de la página anterior
+        descendente: True si el ORDER BY es DESC
+    Returns:
+        tuple: (condicion: str, parametros: list)
+    """
+    operador = '<' if descendente else '>'
+    condicion = f"{columnas[-1]} {operador} ?"
+    parametros = [valores[-1]]
+    
+    for columna, valor in zip(reversed(columnas[:-1]), reversed(valores[:-1])):
+        condicion = f"{columna} {operador} ? OR ({columna} = ? AND ({condicion}))"
+        parametros = [valor, valor] + parametros
+        
+    return f"({columnas[0]} {operador}= ? AND ({condicion}))", [valores[0]] + parametros
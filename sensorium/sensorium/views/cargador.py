@@ -0,0 +1,167 @@
+"""
+Carga de datos en segundo plano para las vistas
+Las consultas a la base de datos se ejecutan en un pool de hilos y su
+resultado regresa al hilo de Tk por una cola que se revisa con after();
+la ventana sigue respondiendo mientras el servidor contesta
+"""
+
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import UI_CONFIG
+
+# Un solo pool para todas las vistas (se crea con la primera carga)
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def _obtener_pool() -> ThreadPoolExecutor:
+    """Pool de hilos compartido por todos los cargadores"""
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=UI_CONFIG.get('hilos_carga', 4),
+                                       thread_name_prefix='carga')
+        return _pool
+
+
+class CargadorAsincrono:
+    """
+    Ejecuta funciones fuera del hilo de Tk y entrega su resultado en él
+    Cada carga tiene un nombre ('citas', 'estadisticas'...): si se pide otra
+    con el mismo nombre antes de que llegue la anterior, el resultado de la
+    anterior se descarta. Tampoco se entrega nada si el widget de la vista
+    ya se destruyó (por ejemplo al cambiar de módulo)
+    """
+    
+    def __init__(self, widget, intervalo: int = None):
+        """
+        Args:
+            widget: Widget de la vista; los resultados solo se entregan mientras exista
+            intervalo: Milisegundos entre revisiones de la cola (por defecto UI_CONFIG)
+        """
+        self.widget = widget
+        self.intervalo = intervalo or UI_CONFIG.get('intervalo_carga', 30)
+        
+        # after() se programa en la ventana principal: las llamadas pendientes
+        # de un widget destruido fallarían en Tk
+        self._raiz = widget.winfo_toplevel()
+        self._cola = queue.Queue()
+        self._turnos = {}  # nombre -> número de la última carga pedida
+        self._indicadores = {}  # nombre -> Label "Cargando..." mostrado
+        self._en_curso = set()  # Nombres cuya última carga no se ha entregado
+        self._pendientes = 0  # Cargas enviadas al pool que no han vuelto
+        self._revisando = False
+    
+    def ejecutar(self, nombre: str, funcion, al_terminar, al_fallar=None, indicador=None):
+        """
+        Ejecuta funcion() en un hilo del pool
+        Args:
+            nombre: Nombre de la carga; una nueva con el mismo nombre reemplaza a la anterior
+            funcion: Función sin argumentos (no debe tocar widgets)
+            al_terminar: Función que recibe el resultado, en el hilo de Tk
+            al_fallar: Función que recibe la excepción, en el hilo de Tk (por defecto se imprime)
+            indicador: Widget sobre el que se muestra "Cargando..." mientras tanto (opcional)
+        """
+        turno = self._turnos.get(nombre, 0) + 1
+        self._turnos[nombre] = turno
+        self._en_curso.add(nombre)
+        
+        if indicador is not None and nombre not in self._indicadores:
+            self._indicadores[nombre] = self._mostrar_indicador(indicador)
+            
+        self._pendientes += 1
+        _obtener_pool().submit(self._trabajar, nombre, turno, funcion, al_terminar, al_fallar)
+        self._programar_revision()
+    
+    def cargando(self, nombre: str) -> bool:
+        """Indica si hay una carga con ese nombre sin entregar"""
+        return nombre in self._en_curso
+    
+    def cancelar(self, nombre: str = None):
+        """
+        Descarta el resultado de las cargas en curso (la consulta termina igual,
+        pero su resultado no se entrega)
+        Args:
+            nombre: Carga a cancelar; None para todas
+        """
+        for clave in ([nombre] if nombre else list(self._turnos)):
+            self._turnos[clave] = self._turnos.get(clave, 0) + 1
+            self._en_curso.discard(clave)
+            self._quitar_indicador(clave)
+            
+    # ===== HILO DEL POOL =====
+    
+    def _trabajar(self, nombre: str, turno: int, funcion, al_terminar, al_fallar):
+        """Ejecuta la función y deja el resultado en la cola"""
+        try:
+            self._cola.put((nombre, turno, al_terminar, funcion()))
+        except Exception as e:
+            self._cola.put((nombre, turno, al_fallar or self._informar_error, e))
+            
+    # ===== HILO DE TK =====
+    
+    def _programar_revision(self):
+        """Revisa la cola cada self.intervalo ms mientras haya cargas en curso"""
+        if not self._revisando:
+            self._revisando = True
+            self._raiz.after(self.intervalo, self._revisar)
+    
+    def _revisar(self):
+        """Entrega los resultados que ya llegaron"""
+        self._revisando = False
+        vigente = self._vigente()
+        
+        while True:
+            try:
+                nombre, turno, entregar, resultado = self._cola.get_nowait()
+            except queue.Empty:
+                break
+                
+            self._pendientes -= 1
+            if not vigente or turno != self._turnos.get(nombre):
+                continue  # La vista ya no existe o hubo una carga más nueva
+                
+            self._en_curso.discard(nombre)
+            self._quitar_indicador(nombre)
+            try:
+                entregar(resultado)
+            except Exception as e:
+                print(f"Error al mostrar carga '{nombre}': {e}")
+                
+        if self._pendientes > 0:
+            self._programar_revision()
+    
+    def _vigente(self) -> bool:
+        """Indica si el widget de la vista sigue existiendo"""
+        try:
+            return bool(self.widget.winfo_exists())
+        except tk.TclError:
+            return False
+    
+    def _mostrar_indicador(self, widget) -> tk.Label:
+        """Muestra "Cargando..." centrado sobre un widget"""
+        etiqueta = tk.Label(
+            widget,
+            text="⏳ Cargando...",
+            font=('Arial', 11),
+            bg='white',
+            fg='#64748b'
+        )
+        etiqueta.place(relx=0.5, rely=0.5, anchor='center')
+        return etiqueta
+    
+    def _quitar_indicador(self, nombre: str):
+        """Quita el "Cargando..." de una carga (si se mostró)"""
+        etiqueta = self._indicadores.pop(nombre, None)
+        if etiqueta is not None:
+            try:
+                etiqueta.destroy()
+            except tk.TclError:
+                pass  # Se destruyó con la vista
+    
+    @staticmethod
+    def _informar_error(error: Exception):
+        """Manejo de errores por defecto (la carga no indicó al_fallar)"""
+        print(f"Error en carga en segundo plano: {error}")
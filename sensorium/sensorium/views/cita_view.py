@@ -10,6 +10,11 @@ from controllers.cita_controller import CitaController
 from controllers.paciente_controller import PacienteController
 from controllers.psicologo_controller import PsicologoController
 from models.cita import Cita
+from views.paginador import Paginador
+from views.sincronizador import SincronizadorTabla
+from views.tabla_virtual import TablaVirtual
+from views.cargador import CargadorAsincrono
+from config.settings import CITAS_CONFIG
 
 class CitaView:
     """Ventana para gestionar citas"""
@@ -20,9 +25,6 @@ class CitaView:
         self.paciente_controller = PacienteController()
         self.psicologo_controller = PsicologoController()
         
-        # Variables
-        self.cita_seleccionada = None
-        
         # Crear interfaz
         self.crear_widgets()
         
@@ -131,31 +133,18 @@ class CitaView:
         filtro_combo.pack(side=tk.RIGHT)
         filtro_combo.bind('<<ComboboxSelected>>', lambda e: self.filtrar_citas())
         
+        # ===== PAGINACIÓN =====
+        self.paginador = Paginador(self.parent_frame, self.cargar_citas)
+        self.paginador.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+        
         # ===== TABLA DE CITAS =====
         table_frame = tk.Frame(self.parent_frame, bg='white', relief='solid', bd=1)
         table_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Scrollbars
-        vsb = ttk.Scrollbar(table_frame, orient="vertical")
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        hsb = ttk.Scrollbar(table_frame, orient="horizontal")
-        hsb.pack(side=tk.BOTTOM, fill=tk.X)
-        
-        # Treeview
+        # Tabla virtual: solo se crean en el Treeview los renglones visibles
         columnas = ('ID', 'Fecha', 'Hora', 'Paciente', 'Psicólogo', 'Especialidad', 'Modalidad', 'Estado')
         
-        self.tree = ttk.Treeview(
-            table_frame,
-            columns=columnas,
-            show='headings',
-            yscrollcommand=vsb.set,
-            xscrollcommand=hsb.set,
-            selectmode='browse'
-        )
-        
-        vsb.config(command=self.tree.yview)
-        hsb.config(command=self.tree.xview)
+        self.tree = TablaVirtual(table_frame, columnas)
         
         # Configurar columnas
         self.tree.heading('ID', text='ID')
@@ -185,73 +174,95 @@ class CitaView:
         
         # Bind eventos
         self.tree.bind('<Double-1>', lambda e: self.editar_cita())
-        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+    
+        # Las lecturas se hacen en segundo plano mientras exista la tabla
+        self.cargador = CargadorAsincrono(self.tree)
+        
+        # Las filas usan el ID de la cita como iid para aplicar cambios
+        self.sincronizador = SincronizadorTabla(
+            self.tree,
+            lambda c: c.id_cita,
+            self.fila_cita,
+            lambda c: (c.fecha, c.hora, c.id_cita),
+            descendente=True
+        )
+    
+    def fila_cita(self, cita) -> tuple:
+        """Valores y tags de la fila de una cita"""
+        return (
+            cita.id_cita,
+            cita.fecha,
+            cita.hora,
+            cita.nombre_paciente or '',
+            cita.nombre_psicologo or '',
+            cita.especialidad or '',
+            cita.modalidad,
+            cita.estado
+        ), (cita.estado,)
+    
+    def estado_filtrado(self):
+        """Estado elegido en el filtro (None para todas)"""
+        estado = self.filtro_var.get()
+        return None if estado == "Todas" else estado
     
     def cargar_citas(self):
-        """Carga todas las citas en la tabla"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        try:
-            citas = self.controller.listar_citas()
-            
-            for cita in citas:
-                tag = cita.estado
-                self.tree.insert('', tk.END, values=(
-                    cita.id_cita,
-                    cita.fecha,
-                    cita.hora,
-                    cita.nombre_paciente or '',
-                    cita.nombre_psicologo or '',
-                    cita.especialidad or '',
-                    cita.modalidad,
-                    cita.estado
-                ), tags=(tag,))
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar citas:\n{str(e)}")
+        """Pide en segundo plano la página actual de citas (con el filtro de estado elegido)"""
+        estado = self.estado_filtrado()
+        despues_de = self.paginador.clave_actual
+        limite = self.paginador.limite
+        
+        self.cargador.ejecutar(
+            'citas',
+            lambda: self.sincronizador.leer_pagina(
+                lambda: self.controller.listar_citas(estado=estado, despues_de=despues_de, limite=limite)
+            ),
+            self.mostrar_citas,
+            lambda e: messagebox.showerror("Error", f"Error al cargar citas:\n{str(e)}"),
+            indicador=self.tree
+        )
+    
+    def mostrar_citas(self, pagina: tuple):
+        """Muestra la página leída por cargar_citas"""
+        citas, version = pagina
+        citas = self.paginador.recibir(citas, lambda c: (c.fecha, c.hora, c.id_cita))
+        self.sincronizador.cargar(citas, version)
+    
+    def actualizar_cambios(self):
+        """Pide en segundo plano solo las citas que cambiaron desde la última carga"""
+        if self.sincronizador.version is None or self.cargador.cargando('citas'):
+            self.cargar_citas()  # La página mostrada no es la que se está leyendo
+            return
+                
+        version = self.sincronizador.version
+        estado = self.estado_filtrado()
+        self.cargador.ejecutar(
+            'citas',
+            lambda: self.controller.listar_citas_cambios(version, estado=estado),
+            self.aplicar_cambios,
+            lambda e: messagebox.showerror("Error", f"Error al actualizar citas:\n{str(e)}")
+        )
+    
+    def aplicar_cambios(self, cambios):
+        """Aplica a la página los cambios leídos por actualizar_cambios"""
+        if not self.sincronizador.aplicar(cambios, len(self.paginador.claves) == 1,
+                                          not self.paginador.hay_siguiente):
+            self.cargar_citas()
     
     def filtrar_citas(self):
-        """Filtra citas por estado"""
-        estado = self.filtro_var.get()
-        
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        try:
-            if estado == "Todas":
-                citas = self.controller.listar_citas()
-            else:
-                citas = self.controller.listar_citas(estado=estado)
-            
-            for cita in citas:
-                tag = cita.estado
-                self.tree.insert('', tk.END, values=(
-                    cita.id_cita,
-                    cita.fecha,
-                    cita.hora,
-                    cita.nombre_paciente or '',
-                    cita.nombre_psicologo or '',
-                    cita.especialidad or '',
-                    cita.modalidad,
-                    cita.estado
-                ), tags=(tag,))
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al filtrar:\n{str(e)}")
+        """Filtra citas por estado desde la primera página"""
+        self.paginador.reiniciar()
+        self.cargar_citas()
     
-    def on_select(self, event):
-        """Maneja la selección de una cita"""
+    @property
+    def cita_seleccionada(self):
+        """La cita de la fila seleccionada (el objeto que ya leyó el listado, sin volver a consultarlo)"""
         selection = self.tree.selection()
-        if selection:
-            item = self.tree.item(selection[0])
-            id_cita = item['values'][0]
-            self.cita_seleccionada = self.controller.obtener_cita_por_id(id_cita)
+        return self.sincronizador.objeto(selection[0]) if selection else None
     
     def nueva_cita(self):
         """Abre ventana para crear nueva cita"""
         FormularioCita(self.parent_frame, self.controller, self.paciente_controller, 
-                      self.psicologo_controller, None, self.cargar_citas)
+                      self.psicologo_controller, None, self.actualizar_cambios)
     
     def editar_cita(self):
         """Abre ventana para editar cita seleccionada"""
@@ -259,8 +270,16 @@ class CitaView:
             messagebox.showwarning("Advertencia", "Por favor selecciona una cita")
             return
         
+        # El formulario modifica el objeto que recibe: se edita una copia recién
+        # leída y no el de la fila, que solo cambia cuando se guarda
+        cita = self.controller.obtener_cita_por_id(self.cita_seleccionada.id_cita)
+        if not cita:
+            messagebox.showerror("Error", "La cita ya no existe")
+            self.actualizar_cambios()
+            return
+            
         FormularioCita(self.parent_frame, self.controller, self.paciente_controller,
-                      self.psicologo_controller, self.cita_seleccionada, self.cargar_citas)
+                      self.psicologo_controller, cita, self.actualizar_cambios)
     
     def cancelar_cita(self):
         """Cancela la cita seleccionada"""
@@ -285,7 +304,7 @@ class CitaView:
                 
                 if exito:
                     messagebox.showinfo("Éxito", mensaje)
-                    self.cargar_citas()
+                    self.actualizar_cambios()
                 else:
                     messagebox.showerror("Error", mensaje)
             
@@ -312,8 +331,8 @@ class CitaView:
                 
                 if exito:
                     messagebox.showinfo("Éxito", mensaje)
-                    self.cargar_citas()
-                    self.cita_seleccionada = None
+                    self.sincronizador.quitar(self.cita_seleccionada.id_cita)
+                    self.actualizar_cambios()
                 else:
                     messagebox.showerror("Error", mensaje)
             
@@ -335,7 +354,7 @@ class FormularioCita:
         # Crear ventana
         self.ventana = tk.Toplevel(parent)
         self.ventana.title("Nueva Cita" if not cita else "Editar Cita")
-        self.ventana.geometry("500x550")
+        self.ventana.geometry("500x550" if cita else "500x610")
         self.ventana.resizable(False, False)
         self.ventana.grab_set()
         
@@ -446,6 +465,32 @@ class FormularioCita:
         hora_combo['values'] = horas
         hora_combo.pack(side=tk.LEFT)
         
+        tk.Label(hora_frame, text="Duración (min)", font=('Arial', 10),
+                bg='white', fg='#1e293b').pack(side=tk.LEFT, padx=(20, 5))
+                
+        self.duracion_var = tk.StringVar(value=str(CITAS_CONFIG['duracion_default']))
+        duracion_combo = ttk.Combobox(
+            hora_frame,
+            textvariable=self.duracion_var,
+            font=('Arial', 11),
+            width=6,
+            values=CITAS_CONFIG['duraciones'],
+            state='readonly'
+        )
+        duracion_combo.pack(side=tk.LEFT)
+        
+        tk.Button(
+            hora_frame,
+            text="Próximo libre",
+            font=('Arial', 9),
+            bg='#e2e8f0',
+            fg='#1e293b',
+            cursor='hand2',
+            bd=0,
+            padx=8,
+            command=self.buscar_horario_libre
+        ).pack(side=tk.RIGHT)
+        
         # Modalidad
         tk.Label(main_frame, text="Modalidad *", font=('Arial', 10, 'bold'),
                 bg='white', fg='#1e293b').pack(anchor='w')
@@ -459,6 +504,37 @@ class FormularioCita:
         ttk.Radiobutton(modalidad_frame, text="Virtual", variable=self.modalidad_var,
                        value="Virtual").pack(side=tk.LEFT)
         
+        # Repetición (solo en citas nuevas)
+        if not self.cita:
+            tk.Label(main_frame, text="Repetir", font=('Arial', 10, 'bold'),
+                    bg='white', fg='#1e293b').pack(anchor='w')
+                    
+            repetir_frame = tk.Frame(main_frame, bg='white')
+            repetir_frame.pack(fill=tk.X, pady=(5, 10))
+            
+            self.repetir_var = tk.StringVar(value="No")
+            ttk.Combobox(
+                repetir_frame,
+                textvariable=self.repetir_var,
+                font=('Arial', 11),
+                width=15,
+                values=['No'] + list(CITAS_CONFIG['frecuencias']),
+                state='readonly'
+            ).pack(side=tk.LEFT)
+            
+            tk.Label(repetir_frame, text="Sesiones", font=('Arial', 10),
+                    bg='white', fg='#1e293b').pack(side=tk.LEFT, padx=(20, 5))
+                    
+            self.sesiones_var = tk.StringVar(value="4")
+            ttk.Spinbox(
+                repetir_frame,
+                textvariable=self.sesiones_var,
+                font=('Arial', 11),
+                width=5,
+                from_=2,
+                to=CITAS_CONFIG['sesiones_maximas']
+            ).pack(side=tk.LEFT)
+            
         # Estado (solo en edición)
         if self.cita:
             tk.Label(main_frame, text="Estado *", font=('Arial', 10, 'bold'),
@@ -526,8 +602,38 @@ class FormularioCita:
             self.fecha_entry.insert(0, str(self.cita.fecha))
         
         self.hora_var.set(str(self.cita.hora)[:5])
+        self.duracion_var.set(str(self.cita.duracion or CITAS_CONFIG['duracion_default']))
         self.modalidad_var.set(self.cita.modalidad)
     
+    def buscar_horario_libre(self):
+        """Llena fecha y hora con el primer horario libre del psicólogo elegido"""
+        if not self.psicologo_var.get():
+            messagebox.showwarning("Campo Requerido", "Selecciona un psicólogo")
+            return
+            
+        id_psicologo = int(self.psicologo_var.get().split(' - ')[0])
+        try:
+            desde = self.fecha_entry.get_date() if hasattr(self.fecha_entry, 'get_date') else date.fromisoformat(self.fecha_entry.get())
+        except:
+            desde = date.today()
+            
+        libres = self.controller.buscar_horarios_libres(
+            id_psicologo,
+            desde=max(desde, date.today()),
+            duracion=int(self.duracion_var.get()),
+            limite=1
+        )
+        if not libres:
+            messagebox.showinfo("Sin horarios", "El psicólogo no tiene horarios libres en los próximos días")
+            return
+            
+        try:
+            self.fecha_entry.set_date(libres[0].fecha)
+        except:
+            self.fecha_entry.delete(0, tk.END)
+            self.fecha_entry.insert(0, str(libres[0].fecha))
+        self.hora_var.set(libres[0].hora.strftime('%H:%M'))
+    
     def guardar(self):
         """Guarda la cita"""
         # Validar selecciones
@@ -551,6 +657,7 @@ class FormularioCita:
             return
         
         hora = self.hora_var.get()
+        duracion = int(self.duracion_var.get())
         modalidad = self.modalidad_var.get()
         estado = self.estado_var.get() if self.cita else "Programada"
         
@@ -560,10 +667,16 @@ class FormularioCita:
                 self.cita.id_psicologo = id_psicologo
                 self.cita.fecha = fecha_cita
                 self.cita.hora = hora
+                self.cita.duracion = duracion
                 self.cita.modalidad = modalidad
                 self.cita.estado = estado
                 
                 exito, mensaje = self.controller.actualizar_cita(self.cita)
+            elif self.repetir_var.get() != "No":  # Serie de citas
+                exito, mensaje = self.guardar_serie(id_paciente, id_psicologo, fecha_cita,
+                                                    hora, modalidad, duracion)
+                if exito is None:
+                    return  # El usuario canceló la serie
             else:  # Nueva
                 nueva_cita = Cita(
                     id_paciente=id_paciente,
@@ -571,7 +684,8 @@ class FormularioCita:
                     fecha=fecha_cita,
                     hora=hora,
                     modalidad=modalidad,
-                    estado="Programada"
+                    estado="Programada",
+                    duracion=duracion
                 )
                 
                 exito, mensaje, id_cita = self.controller.crear_cita(nueva_cita)
@@ -585,4 +699,34 @@ class FormularioCita:
                 messagebox.showerror("Error", mensaje)
         
         except Exception as e:
-            messagebox.showerror("Error", f"Error al guardar:\n{str(e)}")
\ No newline at end of file
+            messagebox.showerror("Error", f"Error al guardar:\n{str(e)}")
+    
+    def guardar_serie(self, id_paciente, id_psicologo, fecha_cita, hora, modalidad, duracion) -> tuple:
+        """
+        Agenda la serie de citas; si algunas sesiones chocan pregunta si se
+        agendan solo las libres
+        Returns:
+            tuple: (exito: bool o None si se canceló, mensaje: str)
+        """
+        try:
+            sesiones = int(self.sesiones_var.get())
+        except ValueError:
+            return False, "El número de sesiones debe ser un número entero"
+            
+        argumentos = (id_paciente, id_psicologo, fecha_cita, hora,
+                      self.repetir_var.get(), sesiones, modalidad, duracion)
+        exito, mensaje, ocurrencias = self.controller.crear_serie_citas(*argumentos)
+        
+        conflictos = [o for o in ocurrencias if not o.disponible]
+        if exito or not conflictos or len(conflictos) == len(ocurrencias):
+            return exito, mensaje
+            
+        fechas = "\n".join(f"  • {o.fecha.strftime('%d/%m/%Y')}: {o.motivo}" for o in conflictos)
+        if not messagebox.askyesno(
+            "Sesiones con conflicto",
+            f"{mensaje}:\n\n{fechas}\n\n¿Agendar solo las sesiones libres?"
+        ):
+            return None, mensaje
+            
+        exito, mensaje, _ = self.controller.crear_serie_citas(*argumentos, omitir_conflictos=True)
+        return exito, mensaje
\ No newline at end of file
@@ -7,17 +7,25 @@ from tkinter import ttk, messagebox, scrolledtext
 from controllers.consulta_controller import ConsultaController
 from controllers.cita_controller import CitaController
 from models.consulta import Consulta
+from views.paginador import Paginador
+from views.sincronizador import SincronizadorTabla
+from views.tabla_virtual import TablaVirtual
+from views.cargador import CargadorAsincrono
 
 class ConsultaView:
     """Ventana para gestionar consultas"""
     
-    def __init__(self, parent_frame):
+    def __init__(self, parent_frame, id_psicologo: int = None):
+        """
+        Args:
+            parent_frame: Contenedor del módulo
+            id_psicologo: Psicólogo que inició sesión (solo ve sus consultas);
+                          None para el administrador
+        """
         self.parent_frame = parent_frame
         self.controller = ConsultaController()
         self.cita_controller = CitaController()
-        
-        # Variables
-        self.consulta_seleccionada = None
+        self.id_psicologo = id_psicologo
         
         # Crear interfaz
         self.crear_widgets()
@@ -107,31 +115,40 @@ class ConsultaView:
         )
         btn_eliminar.pack(side=tk.LEFT, padx=(0, 10))
         
+        # Buscador (notas, diagnóstico y recomendaciones)
+        search_frame = tk.Frame(toolbar, bg='#f8fafc')
+        search_frame.pack(side=tk.RIGHT)
+        
+        tk.Label(
+            search_frame,
+            text="🔍",
+            font=('Arial', 12),
+            bg='#f8fafc'
+        ).pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.search_var = tk.StringVar()
+        
+        search_entry = ttk.Entry(
+            search_frame,
+            textvariable=self.search_var,
+            font=('Arial', 10),
+            width=30
+        )
+        search_entry.pack(side=tk.LEFT)
+        search_entry.bind('<Return>', lambda e: self.buscar_consultas())
+        
+        # ===== PAGINACIÓN =====
+        self.paginador = Paginador(self.parent_frame, self.cargar_consultas)
+        self.paginador.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+        
         # ===== TABLA DE CONSULTAS =====
         table_frame = tk.Frame(self.parent_frame, bg='white', relief='solid', bd=1)
         table_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Scrollbars
-        vsb = ttk.Scrollbar(table_frame, orient="vertical")
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        hsb = ttk.Scrollbar(table_frame, orient="horizontal")
-        hsb.pack(side=tk.BOTTOM, fill=tk.X)
-        
-        # Treeview
+        # Tabla virtual: solo se crean en el Treeview los renglones visibles
         columnas = ('ID', 'Fecha', 'Paciente', 'Psicólogo', 'Duración', 'Diagnóstico')
         
-        self.tree = ttk.Treeview(
-            table_frame,
-            columns=columnas,
-            show='headings',
-            yscrollcommand=vsb.set,
-            xscrollcommand=hsb.set,
-            selectmode='browse'
-        )
-        
-        vsb.config(command=self.tree.yview)
-        hsb.config(command=self.tree.xview)
+        self.tree = TablaVirtual(table_frame, columnas)
         
         # Configurar columnas
         self.tree.heading('ID', text='ID')
@@ -152,42 +169,104 @@ class ConsultaView:
         
         # Bind eventos
         self.tree.bind('<Double-1>', lambda e: self.ver_consulta())
-        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+    
+        # Las lecturas se hacen en segundo plano mientras exista la tabla
+        self.cargador = CargadorAsincrono(self.tree)
+        
+        # Las filas usan el ID de la consulta como iid para aplicar cambios
+        self.sincronizador = SincronizadorTabla(
+            self.tree,
+            lambda c: c.id_consulta,
+            self.fila_consulta,
+            lambda c: (c.fecha_cita, c.hora_cita, c.id_cita),
+            descendente=True
+        )
+    
+    def fila_consulta(self, consulta) -> tuple:
+        """Valores y tags de la fila de una consulta"""
+        diagnostico = consulta.diagnostico[:50] + '...' if consulta.diagnostico and len(consulta.diagnostico) > 50 else consulta.diagnostico or ''
+        
+        return (
+            consulta.id_consulta,
+            consulta.fecha_cita or '',
+            consulta.nombre_paciente or '',
+            consulta.nombre_psicologo or '',
+            consulta.duracion or '',
+            diagnostico
+        ), ()
     
     def cargar_consultas(self):
-        """Carga todas las consultas en la tabla"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        try:
-            consultas = self.controller.listar_consultas()
+        """
+        Pide en segundo plano la página actual de consultas
+        Con texto en el buscador se muestran las que lo contienen, las más relevantes primero
+        """
+        busqueda = self.search_var.get().strip()
+        despues_de = self.paginador.clave_actual
+        limite = self.paginador.limite
+                
+        if busqueda:
+            # El orden es por relevancia: no admite cambios incrementales (versión None)
+            leer = lambda: (self.controller.buscar_texto(busqueda, self.id_psicologo,
+                                                         despues_de=despues_de, limite=limite), None)
+        else:
+            leer = lambda: self.sincronizador.leer_pagina(
+                lambda: self.controller.listar_consultas(id_psicologo=self.id_psicologo,
+                                                         despues_de=despues_de, limite=limite)
+            )
             
-            for consulta in consultas:
-                diagnostico = consulta.diagnostico[:50] + '...' if consulta.diagnostico and len(consulta.diagnostico) > 50 else consulta.diagnostico or ''
+        self.cargador.ejecutar(
+            'consultas',
+            leer,
+            self.mostrar_consultas,
+            lambda e: messagebox.showerror("Error", f"Error al cargar consultas:\n{str(e)}"),
+            indicador=self.tree
+        )
+    
+    def mostrar_consultas(self, pagina: tuple):
+        """Muestra la página leída por cargar_consultas"""
+        consultas, version = pagina
+        if version is None:
+            consultas = self.paginador.recibir(consultas, lambda c: (c.relevancia, c.id_consulta))
+        else:
+            consultas = self.paginador.recibir(
+                consultas, lambda c: (c.fecha_cita, c.hora_cita, c.id_cita)
+            )
+        self.sincronizador.cargar(consultas, version)
+    
+    def actualizar_cambios(self):
+        """Pide en segundo plano solo las consultas que cambiaron desde la última carga"""
+        if self.sincronizador.version is None or self.cargador.cargando('consultas'):
+            self.cargar_consultas()  # La página mostrada no es la que se está leyendo
+            return
                 
-                self.tree.insert('', tk.END, values=(
-                    consulta.id_consulta,
-                    consulta.fecha_cita or '',
-                    consulta.nombre_paciente or '',
-                    consulta.nombre_psicologo or '',
-                    consulta.duracion or '',
-                    diagnostico
-                ))
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar consultas:\n{str(e)}")
+        version = self.sincronizador.version
+        self.cargador.ejecutar(
+            'consultas',
+            lambda: self.controller.listar_consultas_cambios(version, id_psicologo=self.id_psicologo),
+            self.aplicar_cambios,
+            lambda e: messagebox.showerror("Error", f"Error al actualizar consultas:\n{str(e)}")
+        )
+    
+    def aplicar_cambios(self, cambios):
+        """Aplica a la página los cambios leídos por actualizar_cambios"""
+        if not self.sincronizador.aplicar(cambios, len(self.paginador.claves) == 1,
+                                          not self.paginador.hay_siguiente):
+            self.cargar_consultas()
     
-    def on_select(self, event):
-        """Maneja la selección de una consulta"""
+    def buscar_consultas(self):
+        """Busca en el texto de las consultas desde la primera página"""
+        self.paginador.reiniciar()
+        self.cargar_consultas()
+    
+    @property
+    def consulta_seleccionada(self):
+        """La consulta de la fila seleccionada (el objeto que ya leyó el listado, sin volver a consultarlo)"""
         selection = self.tree.selection()
-        if selection:
-            item = self.tree.item(selection[0])
-            id_consulta = item['values'][0]
-            self.consulta_seleccionada = self.controller.obtener_consulta_por_id(id_consulta)
+        return self.sincronizador.objeto(selection[0]) if selection else None
     
     def nueva_consulta(self):
         """Abre ventana para crear nueva consulta"""
-        FormularioConsulta(self.parent_frame, self.controller, self.cita_controller, None, self.cargar_consultas)
+        FormularioConsulta(self.parent_frame, self.controller, self.cita_controller, None, self.actualizar_cambios)
     
     def ver_consulta(self):
         """Muestra los detalles completos de la consulta"""
@@ -203,8 +282,16 @@ class ConsultaView:
             messagebox.showwarning("Advertencia", "Por favor selecciona una consulta")
             return
         
+        # El formulario modifica el objeto que recibe: se edita una copia recién
+        # leída y no el de la fila, que solo cambia cuando se guarda
+        consulta = self.controller.obtener_consulta_por_id(self.consulta_seleccionada.id_consulta)
+        if not consulta:
+            messagebox.showerror("Error", "La consulta ya no existe")
+            self.actualizar_cambios()
+            return
+            
         FormularioConsulta(self.parent_frame, self.controller, self.cita_controller, 
-                          self.consulta_seleccionada, self.cargar_consultas)
+                          consulta, self.actualizar_cambios)
     
     def eliminar_consulta(self):
         """Elimina la consulta seleccionada"""
@@ -226,8 +313,8 @@ class ConsultaView:
                 
                 if exito:
                     messagebox.showinfo("Éxito", mensaje)
-                    self.cargar_consultas()
-                    self.consulta_seleccionada = None
+                    self.sincronizador.quitar(self.consulta_seleccionada.id_consulta)
+                    self.actualizar_cambios()
                 else:
                     messagebox.showerror("Error", mensaje)
             
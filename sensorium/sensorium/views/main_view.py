@@ -6,9 +6,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 from controllers.auth_controller import AuthController
-from controllers.paciente_controller import PacienteController
 from controllers.psicologo_controller import PsicologoController
-from controllers.cita_controller import CitaController
+from controllers.dashboard_controller import DashboardController
+from views.cargador import CargadorAsincrono
 
 class MainView:
     """Ventana principal del sistema"""
@@ -26,9 +26,11 @@ class MainView:
         self.auth_controller.usuario_actual = usuario
         self.auth_controller.sesion_activa = True
         
-        self.paciente_controller = PacienteController()
         self.psicologo_controller = PsicologoController()
-        self.cita_controller = CitaController()
+        self.dashboard_controller = DashboardController()
+        
+        # Los resúmenes diarios se recalculan en segundo plano, no al leerlos
+        self.dashboard_controller.resumen.iniciar_actualizacion_periodica()
         
         # Centrar ventana
         self.centrar_ventana()
@@ -36,12 +38,9 @@ class MainView:
         # Configurar estilos
         self.configurar_estilos()
         
-        # Crear interfaz
+        # Crear interfaz (el dashboard carga sus estadísticas)
         self.crear_widgets()
         
-        # Cargar estadísticas
-        self.cargar_estadisticas()
-        
         # Actualizar reloj
         self.actualizar_reloj()
     
@@ -206,8 +205,9 @@ class MainView:
             widget.destroy()
     
     def mostrar_dashboard(self):
-        """Muestra el dashboard con estadísticas"""
+        """Muestra el dashboard; las estadísticas llegan en segundo plano"""
         self.limpiar_contenido()
+        self.tarjetas = {}
         
         # Título
         titulo = tk.Label(
@@ -223,39 +223,70 @@ class MainView:
         stats_frame = tk.Frame(self.content_area, bg='#f8fafc')
         stats_frame.pack(fill=tk.X, pady=10)
         
-        # Tarjetas de estadísticas
+        # Las estadísticas se descartan si se cambia de módulo antes de que lleguen
+        self.cargador = CargadorAsincrono(stats_frame)
+        
+        # Tarjetas de estadísticas ("…" hasta que llegan los valores)
         self.crear_tarjeta_estadistica(
             stats_frame,
             "Total Pacientes",
-            self.total_pacientes,
+            "…",
             "#10b981",
-            "👥"
+            "👥",
+            'pacientes'
         ).pack(side=tk.LEFT, padx=10, fill=tk.BOTH, expand=True)
         
         self.crear_tarjeta_estadistica(
             stats_frame,
             "Total Psicólogos",
-            self.total_psicologos,
+            "…",
             "#3b82f6",
-            "👨‍⚕️"
+            "👨‍⚕️",
+            'psicologos'
         ).pack(side=tk.LEFT, padx=10, fill=tk.BOTH, expand=True)
         
         self.crear_tarjeta_estadistica(
             stats_frame,
             "Citas Programadas",
-            self.total_citas_programadas,
+            "…",
             "#f59e0b",
-            "📅"
+            "📅",
+            'citas_programadas'
         ).pack(side=tk.LEFT, padx=10, fill=tk.BOTH, expand=True)
         
         self.crear_tarjeta_estadistica(
             stats_frame,
             "Citas Hoy",
-            self.citas_hoy,
+            "…",
             "#8b5cf6",
-            "📆"
+            "📆",
+            'citas_hoy'
+        ).pack(side=tk.LEFT, padx=10, fill=tk.BOTH, expand=True)
+        
+        # Segunda fila: pagos
+        pagos_frame = tk.Frame(self.content_area, bg='#f8fafc')
+        pagos_frame.pack(fill=tk.X, pady=10)
+        
+        self.crear_tarjeta_estadistica(
+            pagos_frame,
+            "Ingresos Hoy",
+            "…",
+            "#059669",
+            "💰",
+            'ingresos_hoy'
+        ).pack(side=tk.LEFT, padx=10, fill=tk.BOTH, expand=True)
+        
+        self.crear_tarjeta_estadistica(
+            pagos_frame,
+            "Pagos Pendientes",
+            "…",
+            "#ef4444",
+            "⏳",
+            'pagos_pendientes'
         ).pack(side=tk.LEFT, padx=10, fill=tk.BOTH, expand=True)
         
+        self.cargar_estadisticas()
+        
         # Mensaje de bienvenida
         bienvenida_frame = tk.Frame(self.content_area, bg='white', relief='solid', bd=1)
         bienvenida_frame.pack(fill=tk.BOTH, expand=True, pady=20)
@@ -288,8 +319,11 @@ class MainView:
         )
         submensaje.pack(pady=10)
     
-    def crear_tarjeta_estadistica(self, parent, titulo, valor, color, icono):
-        """Crea una tarjeta de estadística"""
+    def crear_tarjeta_estadistica(self, parent, titulo, valor, color, icono, clave=None):
+        """
+        Crea una tarjeta de estadística
+        Con clave, sus etiquetas se guardan en self.tarjetas para cambiar el valor después
+        """
         card = tk.Frame(parent, bg='white', relief='solid', bd=1)
         
         # Barra de color superior
@@ -320,25 +354,53 @@ class MainView:
         )
         titulo_label.pack()
         
+        if clave:
+            self.tarjetas[clave] = (valor_label, titulo_label, icono)
+            
         return card
     
     def cargar_estadisticas(self):
-        """Carga las estadísticas desde la base de datos"""
-        try:
-            self.total_pacientes = self.paciente_controller.contar_pacientes()
-            self.total_psicologos = self.psicologo_controller.contar_psicologos()
-            self.total_citas_programadas = self.cita_controller.contar_citas('Programada')
+        """Pide en segundo plano las estadísticas (una sola consulta)"""
+        self.cargador.ejecutar(
+            'estadisticas',
+            self.dashboard_controller.obtener_resumen,
+            self.mostrar_estadisticas
+        )
             
-            # Citas de hoy
-            citas_hoy = self.cita_controller.obtener_citas_del_dia()
-            self.citas_hoy = len(citas_hoy)
+    def mostrar_estadisticas(self, resumen, poner_al_dia: bool = True):
+        """
+        Pone en las tarjetas las estadísticas leídas por cargar_estadisticas
+        Si los resúmenes tenían días sin recalcular, se recalculan en segundo
+        plano y las tarjetas se actualizan al terminar
+        """
+        self.total_pacientes = resumen.pacientes
+        self.total_psicologos = resumen.psicologos
+        self.total_citas_programadas = resumen.citas_programadas
+        self.citas_hoy = resumen.citas_hoy
+        self.ingresos_hoy = float(resumen.ingresos_hoy)
+        self.pagos_pendientes = resumen.pagos_pendientes
+        self.monto_pendiente = float(resumen.monto_pendiente)
+        
+        valores = {
+            'pacientes': self.total_pacientes,
+            'psicologos': self.total_psicologos,
+            'citas_programadas': self.total_citas_programadas,
+            'citas_hoy': self.citas_hoy,
+            'ingresos_hoy': f"${self.ingresos_hoy:,.2f}",
+            'pagos_pendientes': self.pagos_pendientes
+        }
+        for clave, valor in valores.items():
+            valor_label, titulo_label, icono = self.tarjetas[clave]
+            valor_label.config(text=f"{icono} {valor}")
             
-        except Exception as e:
-            print(f"Error al cargar estadísticas: {e}")
-            self.total_pacientes = 0
-            self.total_psicologos = 0
-            self.total_citas_programadas = 0
-            self.citas_hoy = 0
+        self.tarjetas['pagos_pendientes'][1].config(text=f"Pagos Pendientes (${self.monto_pendiente:,.2f})")
+        
+        if resumen.pendiente and poner_al_dia and not self.cargador.cargando('resumenes'):
+            self.cargador.ejecutar(
+                'resumenes',
+                self.dashboard_controller.actualizar_resumen,
+                lambda resumen: self.mostrar_estadisticas(resumen, poner_al_dia=False)
+            )
     
     def actualizar_reloj(self):
         """Actualiza el reloj en tiempo real"""
@@ -380,7 +442,18 @@ class MainView:
     def abrir_consultas(self):
         """Abre el módulo de consultas"""
         from views.consulta_view import ConsultaView
-        ConsultaView(self.content_area)
+        
+        # Un psicólogo solo ve (y busca en) sus propias consultas
+        id_psicologo = None
+        if self.auth_controller.es_psicologo():
+            psicologo = self.psicologo_controller.obtener_psicologo_por_usuario(self.usuario.id_usuario)
+            if not psicologo:
+                # Sin filtro vería las notas de todos los pacientes
+                messagebox.showerror("Error", "No se encontró el registro de psicólogo de este usuario.\n"
+                                              "No se pueden mostrar las consultas.")
+                return
+            id_psicologo = psicologo.id_psicologo
+        ConsultaView(self.content_area, id_psicologo)
     
     def abrir_pagos(self):
         """Abre el módulo de pagos"""
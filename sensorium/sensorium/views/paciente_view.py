@@ -2,10 +2,17 @@
 Ventana de gestión de pacientes
 """
 
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 from controllers.paciente_controller import PacienteController
 from models.paciente import Paciente
+from views.paginador import Paginador
+from views.sincronizador import SincronizadorTabla
+from views.tabla_virtual import TablaVirtual
+from views.cargador import CargadorAsincrono
+from utiles.busqueda import es_refinamiento
+from config.settings import BUSQUEDA_CONFIG
 
 class PacienteView:
     """Ventana para gestionar pacientes"""
@@ -15,13 +22,15 @@ class PacienteView:
         self.controller = PacienteController()
         
         # Variables
-        self.paciente_seleccionado = None
+        self._busqueda_programada = None  # after() pendiente de la búsqueda
+        self._ultima_busqueda = None  # (texto, IDs, time.monotonic()) del último resultado completo
         
         # Crear interfaz
         self.crear_widgets()
         
         # Cargar pacientes
         self.cargar_pacientes()
+        self.controller.precargar_busqueda()
     
     def crear_widgets(self):
         """Crea todos los widgets de la interfaz"""
@@ -54,7 +63,7 @@ class PacienteView:
             activebackground='#059669',
             cursor='hand2',
             padx=15,
-            py=8,
+            pady=8,
             bd=0,
             command=self.nuevo_paciente
         )
@@ -104,7 +113,7 @@ class PacienteView:
         ).pack(side=tk.LEFT, padx=(0, 5))
         
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', lambda *args: self.buscar_pacientes())
+        self.search_var.trace('w', lambda *args: self.programar_busqueda())
         
         search_entry = ttk.Entry(
             search_frame,
@@ -114,31 +123,18 @@ class PacienteView:
         )
         search_entry.pack(side=tk.LEFT)
         
+        # ===== PAGINACIÓN =====
+        self.paginador = Paginador(self.parent_frame, self.cargar_pacientes)
+        self.paginador.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+        
         # ===== TABLA DE PACIENTES =====
         table_frame = tk.Frame(self.parent_frame, bg='white', relief='solid', bd=1)
         table_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Scrollbars
-        vsb = ttk.Scrollbar(table_frame, orient="vertical")
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        hsb = ttk.Scrollbar(table_frame, orient="horizontal")
-        hsb.pack(side=tk.BOTTOM, fill=tk.X)
-        
-        # Treeview
+        # Tabla virtual: solo se crean en el Treeview los renglones visibles
         columnas = ('ID', 'Nombre', 'Correo', 'Teléfono', 'Dirección', 'Fecha Registro')
         
-        self.tree = ttk.Treeview(
-            table_frame,
-            columns=columnas,
-            show='headings',
-            yscrollcommand=vsb.set,
-            xscrollcommand=hsb.set,
-            selectmode='browse'
-        )
-        
-        vsb.config(command=self.tree.yview)
-        hsb.config(command=self.tree.xview)
+        self.tree = TablaVirtual(table_frame, columnas)
         
         # Configurar columnas
         self.tree.heading('ID', text='ID')
@@ -160,69 +156,141 @@ class PacienteView:
         # Bind doble click
         self.tree.bind('<Double-1>', lambda e: self.editar_paciente())
         
-        # Bind selección
-        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        # Las lecturas se hacen en segundo plano mientras exista la tabla
+        self.cargador = CargadorAsincrono(self.tree)
+        
+        # Las filas usan el ID del paciente como iid para aplicar cambios
+        self.sincronizador = SincronizadorTabla(
+            self.tree,
+            lambda p: p.id_paciente,
+            self.fila_paciente,
+            lambda p: (p.nombre, p.id_paciente)
+        )
+    
+    def fila_paciente(self, paciente) -> tuple:
+        """Valores y tags de la fila de un paciente"""
+        return (
+            paciente.id_paciente,
+            paciente.nombre,
+            paciente.correo or '',
+            paciente.telefono,
+            paciente.direccion or '',
+            paciente.fecha_regist
+        ), ()
     
     def cargar_pacientes(self):
-        """Carga todos los pacientes en la tabla"""
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """
+        Pide en segundo plano la página actual de pacientes
+        Con texto en el buscador se muestran los más parecidos (índice en memoria)
+        """
+        busqueda = self.search_var.get().strip()
+        despues_de = self.paginador.clave_actual
+        limite = self.paginador.limite
+                
+        if busqueda:
+            # El orden es por relevancia: no admite cambios incrementales (versión None)
+            leer = lambda: (self.controller.buscar_pacientes(busqueda, limite=self.paginador.filas_por_pagina), None)
+        else:
+            leer = lambda: self.sincronizador.leer_pagina(
+                lambda: self.controller.listar_pacientes(despues_de=despues_de, limite=limite, cache=False)
+            )
         
-        try:
-            pacientes = self.controller.listar_pacientes()
+        self.cargador.ejecutar(
+            'pacientes',
+            leer,
+            lambda pagina: self.mostrar_pacientes(pagina, busqueda),
+            lambda e: messagebox.showerror("Error", f"Error al cargar pacientes:\n{str(e)}"),
+            indicador=self.tree
+        )
+    
+    def mostrar_pacientes(self, pagina: tuple, busqueda: str = None):
+        """
+        Muestra la página leída por cargar_pacientes
+        Args:
+            pagina: (pacientes, version)
+            busqueda: Texto buscado (None para el listado)
+        """
+        pacientes, version = pagina
+        
+        # Un resultado que no llegó al límite tiene todas las coincidencias:
+        # las búsquedas que lo refinen se filtran de él
+        if busqueda and len(pacientes) < self.paginador.filas_por_pagina:
+            self._ultima_busqueda = (busqueda, [p.id_paciente for p in pacientes], time.monotonic())
+        else:
+            self._ultima_busqueda = None
             
-            for paciente in pacientes:
-                self.tree.insert('', tk.END, values=(
-                    paciente.id_paciente,
-                    paciente.nombre,
-                    paciente.correo or '',
-                    paciente.telefono,
-                    paciente.direccion or '',
-                    paciente.fecha_regist
-                ))
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar pacientes:\n{str(e)}")
+        pacientes = self.paginador.recibir(pacientes, lambda p: (p.nombre, p.id_paciente))
+        self.sincronizador.cargar(pacientes, version)
+    
+    def actualizar_cambios(self):
+        """Pide en segundo plano solo los pacientes que cambiaron desde la última carga"""
+        if self.sincronizador.version is None or self.cargador.cargando('pacientes'):
+            self.cargar_pacientes()  # La página mostrada no es la que se está leyendo
+            return
+                
+        version = self.sincronizador.version
+        self.cargador.ejecutar(
+            'pacientes',
+            lambda: self.controller.listar_pacientes_cambios(version),
+            self.aplicar_cambios,
+            lambda e: messagebox.showerror("Error", f"Error al actualizar pacientes:\n{str(e)}")
+        )
+    
+    def aplicar_cambios(self, cambios):
+        """Aplica a la página los cambios leídos por actualizar_cambios"""
+        if not self.sincronizador.aplicar(cambios, len(self.paginador.claves) == 1,
+                                          not self.paginador.hay_siguiente):
+            self.cargar_pacientes()
+    
+    def programar_busqueda(self):
+        """
+        Busca cuando se deja de escribir (BUSQUEDA_CONFIG['espera_escritura'] ms);
+        lo que se pidió con el texto anterior ya no se muestra
+        """
+        if self._busqueda_programada is not None:
+            self.parent_frame.after_cancel(self._busqueda_programada)
+        self.cargador.cancelar('pacientes')
+        self._busqueda_programada = self.parent_frame.after(BUSQUEDA_CONFIG['espera_escritura'],
+                                                            self._buscar_programada)
+    
+    def _buscar_programada(self):
+        """Búsqueda programada por programar_busqueda"""
+        self._busqueda_programada = None
+        if self.tree.winfo_exists():  # Se pudo cambiar de módulo mientras tanto
+            self.buscar_pacientes()
     
     def buscar_pacientes(self):
-        """Busca pacientes por nombre o teléfono"""
-        busqueda = self.search_var.get()
-        
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        try:
-            if busqueda:
-                pacientes = self.controller.listar_pacientes(buscar=busqueda)
-            else:
-                pacientes = self.controller.listar_pacientes()
+        """
+        Busca pacientes por nombre, teléfono o correo desde la primera página
+        Si el texto solo agrega letras o palabras a la búsqueda anterior, se
+        filtran sus resultados en memoria sin consultar la base de datos
+        """
+        self.paginador.reiniciar()
+        busqueda = self.search_var.get().strip()
+        anterior = self._ultima_busqueda
+        
+        # Los resultados guardados valen mientras el índice no deba sincronizarse
+        if (busqueda and anterior and es_refinamiento(busqueda, anterior[0]) and
+                time.monotonic() - anterior[2] < BUSQUEDA_CONFIG['sincronizar_cada']):
+            self.cargador.cancelar('pacientes')
+            pacientes = self.controller.buscar_pacientes(busqueda, limite=self.paginador.filas_por_pagina,
+                                                         entre=anterior[1])
+            self._ultima_busqueda = (busqueda, [p.id_paciente for p in pacientes], anterior[2])
+            self.paginador.recibir(pacientes, lambda p: (p.nombre, p.id_paciente))
+            self.sincronizador.cargar(pacientes)
+            return
             
-            for paciente in pacientes:
-                self.tree.insert('', tk.END, values=(
-                    paciente.id_paciente,
-                    paciente.nombre,
-                    paciente.correo or '',
-                    paciente.telefono,
-                    paciente.direccion or '',
-                    paciente.fecha_regist
-                ))
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al buscar:\n{str(e)}")
+        self.cargar_pacientes()
     
-    def on_select(self, event):
-        """Maneja la selección de un paciente"""
+    @property
+    def paciente_seleccionado(self):
+        """El paciente de la fila seleccionada (el objeto que ya leyó el listado, sin volver a consultarlo)"""
         selection = self.tree.selection()
-        if selection:
-            item = self.tree.item(selection[0])
-            id_paciente = item['values'][0]
-            self.paciente_seleccionado = self.controller.obtener_paciente_por_id(id_paciente)
+        return self.sincronizador.objeto(selection[0]) if selection else None
     
     def nuevo_paciente(self):
         """Abre ventana para crear nuevo paciente"""
-        FormularioPaciente(self.parent_frame, self.controller, None, self.cargar_pacientes)
+        FormularioPaciente(self.parent_frame, self.controller, None, self.actualizar_cambios)
     
     def editar_paciente(self):
         """Abre ventana para editar paciente seleccionado"""
@@ -230,7 +298,15 @@ class PacienteView:
             messagebox.showwarning("Advertencia", "Por favor selecciona un paciente")
             return
         
-        FormularioPaciente(self.parent_frame, self.controller, self.paciente_seleccionado, self.cargar_pacientes)
+        # El formulario modifica el objeto que recibe: se edita una copia recién
+        # leída y no el de la fila, que solo cambia cuando se guarda
+        paciente = self.controller.obtener_paciente_por_id(self.paciente_seleccionado.id_paciente)
+        if not paciente:
+            messagebox.showerror("Error", "El paciente ya no existe")
+            self.actualizar_cambios()
+            return
+            
+        FormularioPaciente(self.parent_frame, self.controller, paciente, self.actualizar_cambios)
     
     def eliminar_paciente(self):
         """Elimina el paciente seleccionado"""
@@ -250,8 +326,8 @@ class PacienteView:
                 
                 if exito:
                     messagebox.showinfo("Éxito", mensaje)
-                    self.cargar_pacientes()
-                    self.paciente_seleccionado = None
+                    self.sincronizador.quitar(self.paciente_seleccionado.id_paciente)
+                    self.actualizar_cambios()
                 else:
                     messagebox.showerror("Error", mensaje)
             
@@ -0,0 +1,119 @@
+"""
+Controles de paginación para las tablas de los módulos
+"""
+
+import tkinter as tk
+from config.settings import UI_CONFIG
+
+class Paginador(tk.Frame):
+    """
+    Barra con botones Anterior / Siguiente para listados paginados por clave
+    Guarda la clave de inicio de cada página visitada, así volver atrás no
+    necesita contar filas (OFFSET) en la base de datos
+    """
+    
+    def __init__(self, parent, al_cambiar, filas_por_pagina: int = None):
+        """
+        Args:
+            parent: Contenedor de la barra
+            al_cambiar: Función sin argumentos que recarga la página actual
+            filas_por_pagina: Tamaño de página (por defecto UI_CONFIG)
+        """
+        super().__init__(parent, bg='#f8fafc')
+        self.al_cambiar = al_cambiar
+        self.filas_por_pagina = filas_por_pagina or UI_CONFIG.get('filas_por_pagina', 100)
+        
+        self.claves = [None]  # Clave de inicio de cada página visitada
+        self.ultima_clave = None
+        self.hay_siguiente = False
+        
+        self.btn_anterior = tk.Button(
+            self,
+            text="◀ Anterior",
+            font=('Arial', 10),
+            bg='#e2e8f0',
+            fg='#1e293b',
+            cursor='hand2',
+            padx=10,
+            pady=4,
+            bd=0,
+            command=self.anterior
+        )
+        self.btn_anterior.pack(side=tk.LEFT)
+        
+        self.lbl_pagina = tk.Label(
+            self,
+            text="Página 1",
+            font=('Arial', 10),
+            bg='#f8fafc',
+            fg='#64748b'
+        )
+        self.lbl_pagina.pack(side=tk.LEFT, padx=15)
+        
+        self.btn_siguiente = tk.Button(
+            self,
+            text="Siguiente ▶",
+            font=('Arial', 10),
+            bg='#e2e8f0',
+            fg='#1e293b',
+            cursor='hand2',
+            padx=10,
+            pady=4,
+            bd=0,
+            command=self.siguiente
+        )
+        self.btn_siguiente.pack(side=tk.LEFT)
+        
+        self.actualizar_botones()
+    
+    @property
+    def clave_actual(self):
+        """Clave despues_de con la que se pide la página actual"""
+        return self.claves[-1]
+    
+    @property
+    def limite(self) -> int:
+        """Filas a pedir: una extra para saber si existe la página siguiente"""
+        return self.filas_por_pagina + 1
+    
+    def recibir(self, elementos: list, clave) -> list:
+        """
+        Registra el resultado de la página actual
+        Args:
+            elementos: Lista obtenida con limite filas
+            clave: Función que devuelve la clave de paginación de un elemento
+        Returns:
+            list: Elementos a mostrar (sin la fila extra)
+        """
+        self.hay_siguiente = len(elementos) > self.filas_por_pagina
+        elementos = elementos[:self.filas_por_pagina]
+        self.ultima_clave = clave(elementos[-1]) if elementos else None
+        self.actualizar_botones()
+        return elementos
+    
+    def reiniciar(self):
+        """Vuelve a la primera página (por ejemplo al cambiar un filtro)"""
+        self.claves = [None]
+        self.ultima_clave = None
+        self.hay_siguiente = False
+    
+    def siguiente(self):
+        """Avanza a la página siguiente"""
+        if self.hay_siguiente and self.ultima_clave is not None:
+            self.claves.append(self.ultima_clave)
+            # Hasta recibir la página nueva no se puede volver a avanzar
+            self.hay_siguiente = False
+            self.actualizar_botones()
+            self.al_cambiar()
+    
+    def anterior(self):
+        """Regresa a la página anterior"""
+        if len(self.claves) > 1:
+            self.claves.pop()
+            self.al_cambiar()
+    
+    def actualizar_botones(self):
+        """Habilita los botones según la posición actual"""
+        self.btn_anterior.config(state=tk.NORMAL if len(self.claves) > 1 else tk.DISABLED)
+        self.btn_siguiente.config(state=tk.NORMAL if self.hay_siguiente else tk.DISABLED)
+        self.lbl_pagina.config(text=f"Página {len(self.claves)}")
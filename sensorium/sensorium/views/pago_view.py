@@ -1,29 +1,31 @@
 """
-Ventana de gestión de consultas
+Ventana de gestión de pagos
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox
+from controllers.pago_controller import PagoController
 from controllers.consulta_controller import ConsultaController
-from controllers.cita_controller import CitaController
-from models.consulta import Consulta
+from models.pago import Pago
+from views.paginador import Paginador
+from views.sincronizador import SincronizadorTabla
+from views.tabla_virtual import TablaVirtual
+from views.cargador import CargadorAsincrono
+from config.settings import PAGOS_CONFIG
 
-class ConsultaView:
-    """Ventana para gestionar consultas"""
+class PagoView:
+    """Ventana para gestionar pagos"""
     
     def __init__(self, parent_frame):
         self.parent_frame = parent_frame
-        self.controller = ConsultaController()
-        self.cita_controller = CitaController()
-        
-        # Variables
-        self.consulta_seleccionada = None
+        self.controller = PagoController()
+        self.consulta_controller = ConsultaController()
         
         # Crear interfaz
         self.crear_widgets()
         
-        # Cargar consultas
-        self.cargar_consultas()
+        # Cargar pagos
+        self.cargar_pagos()
     
     def crear_widgets(self):
         """Crea todos los widgets de la interfaz"""
@@ -35,7 +37,7 @@ class ConsultaView:
         # ===== TÍTULO =====
         titulo = tk.Label(
             self.parent_frame,
-            text="Gestión de Consultas",
+            text="Gestión de Pagos",
             font=('Arial', 24, 'bold'),
             bg='#f8fafc',
             fg='#1e293b'
@@ -47,9 +49,9 @@ class ConsultaView:
         toolbar.pack(fill=tk.X, pady=(0, 20))
         
         # Botones
-        btn_nueva = tk.Button(
+        btn_nuevo = tk.Button(
             toolbar,
-            text="➕ Nueva Consulta",
+            text="➕ Nuevo Pago",
             font=('Arial', 10, 'bold'),
             bg='#10b981',
             fg='white',
@@ -58,39 +60,39 @@ class ConsultaView:
             padx=15,
             pady=8,
             bd=0,
-            command=self.nueva_consulta
+            command=self.nuevo_pago
         )
-        btn_nueva.pack(side=tk.LEFT, padx=(0, 10))
+        btn_nuevo.pack(side=tk.LEFT, padx=(0, 10))
         
-        btn_ver = tk.Button(
+        btn_editar = tk.Button(
             toolbar,
-            text="👁️ Ver Detalles",
+            text="✏️ Editar",
             font=('Arial', 10, 'bold'),
-            bg='#3b82f6',
+            bg='#f59e0b',
             fg='white',
-            activebackground='#2563eb',
+            activebackground='#d97706',
             cursor='hand2',
             padx=15,
             pady=8,
             bd=0,
-            command=self.ver_consulta
+            command=self.editar_pago
         )
-        btn_ver.pack(side=tk.LEFT, padx=(0, 10))
+        btn_editar.pack(side=tk.LEFT, padx=(0, 10))
         
-        btn_editar = tk.Button(
+        btn_pagado = tk.Button(
             toolbar,
-            text="✏️ Editar",
+            text="✅ Marcar Pagado",
             font=('Arial', 10, 'bold'),
-            bg='#f59e0b',
+            bg='#3b82f6',
             fg='white',
-            activebackground='#d97706',
+            activebackground='#2563eb',
             cursor='hand2',
             padx=15,
             pady=8,
             bd=0,
-            command=self.editar_consulta
+            command=self.marcar_pagado
         )
-        btn_editar.pack(side=tk.LEFT, padx=(0, 10))
+        btn_pagado.pack(side=tk.LEFT, padx=(0, 10))
         
         btn_eliminar = tk.Button(
             toolbar,
@@ -103,131 +105,218 @@ class ConsultaView:
             padx=15,
             pady=8,
             bd=0,
-            command=self.eliminar_consulta
+            command=self.eliminar_pago
         )
         btn_eliminar.pack(side=tk.LEFT, padx=(0, 10))
         
-        # ===== TABLA DE CONSULTAS =====
-        table_frame = tk.Frame(self.parent_frame, bg='white', relief='solid', bd=1)
-        table_frame.pack(fill=tk.BOTH, expand=True)
+        # Filtro por estatus
+        tk.Label(
+            toolbar,
+            text="Estatus:",
+            font=('Arial', 10),
+            bg='#f8fafc'
+        ).pack(side=tk.RIGHT, padx=(10, 5))
         
-        # Scrollbars
-        vsb = ttk.Scrollbar(table_frame, orient="vertical")
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.filtro_var = tk.StringVar(value="Todos")
+        filtro_combo = ttk.Combobox(
+            toolbar,
+            textvariable=self.filtro_var,
+            font=('Arial', 10),
+            values=['Todos'] + PAGOS_CONFIG['estados'],
+            width=15,
+            state='readonly'
+        )
+        filtro_combo.pack(side=tk.RIGHT)
+        filtro_combo.bind('<<ComboboxSelected>>', lambda e: self.filtrar_pagos())
         
-        hsb = ttk.Scrollbar(table_frame, orient="horizontal")
-        hsb.pack(side=tk.BOTTOM, fill=tk.X)
+        # ===== PAGINACIÓN =====
+        self.paginador = Paginador(self.parent_frame, self.cargar_pagos)
+        self.paginador.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
         
-        # Treeview
-        columnas = ('ID', 'Fecha', 'Paciente', 'Psicólogo', 'Duración', 'Diagnóstico')
+        # ===== TABLA DE PAGOS =====
+        table_frame = tk.Frame(self.parent_frame, bg='white', relief='solid', bd=1)
+        table_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.tree = ttk.Treeview(
-            table_frame,
-            columns=columnas,
-            show='headings',
-            yscrollcommand=vsb.set,
-            xscrollcommand=hsb.set,
-            selectmode='browse'
-        )
+        # Tabla virtual: solo se crean en el Treeview los renglones visibles
+        columnas = ('ID', 'Fecha Pago', 'Paciente', 'Fecha Consulta', 'Monto', 'Método', 'Estatus')
         
-        vsb.config(command=self.tree.yview)
-        hsb.config(command=self.tree.xview)
+        self.tree = TablaVirtual(table_frame, columnas)
         
         # Configurar columnas
         self.tree.heading('ID', text='ID')
-        self.tree.heading('Fecha', text='Fecha')
+        self.tree.heading('Fecha Pago', text='Fecha Pago')
         self.tree.heading('Paciente', text='Paciente')
-        self.tree.heading('Psicólogo', text='Psicólogo')
-        self.tree.heading('Duración', text='Duración (min)')
-        self.tree.heading('Diagnóstico', text='Diagnóstico')
+        self.tree.heading('Fecha Consulta', text='Fecha Consulta')
+        self.tree.heading('Monto', text='Monto')
+        self.tree.heading('Método', text='Método')
+        self.tree.heading('Estatus', text='Estatus')
         
         self.tree.column('ID', width=50, anchor='center')
-        self.tree.column('Fecha', width=100, anchor='center')
-        self.tree.column('Paciente', width=200)
-        self.tree.column('Psicólogo', width=200)
-        self.tree.column('Duración', width=100, anchor='center')
-        self.tree.column('Diagnóstico', width=300)
+        self.tree.column('Fecha Pago', width=100, anchor='center')
+        self.tree.column('Paciente', width=220)
+        self.tree.column('Fecha Consulta', width=110, anchor='center')
+        self.tree.column('Monto', width=100, anchor='e')
+        self.tree.column('Método', width=120, anchor='center')
+        self.tree.column('Estatus', width=100, anchor='center')
         
         self.tree.pack(fill=tk.BOTH, expand=True)
         
+        # Aplicar colores por estatus
+        self.tree.tag_configure('Pendiente', background='#fef3c7')
+        self.tree.tag_configure('Pagado', background='#d1fae5')
+        self.tree.tag_configure('Cancelado', background='#fee2e2')
+        
         # Bind eventos
-        self.tree.bind('<Double-1>', lambda e: self.ver_consulta())
-        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<Double-1>', lambda e: self.editar_pago())
     
-    def cargar_consultas(self):
-        """Carga todas las consultas en la tabla"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Las lecturas se hacen en segundo plano mientras exista la tabla
+        self.cargador = CargadorAsincrono(self.tree)
+        
+        # Las filas usan el ID del pago como iid para aplicar cambios
+        self.sincronizador = SincronizadorTabla(
+            self.tree,
+            lambda p: p.id_pago,
+            self.fila_pago,
+            lambda p: (p.fecha_pago, p.id_pago),
+            descendente=True
+        )
         
-        try:
-            consultas = self.controller.listar_consultas()
-            
-            for consulta in consultas:
-                diagnostico = consulta.diagnostico[:50] + '...' if consulta.diagnostico and len(consulta.diagnostico) > 50 else consulta.diagnostico or ''
+    def fila_pago(self, pago) -> tuple:
+        """Valores y tags de la fila de un pago"""
+        return (
+            pago.id_pago,
+            pago.fecha_pago or '',
+            pago.nombre_paciente or '',
+            pago.fecha_consulta or '',
+            f"${pago.monto:,.2f}" if pago.monto is not None else '',
+            pago.metodo or '',
+            pago.estatus_pago
+        ), (pago.estatus_pago,)
+    
+    def estatus_filtrado(self):
+        """Estatus elegido en el filtro (None para todos)"""
+        estatus = self.filtro_var.get()
+        return None if estatus == "Todos" else estatus
+    
+    def cargar_pagos(self):
+        """Pide en segundo plano la página actual de pagos (con el filtro de estatus elegido)"""
+        estatus = self.estatus_filtrado()
+        despues_de = self.paginador.clave_actual
+        limite = self.paginador.limite
+        
+        self.cargador.ejecutar(
+            'pagos',
+            lambda: self.sincronizador.leer_pagina(
+                lambda: self.controller.listar_pagos(estatus=estatus, despues_de=despues_de, limite=limite)
+            ),
+            self.mostrar_pagos,
+            lambda e: messagebox.showerror("Error", f"Error al cargar pagos:\n{str(e)}"),
+            indicador=self.tree
+        )
+    
+    def mostrar_pagos(self, pagina: tuple):
+        """Muestra la página leída por cargar_pagos"""
+        pagos, version = pagina
+        pagos = self.paginador.recibir(pagos, lambda p: (p.fecha_pago, p.id_pago))
+        self.sincronizador.cargar(pagos, version)
+    
+    def actualizar_cambios(self):
+        """Pide en segundo plano solo los pagos que cambiaron desde la última carga"""
+        if self.sincronizador.version is None or self.cargador.cargando('pagos'):
+            self.cargar_pagos()  # La página mostrada no es la que se está leyendo
+            return
                 
-                self.tree.insert('', tk.END, values=(
-                    consulta.id_consulta,
-                    consulta.fecha_cita or '',
-                    consulta.nombre_paciente or '',
-                    consulta.nombre_psicologo or '',
-                    consulta.duracion or '',
-                    diagnostico
-                ))
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar consultas:\n{str(e)}")
+        version = self.sincronizador.version
+        estatus = self.estatus_filtrado()
+        self.cargador.ejecutar(
+            'pagos',
+            lambda: self.controller.listar_pagos_cambios(version, estatus=estatus),
+            self.aplicar_cambios,
+            lambda e: messagebox.showerror("Error", f"Error al actualizar pagos:\n{str(e)}")
+        )
+    
+    def aplicar_cambios(self, cambios):
+        """Aplica a la página los cambios leídos por actualizar_cambios"""
+        if not self.sincronizador.aplicar(cambios, len(self.paginador.claves) == 1,
+                                          not self.paginador.hay_siguiente):
+            self.cargar_pagos()
     
-    def on_select(self, event):
-        """Maneja la selección de una consulta"""
+    def filtrar_pagos(self):
+        """Filtra pagos por estatus desde la primera página"""
+        self.paginador.reiniciar()
+        self.cargar_pagos()
+    
+    @property
+    def pago_seleccionado(self):
+        """El pago de la fila seleccionada (el objeto que ya leyó el listado, sin volver a consultarlo)"""
         selection = self.tree.selection()
-        if selection:
-            item = self.tree.item(selection[0])
-            id_consulta = item['values'][0]
-            self.consulta_seleccionada = self.controller.obtener_consulta_por_id(id_consulta)
+        return self.sincronizador.objeto(selection[0]) if selection else None
     
-    def nueva_consulta(self):
-        """Abre ventana para crear nueva consulta"""
-        FormularioConsulta(self.parent_frame, self.controller, self.cita_controller, None, self.cargar_consultas)
+    def nuevo_pago(self):
+        """Abre ventana para registrar un pago"""
+        FormularioPago(self.parent_frame, self.controller, self.consulta_controller, None, self.actualizar_cambios)
     
-    def ver_consulta(self):
-        """Muestra los detalles completos de la consulta"""
-        if not self.consulta_seleccionada:
-            messagebox.showwarning("Advertencia", "Por favor selecciona una consulta")
+    def editar_pago(self):
+        """Abre ventana para editar el pago seleccionado"""
+        if not self.pago_seleccionado:
+            messagebox.showwarning("Advertencia", "Por favor selecciona un pago")
             return
         
-        DetalleConsulta(self.parent_frame, self.consulta_seleccionada)
+        # El formulario modifica el objeto que recibe: se edita una copia recién
+        # leída y no el de la fila, que solo cambia cuando se guarda
+        pago = self.controller.obtener_pago_por_id(self.pago_seleccionado.id_pago)
+        if not pago:
+            messagebox.showerror("Error", "El pago ya no existe")
+            self.actualizar_cambios()
+            return
+            
+        FormularioPago(self.parent_frame, self.controller, self.consulta_controller,
+                      pago, self.actualizar_cambios)
     
-    def editar_consulta(self):
-        """Abre ventana para editar consulta seleccionada"""
-        if not self.consulta_seleccionada:
-            messagebox.showwarning("Advertencia", "Por favor selecciona una consulta")
+    def marcar_pagado(self):
+        """Marca como pagado el pago seleccionado"""
+        if not self.pago_seleccionado:
+            messagebox.showwarning("Advertencia", "Por favor selecciona un pago")
             return
         
-        FormularioConsulta(self.parent_frame, self.controller, self.cita_controller, 
-                          self.consulta_seleccionada, self.cargar_consultas)
+        if self.pago_seleccionado.esta_pagado():
+            messagebox.showinfo("Información", "Este pago ya está pagado")
+            return
+    
+        try:
+            exito, mensaje = self.controller.marcar_como_pagado(self.pago_seleccionado.id_pago)
+            
+            if exito:
+                messagebox.showinfo("Éxito", mensaje)
+                self.actualizar_cambios()
+            else:
+                messagebox.showerror("Error", mensaje)
+                
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al marcar pago:\n{str(e)}")
     
-    def eliminar_consulta(self):
-        """Elimina la consulta seleccionada"""
-        if not self.consulta_seleccionada:
-            messagebox.showwarning("Advertencia", "Por favor selecciona una consulta")
+    def eliminar_pago(self):
+        """Elimina el pago seleccionado"""
+        if not self.pago_seleccionado:
+            messagebox.showwarning("Advertencia", "Por favor selecciona un pago")
             return
         
         respuesta = messagebox.askyesno(
             "Confirmar Eliminación",
-            f"¿Estás seguro de eliminar esta consulta?\n\n"
-            f"Paciente: {self.consulta_seleccionada.nombre_paciente}\n"
-            f"Fecha: {self.consulta_seleccionada.fecha_cita}\n\n"
+            f"¿Estás seguro de eliminar este pago?\n\n"
+            f"Paciente: {self.pago_seleccionado.nombre_paciente}\n"
+            f"Monto: ${self.pago_seleccionado.monto:,.2f}\n\n"
             "Esta acción no se puede deshacer."
         )
         
         if respuesta:
             try:
-                exito, mensaje = self.controller.eliminar_consulta(self.consulta_seleccionada.id_consulta)
+                exito, mensaje = self.controller.eliminar_pago(self.pago_seleccionado.id_pago)
                 
                 if exito:
                     messagebox.showinfo("Éxito", mensaje)
-                    self.cargar_consultas()
-                    self.consulta_seleccionada = None
+                    self.sincronizador.quitar(self.pago_seleccionado.id_pago)
+                    self.actualizar_cambios()
                 else:
                     messagebox.showerror("Error", mensaje)
             
@@ -235,33 +324,33 @@ class ConsultaView:
                 messagebox.showerror("Error", f"Error al eliminar:\n{str(e)}")
 
 
-class FormularioConsulta:
-    """Ventana de formulario para crear/editar consulta"""
+class FormularioPago:
+    """Ventana de formulario para registrar/editar pago"""
     
-    def __init__(self, parent, controller, cita_controller, consulta=None, callback=None):
+    def __init__(self, parent, controller, consulta_controller, pago=None, callback=None):
         self.controller = controller
-        self.cita_controller = cita_controller
-        self.consulta = consulta
+        self.consulta_controller = consulta_controller
+        self.pago = pago
         self.callback = callback
         
         # Crear ventana
         self.ventana = tk.Toplevel(parent)
-        self.ventana.title("Nueva Consulta" if not consulta else "Editar Consulta")
-        self.ventana.geometry("600x650")
+        self.ventana.title("Nuevo Pago" if not pago else "Editar Pago")
+        self.ventana.geometry("500x480")
         self.ventana.resizable(False, False)
         self.ventana.grab_set()
         
         # Centrar ventana
         self.centrar_ventana()
         
-        # Cargar citas completadas
-        self.citas = self.cita_controller.listar_citas(estado='Completada')
+        # Consultas recientes a las que se puede asociar el pago
+        self.consultas = [] if pago else self.consulta_controller.listar_consultas(limite=200)
         
         # Crear formulario
         self.crear_formulario()
         
         # Si es edición, cargar datos
-        if self.consulta:
+        if self.pago:
             self.cargar_datos()
     
     def centrar_ventana(self):
@@ -281,73 +370,62 @@ class FormularioConsulta:
         # Título
         titulo = tk.Label(
             main_frame,
-            text="Nueva Consulta" if not self.consulta else "Editar Consulta",
+            text="Nuevo Pago" if not self.pago else "Editar Pago",
             font=('Arial', 18, 'bold'),
             bg='white'
         )
         titulo.pack(pady=(0, 20))
         
-        # Cita (solo en nuevo)
-        if not self.consulta:
-            tk.Label(main_frame, text="Cita Completada *", font=('Arial', 10, 'bold'),
+        # Consulta (solo en nuevo)
+        if not self.pago:
+            tk.Label(main_frame, text="Consulta *", font=('Arial', 10, 'bold'),
                     bg='white', fg='#1e293b').pack(anchor='w')
             
-            self.cita_var = tk.StringVar()
-            cita_combo = ttk.Combobox(
+            self.consulta_var = tk.StringVar()
+            consulta_combo = ttk.Combobox(
                 main_frame,
-                textvariable=self.cita_var,
+                textvariable=self.consulta_var,
                 font=('Arial', 10),
                 state='readonly'
             )
-            cita_combo['values'] = [
-                f"{c.id_cita} - {c.nombre_paciente} - {c.fecha} {c.hora}" 
-                for c in self.citas
+            consulta_combo['values'] = [
+                f"{c.id_consulta} - {c.nombre_paciente} - {c.fecha_cita}"
+                for c in self.consultas
             ]
-            cita_combo.pack(fill=tk.X, ipady=6, pady=(5, 10))
-            self.cita_combo = cita_combo
-        
-        # Duración
-        tk.Label(main_frame, text="Duración (minutos)", font=('Arial', 10, 'bold'),
-                bg='white', fg='#1e293b').pack(anchor='w')
-        
-        self.duracion_entry = ttk.Entry(main_frame, font=('Arial', 11))
-        self.duracion_entry.pack(fill=tk.X, ipady=6, pady=(5, 10))
+            consulta_combo.pack(fill=tk.X, ipady=6, pady=(5, 10))
         
-        # Notas
-        tk.Label(main_frame, text="Notas de la Consulta", font=('Arial', 10, 'bold'),
+        # Monto
+        tk.Label(main_frame, text=f"Monto ({PAGOS_CONFIG['moneda']}) *", font=('Arial', 10, 'bold'),
                 bg='white', fg='#1e293b').pack(anchor='w')
         
-        self.notas_text = scrolledtext.ScrolledText(
-            main_frame,
-            font=('Arial', 10),
-            height=4,
-            wrap=tk.WORD
-        )
-        self.notas_text.pack(fill=tk.X, pady=(5, 10))
+        self.monto_entry = ttk.Entry(main_frame, font=('Arial', 11))
+        self.monto_entry.pack(fill=tk.X, ipady=6, pady=(5, 10))
         
-        # Diagnóstico
-        tk.Label(main_frame, text="Diagnóstico", font=('Arial', 10, 'bold'),
+        # Método
+        tk.Label(main_frame, text="Método de Pago *", font=('Arial', 10, 'bold'),
                 bg='white', fg='#1e293b').pack(anchor='w')
         
-        self.diagnostico_text = scrolledtext.ScrolledText(
+        self.metodo_var = tk.StringVar(value=PAGOS_CONFIG['metodos_pago'][0])
+        ttk.Combobox(
             main_frame,
+            textvariable=self.metodo_var,
             font=('Arial', 10),
-            height=4,
-            wrap=tk.WORD
-        )
-        self.diagnostico_text.pack(fill=tk.X, pady=(5, 10))
+            values=PAGOS_CONFIG['metodos_pago'],
+            state='readonly'
+        ).pack(fill=tk.X, ipady=6, pady=(5, 10))
         
-        # Recomendaciones
-        tk.Label(main_frame, text="Recomendaciones", font=('Arial', 10, 'bold'),
+        # Estatus
+        tk.Label(main_frame, text="Estatus", font=('Arial', 10, 'bold'),
                 bg='white', fg='#1e293b').pack(anchor='w')
         
-        self.recomend_text = scrolledtext.ScrolledText(
+        self.estatus_var = tk.StringVar(value='Pendiente')
+        ttk.Combobox(
             main_frame,
+            textvariable=self.estatus_var,
             font=('Arial', 10),
-            height=4,
-            wrap=tk.WORD
-        )
-        self.recomend_text.pack(fill=tk.X, pady=(5, 10))
+            values=PAGOS_CONFIG['estados'],
+            state='readonly'
+        ).pack(fill=tk.X, ipady=6, pady=(5, 10))
         
         # Botones
         btn_frame = tk.Frame(main_frame, bg='white')
@@ -380,60 +458,48 @@ class FormularioConsulta:
         ).pack(side=tk.RIGHT)
     
     def cargar_datos(self):
-        """Carga los datos de la consulta en el formulario"""
-        self.duracion_entry.insert(0, str(self.consulta.duracion) if self.consulta.duracion else '')
-        
-        if self.consulta.notas:
-            self.notas_text.insert('1.0', self.consulta.notas)
-        
-        if self.consulta.diagnostico:
-            self.diagnostico_text.insert('1.0', self.consulta.diagnostico)
-        
-        if self.consulta.recomend:
-            self.recomend_text.insert('1.0', self.consulta.recomend)
+        """Carga los datos del pago en el formulario"""
+        self.monto_entry.insert(0, f"{self.pago.monto:.2f}" if self.pago.monto is not None else '')
+        self.metodo_var.set(self.pago.metodo or PAGOS_CONFIG['metodos_pago'][0])
+        self.estatus_var.set(self.pago.estatus_pago)
     
     def guardar(self):
-        """Guarda la consulta"""
-        # Obtener valores
-        duracion = self.duracion_entry.get().strip()
-        notas = self.notas_text.get('1.0', tk.END).strip()
-        diagnostico = self.diagnostico_text.get('1.0', tk.END).strip()
-        recomend = self.recomend_text.get('1.0', tk.END).strip()
-        
-        # Validar duración
-        if duracion:
-            try:
-                duracion = int(duracion)
-            except:
-                messagebox.showerror("Error", "La duración debe ser un número entero")
-                return
-        else:
-            duracion = None
+        """Guarda el pago"""
+        # Validar monto
+        try:
+            monto = float(self.monto_entry.get().strip())
+        except ValueError:
+            messagebox.showerror("Error", "El monto debe ser un número")
+            return
+        
+        if not PAGOS_CONFIG['monto_minimo'] <= monto <= PAGOS_CONFIG['monto_maximo']:
+            messagebox.showerror(
+                "Error",
+                f"El monto debe estar entre ${PAGOS_CONFIG['monto_minimo']:,.2f} "
+                f"y ${PAGOS_CONFIG['monto_maximo']:,.2f}"
+            )
+            return
         
         try:
-            if self.consulta:  # Editar
-                self.consulta.duracion = duracion
-                self.consulta.notas = notas if notas else None
-                self.consulta.diagnostico = diagnostico if diagnostico else None
-                self.consulta.recomend = recomend if recomend else None
+            if self.pago:  # Editar
+                self.pago.monto = monto
+                self.pago.metodo = self.metodo_var.get()
+                self.pago.estatus_pago = self.estatus_var.get()
                 
-                exito, mensaje = self.controller.actualizar_consulta(self.consulta)
-            else:  # Nueva
-                if not self.cita_var.get():
-                    messagebox.showwarning("Campo Requerido", "Selecciona una cita")
+                exito, mensaje = self.controller.actualizar_pago(self.pago)
+            else:  # Nuevo
+                if not self.consulta_var.get():
+                    messagebox.showwarning("Campo Requerido", "Selecciona una consulta")
                     return
                 
-                id_cita = int(self.cita_var.get().split(' - ')[0])
-                
-                nueva_consulta = Consulta(
-                    id_cita=id_cita,
-                    duracion=duracion,
-                    notas=notas if notas else None,
-                    diagnostico=diagnostico if diagnostico else None,
-                    recomend=recomend if recomend else None
+                nuevo_pago = Pago(
+                    id_consulta=int(self.consulta_var.get().split(' - ')[0]),
+                    monto=monto,
+                    metodo=self.metodo_var.get(),
+                    estatus_pago=self.estatus_var.get()
                 )
                 
-                exito, mensaje, id_consulta = self.controller.crear_consulta(nueva_consulta)
+                exito, mensaje, id_pago = self.controller.crear_pago(nuevo_pago)
             
             if exito:
                 messagebox.showinfo("Éxito", mensaje)
@@ -445,134 +511,3 @@ class FormularioConsulta:
         
         except Exception as e:
             messagebox.showerror("Error", f"Error al guardar:\n{str(e)}")
-
-
-class DetalleConsulta:
-    """Ventana para ver detalles completos de una consulta"""
-    
-    def __init__(self, parent, consulta):
-        self.consulta = consulta
-        
-        # Crear ventana
-        self.ventana = tk.Toplevel(parent)
-        self.ventana.title("Detalles de la Consulta")
-        self.ventana.geometry("600x550")
-        self.ventana.resizable(False, False)
-        self.ventana.grab_set()
-        
-        # Centrar ventana
-        self.centrar_ventana()
-        
-        # Crear contenido
-        self.crear_widgets()
-    
-    def centrar_ventana(self):
-        """Centra la ventana en la pantalla"""
-        self.ventana.update_idletasks()
-        ancho = self.ventana.winfo_width()
-        alto = self.ventana.winfo_height()
-        x = (self.ventana.winfo_screenwidth() // 2) - (ancho // 2)
-        y = (self.ventana.winfo_screenheight() // 2) - (alto // 2)
-        self.ventana.geometry(f'{ancho}x{alto}+{x}+{y}')
-    
-    def crear_widgets(self):
-        """Crea el contenido de la ventana"""
-        main_frame = tk.Frame(self.ventana, bg='white', padx=30, pady=20)
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Título
-        tk.Label(
-            main_frame,
-            text="Detalles de la Consulta",
-            font=('Arial', 20, 'bold'),
-            bg='white',
-            fg='#1e293b'
-        ).pack(pady=(0, 20))
-        
-        # Información básica
-        info_frame = tk.Frame(main_frame, bg='#f8fafc', relief='solid', bd=1)
-        info_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        info_data = [
-            ("📅 Fecha:", self.consulta.fecha_cita or 'N/A'),
-            ("👤 Paciente:", self.consulta.nombre_paciente or 'N/A'),
-            ("👨‍⚕️ Psicólogo:", self.consulta.nombre_psicologo or 'N/A'),
-            ("⏱️ Duración:", f"{self.consulta.duracion} minutos" if self.consulta.duracion else 'N/A')
-        ]
-        
-        for label, value in info_data:
-            row = tk.Frame(info_frame, bg='#f8fafc')
-            row.pack(fill=tk.X, padx=15, pady=8)
-            
-            tk.Label(
-                row,
-                text=label,
-                font=('Arial', 10, 'bold'),
-                bg='#f8fafc',
-                fg='#64748b',
-                width=15,
-                anchor='w'
-            ).pack(side=tk.LEFT)
-            
-            tk.Label(
-                row,
-                text=value,
-                font=('Arial', 10),
-                bg='#f8fafc',
-                fg='#1e293b',
-                anchor='w'
-            ).pack(side=tk.LEFT, fill=tk.X, expand=True)
-        
-        # Notas
-        if self.consulta.notas:
-            self.crear_seccion(main_frame, "📝 Notas", self.consulta.notas)
-        
-        # Diagnóstico
-        if self.consulta.diagnostico:
-            self.crear_seccion(main_frame, "🔍 Diagnóstico", self.consulta.diagnostico)
-        
-        # Recomendaciones
-        if self.consulta.recomend:
-            self.crear_seccion(main_frame, "💡 Recomendaciones", self.consulta.recomend)
-        
-        # Botón cerrar
-        tk.Button(
-            main_frame,
-            text="Cerrar",
-            font=('Arial', 11, 'bold'),
-            bg='#64748b',
-            fg='white',
-            cursor='hand2',
-            padx=30,
-            pady=10,
-            bd=0,
-            command=self.ventana.destroy
-        ).pack(pady=(15, 0))
-    
-    def crear_seccion(self, parent, titulo, contenido):
-        """Crea una sección con título y contenido"""
-        tk.Label(
-            parent,
-            text=titulo,
-            font=('Arial', 11, 'bold'),
-            bg='white',
-            fg='#1e293b'
-        ).pack(anchor='w', pady=(10, 5))
-        
-        text_frame = tk.Frame(parent, bg='#f8fafc', relief='solid', bd=1)
-        text_frame.pack(fill=tk.BOTH, pady=(0, 10))
-        
-        text_widget = tk.Text(
-            text_frame,
-            font=('Arial', 10),
-            bg='#f8fafc',
-            fg='#1e293b',
-            height=3,
-            wrap=tk.WORD,
-            relief='flat',
-            padx=10,
-            pady=10
-        )
-        text_widget.pack(fill=tk.BOTH, expand=True)
-        text_widget.insert('1.0', contenido)
-        text_widget.config(state='disabled')
\ No newline at end of file
@@ -6,8 +6,12 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from controllers.psicologo_controller import PsicologoController
 from controllers.usuario_controller import UsuarioController
+from config.database import db
 from models.psicologo import Psicologo
 from models.usuario import Usuario
+from views.sincronizador import SincronizadorTabla
+from views.tabla_virtual import TablaVirtual
+from views.cargador import CargadorAsincrono
 
 class PsicologoView:
     """Ventana para gestionar psicólogos"""
@@ -17,9 +21,6 @@ class PsicologoView:
         self.controller = PsicologoController()
         self.usuario_controller = UsuarioController()
         
-        # Variables
-        self.psicologo_seleccionado = None
-        
         # Crear interfaz
         self.crear_widgets()
         
@@ -120,27 +121,10 @@ class PsicologoView:
         table_frame = tk.Frame(self.parent_frame, bg='white', relief='solid', bd=1)
         table_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Scrollbars
-        vsb = ttk.Scrollbar(table_frame, orient="vertical")
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        hsb = ttk.Scrollbar(table_frame, orient="horizontal")
-        hsb.pack(side=tk.BOTTOM, fill=tk.X)
-        
-        # Treeview
+        # Tabla virtual: solo se crean en el Treeview los renglones visibles
         columnas = ('ID', 'Nombre', 'Correo', 'Especialidad', 'Cédula', 'Experiencia')
         
-        self.tree = ttk.Treeview(
-            table_frame,
-            columns=columnas,
-            show='headings',
-            yscrollcommand=vsb.set,
-            xscrollcommand=hsb.set,
-            selectmode='browse'
-        )
-        
-        vsb.config(command=self.tree.yview)
-        hsb.config(command=self.tree.xview)
+        self.tree = TablaVirtual(table_frame, columnas)
         
         # Configurar columnas
         self.tree.heading('ID', text='ID')
@@ -162,69 +146,60 @@ class PsicologoView:
         # Bind doble click
         self.tree.bind('<Double-1>', lambda e: self.editar_psicologo())
         
-        # Bind selección
-        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        # Las lecturas se hacen en segundo plano mientras exista la tabla
+        self.cargador = CargadorAsincrono(self.tree)
+    
+        # Las filas usan el ID del psicólogo como iid: al recargar solo cambian las que difieren
+        self.sincronizador = SincronizadorTabla(
+            self.tree,
+            lambda p: p.id_psicologo,
+            self.fila_psicologo,
+            lambda p: (p.nombre or '', p.id_psicologo)
+        )
+    
+    def fila_psicologo(self, psicologo) -> tuple:
+        """Valores y tags de la fila de un psicólogo"""
+        return (
+            psicologo.id_psicologo,
+            psicologo.nombre or 'Sin nombre',
+            psicologo.correo or '',
+            psicologo.especialidad,
+            psicologo.cedula,
+            psicologo.experiencia or ''
+        ), ()
     
     def cargar_psicologos(self):
-        """Carga todos los psicólogos en la tabla"""
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Pide en segundo plano los psicólogos (con el filtro elegido) y las especialidades"""
+        especialidad = self.filtro_var.get()
+        especialidad = None if especialidad == "Todas" else especialidad
+        
+        self.cargador.ejecutar(
+            'psicologos',
+            lambda: (self.controller.listar_psicologos(especialidad=especialidad),
+                     self.controller.obtener_especialidades()),
+            self.mostrar_psicologos,
+            lambda e: messagebox.showerror("Error", f"Error al cargar psicólogos:\n{str(e)}"),
+            indicador=self.tree
+        )
+    
+    def mostrar_psicologos(self, resultado: tuple):
+        """Muestra los psicólogos leídos por cargar_psicologos"""
+        psicologos, especialidades = resultado
         
-        try:
-            psicologos = self.controller.listar_psicologos()
-            
-            # Actualizar filtro de especialidades
-            especialidades = ['Todas'] + self.controller.obtener_especialidades()
-            self.filtro_combo['values'] = especialidades
-            
-            for psicologo in psicologos:
-                self.tree.insert('', tk.END, values=(
-                    psicologo.id_psicologo,
-                    psicologo.nombre or 'Sin nombre',
-                    psicologo.correo or '',
-                    psicologo.especialidad,
-                    psicologo.cedula,
-                    psicologo.experiencia or ''
-                ))
+        # Actualizar filtro de especialidades
+        self.filtro_combo['values'] = ['Todas'] + especialidades
         
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar psicólogos:\n{str(e)}")
+        self.sincronizador.cargar(psicologos)
     
     def filtrar_por_especialidad(self):
         """Filtra psicólogos por especialidad"""
-        especialidad = self.filtro_var.get()
-        
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        try:
-            if especialidad == "Todas":
-                psicologos = self.controller.listar_psicologos()
-            else:
-                psicologos = self.controller.listar_psicologos(especialidad=especialidad)
-            
-            for psicologo in psicologos:
-                self.tree.insert('', tk.END, values=(
-                    psicologo.id_psicologo,
-                    psicologo.nombre or 'Sin nombre',
-                    psicologo.correo or '',
-                    psicologo.especialidad,
-                    psicologo.cedula,
-                    psicologo.experiencia or ''
-                ))
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al filtrar:\n{str(e)}")
+        self.cargar_psicologos()
     
-    def on_select(self, event):
-        """Maneja la selección de un psicólogo"""
+    @property
+    def psicologo_seleccionado(self):
+        """El psicólogo de la fila seleccionada (el objeto que ya leyó el listado, sin volver a consultarlo)"""
         selection = self.tree.selection()
-        if selection:
-            item = self.tree.item(selection[0])
-            id_psicologo = item['values'][0]
-            self.psicologo_seleccionado = self.controller.obtener_psicologo_por_id(id_psicologo)
+        return self.sincronizador.objeto(selection[0]) if selection else None
     
     def nuevo_psicologo(self):
         """Abre ventana para crear nuevo psicólogo"""
@@ -236,7 +211,15 @@ class PsicologoView:
             messagebox.showwarning("Advertencia", "Por favor selecciona un psicólogo")
             return
         
-        FormularioPsicologo(self.parent_frame, self.controller, self.usuario_controller, self.psicologo_seleccionado, self.cargar_psicologos)
+        # El formulario modifica el objeto que recibe: se edita una copia recién
+        # leída y no el de la fila, que solo cambia cuando se guarda
+        psicologo = self.controller.obtener_psicologo_por_id(self.psicologo_seleccionado.id_psicologo)
+        if not psicologo:
+            messagebox.showerror("Error", "El psicólogo ya no existe")
+            self.cargar_psicologos()
+            return
+            
+        FormularioPsicologo(self.parent_frame, self.controller, self.usuario_controller, psicologo, self.cargar_psicologos)
     
     def eliminar_psicologo(self):
         """Elimina el psicólogo seleccionado"""
@@ -257,8 +240,8 @@ class PsicologoView:
                 
                 if exito:
                     messagebox.showinfo("Éxito", mensaje)
+                    self.sincronizador.quitar(self.psicologo_seleccionado.id_psicologo)
                     self.cargar_psicologos()
-                    self.psicologo_seleccionado = None
                 else:
                     messagebox.showerror("Error", mensaje)
             
@@ -438,17 +421,23 @@ class FormularioPsicologo:
                 self.psicologo.experiencia = experiencia if experiencia else None
                 self.psicologo.cedula = cedula
                 
-                exito, mensaje = self.controller.actualizar_psicologo(self.psicologo)
+                # Psicólogo y usuario se guardan juntos o no se guardan
+                with db.transaccion():
+                    exito, mensaje = self.controller.actualizar_psicologo(self.psicologo)
                 
-                # También actualizar usuario
-                usuario = self.usuario_controller.obtener_usuario_por_id(self.psicologo.id_usuario)
-                if usuario:
-                    usuario.nombre = nombre
-                    usuario.correo = correo
-                    self.usuario_controller.actualizar_usuario(usuario)
+                    # También actualizar usuario
+                    usuario = self.usuario_controller.obtener_usuario_por_id(self.psicologo.id_usuario)
+                    if exito and usuario:
+                        usuario.nombre = nombre
+                        usuario.correo = correo
+                        exito_usuario, mensaje_usuario = self.usuario_controller.actualizar_usuario(usuario)
+                        if not exito_usuario:
+                            exito, mensaje = False, f"Error al actualizar usuario:\n{mensaje_usuario}"
+                            
+                    if not exito:
+                        db.cancelar_transaccion()
             
             else:  # Nuevo
-                # Primero crear el usuario
                 nuevo_usuario = Usuario(
                     nombre=nombre,
                     correo=correo,
@@ -456,21 +445,27 @@ class FormularioPsicologo:
                     rol='psicologo'
                 )
                 
-                exito_usuario, mensaje_usuario, id_usuario = self.usuario_controller.crear_usuario(nuevo_usuario)
+                # Usuario y psicólogo en una sola transacción: si falla el
+                # psicólogo no queda un usuario huérfano
+                with db.transaccion():
+                    # Primero crear el usuario
+                    exito, mensaje, id_usuario = self.usuario_controller.crear_usuario(nuevo_usuario)
                 
-                if not exito_usuario:
-                    messagebox.showerror("Error", f"Error al crear usuario:\n{mensaje_usuario}")
-                    return
+                    if exito:
+                        # Luego crear el psicólogo
+                        nuevo_psicologo = Psicologo(
+                            id_usuario=id_usuario,
+                            especialidad=especialidad,
+                            experiencia=experiencia if experiencia else None,
+                            cedula=cedula
+                        )
                 
-                # Luego crear el psicólogo
-                nuevo_psicologo = Psicologo(
-                    id_usuario=id_usuario,
-                    especialidad=especialidad,
-                    experiencia=experiencia if experiencia else None,
-                    cedula=cedula
-                )
+                        exito, mensaje, id_psicologo = self.controller.crear_psicologo(nuevo_psicologo)
+                    else:
+                        mensaje = f"Error al crear usuario:\n{mensaje}"
                 
-                exito, mensaje, id_psicologo = self.controller.crear_psicologo(nuevo_psicologo)
+                    if not exito:
+                        db.cancelar_transaccion()
             
             if exito:
                 messagebox.showinfo("Éxito", mensaje)
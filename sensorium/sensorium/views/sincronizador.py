@@ -0,0 +1,181 @@
+"""
+Sincronización incremental de las tablas de los módulos
+Después de crear, editar o eliminar se piden solo las filas que cambiaron
+(listar_*_cambios) en lugar de volver a leer la página completa
+"""
+
+import tkinter as tk
+from config.database import db
+
+class SincronizadorTabla:
+    """
+    Mantiene al día la página que muestra un Treeview
+    Cada fila usa como iid el ID de su objeto y se recuerda su clave de
+    orden (la misma de la paginación) para colocar las filas nuevas en su lugar.
+    También se guarda el objeto de cada fila: al seleccionarla la vista lo
+    toma de aquí en lugar de volver a consultarlo
+    """
+    
+    def __init__(self, tree, identificador, fila, clave, descendente: bool = False):
+        """
+        Args:
+            tree: ttk.Treeview de la vista
+            identificador: Función objeto -> ID (iid de la fila)
+            fila: Función objeto -> (values, tags) de la fila
+            clave: Función objeto -> clave de orden del listado
+            descendente: El listado va de la clave mayor a la menor
+        """
+        self.tree = tree
+        self.identificador = identificador
+        self.fila = fila
+        self.clave = clave
+        self.descendente = descendente
+        
+        self.version = None  # Versión de los datos mostrados
+        self._claves = {}  # iid -> clave de orden
+        self._objetos = {}  # iid -> objeto mostrado en la fila
+    
+    @staticmethod
+    def leer_pagina(listar) -> tuple:
+        """
+        Lee la versión de los datos y después la página completa
+        No toca el Treeview: se puede llamar desde un hilo de carga
+        Args:
+            listar: Función sin argumentos que devuelve la página; debe leer de
+                    la base de datos y no de la caché de consultas (una página
+                    guardada puede ser anterior a la versión y los cambios
+                    intermedios no volverían con listar_*_cambios)
+        Returns:
+            tuple: (objetos, version) para cargar()
+        """
+        version = db.version_datos()
+        return listar(), version
+    
+    def objeto(self, iid):
+        """
+        Objeto mostrado en una fila (el mismo que leyó el listado)
+        Args:
+            iid: iid de la fila (ID del objeto)
+        Returns:
+            Objeto de la fila o None si no está en la página
+        """
+        return self._objetos.get(str(iid))
+    
+    def quitar(self, identificador):
+        """
+        Quita de inmediato la fila de un objeto eliminado
+        Args:
+            identificador: ID del objeto
+        """
+        self._quitar(str(identificador))
+    
+    def cargar(self, objetos: list, version: int = None):
+        """
+        Muestra una página completa comparándola con la que ya se muestra
+        Las filas que siguen (mismo ID) se actualizan en su lugar, así se
+        conservan la selección y el desplazamiento; solo se insertan las
+        nuevas y se eliminan las que ya no están
+        Args:
+            objetos: Objetos de la página
+            version: Versión leída antes que la página (leer_pagina); None si
+                     la página no admite cambios incrementales
+        """
+        self.version = version
+        filas = [(str(self.identificador(objeto)), objeto) for objeto in objetos]
+        
+        vigentes = {iid for iid, _ in filas}
+        quitar = [iid for iid in self.tree.get_children() if iid not in vigentes]
+        if quitar:
+            self.tree.delete(*quitar)
+            
+        claves = {}
+        objetos = {}
+        for posicion, (iid, objeto) in enumerate(filas):
+            if self.tree.exists(iid):
+                values, tags = self.fila(objeto)
+                self.tree.item(iid, values=values, tags=tags)
+                self.tree.move(iid, '', posicion)
+            else:
+                self._insertar(objeto, posicion)
+            claves[iid] = self.clave(objeto)
+            objetos[iid] = objeto
+        self._claves = claves
+        self._objetos = objetos
+    
+    def aplicar(self, cambios, primera_pagina: bool = True, ultima_pagina: bool = True) -> bool:
+        """
+        Aplica a la página los cambios obtenidos con listar_*_cambios(self.version)
+        Las filas nuevas se muestran si su clave cae dentro de la página; las
+        que quedan antes de la primera fila solo en la primera página y las
+        que quedan después de la última solo en la última
+        Args:
+            cambios: Cambios (actualizados, eliminados, version) o None
+            primera_pagina: La página mostrada es la primera
+            ultima_pagina: No hay página siguiente
+        Returns:
+            bool: False si no se pudieron aplicar (se debe recargar la página)
+        """
+        if cambios is None or self.version is None:
+            return False
+            
+        for id_eliminado in cambios.eliminados:
+            self._quitar(str(id_eliminado))
+            
+        hijos = self.tree.get_children()
+        primera = self._claves[hijos[0]] if hijos else None
+        ultima = self._claves[hijos[-1]] if hijos else None
+        
+        for objeto in cambios.actualizados:
+            iid = str(self.identificador(objeto))
+            clave = self.clave(objeto)
+            
+            dentro = not hijos or (
+                (primera_pagina or not self._antes(clave, primera)) and
+                (ultima_pagina or not self._antes(ultima, clave))
+            )
+            if not dentro:
+                self._quitar(iid)  # Se movió a otra página
+                continue
+                
+            posicion = self._posicion(clave, iid)
+            if self.tree.exists(iid):
+                values, tags = self.fila(objeto)
+                self.tree.item(iid, values=values, tags=tags)
+                self.tree.move(iid, '', posicion)
+                self._claves[iid] = clave
+                self._objetos[iid] = objeto
+            else:
+                self._insertar(objeto, posicion)
+                
+        self.version = cambios.version
+        return True
+    
+    def _antes(self, clave_a, clave_b) -> bool:
+        """Indica si clave_a va antes que clave_b en el orden del listado"""
+        return clave_a > clave_b if self.descendente else clave_a < clave_b
+    
+    def _posicion(self, clave, iid: str) -> int:
+        """Índice que le toca a una clave entre las demás filas"""
+        posicion = 0
+        for hijo in self.tree.get_children():
+            if hijo == iid:
+                continue
+            if self._antes(clave, self._claves[hijo]):
+                break
+            posicion += 1
+        return posicion
+    
+    def _insertar(self, objeto, posicion):
+        """Agrega la fila de un objeto"""
+        iid = str(self.identificador(objeto))
+        values, tags = self.fila(objeto)
+        self.tree.insert('', posicion, iid=iid, values=values, tags=tags)
+        self._claves[iid] = self.clave(objeto)
+        self._objetos[iid] = objeto
+    
+    def _quitar(self, iid: str):
+        """Elimina una fila si está en la página"""
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+        self._claves.pop(iid, None)
+        self._objetos.pop(iid, None)
@@ -0,0 +1,329 @@
+"""
+Tabla virtual para los listados de los módulos
+Guarda todas las filas como tuplas (values, tags) y solo crea en el Treeview
+los renglones que caben en pantalla; al desplazarse se reutilizan esos mismos
+renglones con otros valores. Cargar miles de filas no crea miles de items de Tk
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+class TablaVirtual(tk.Frame):
+    """
+    Treeview de una sola selección con filas virtuales
+    Ofrece la parte de la interfaz de ttk.Treeview que usan las vistas y
+    SincronizadorTabla (insert, item, move, delete, get_children, exists,
+    selection, heading, column, tag_configure, bind); los iid son los de
+    las filas, no los de los renglones del Treeview
+    """
+    
+    def __init__(self, parent, columnas, overscan: int = 5):
+        """
+        Args:
+            parent: Contenedor de la tabla
+            columnas: Nombres de las columnas
+            overscan: Renglones extra (debajo de los visibles) que se mantienen creados
+        """
+        super().__init__(parent, bg='white')
+        self.overscan = overscan
+        
+        self._iids = []  # Orden de las filas
+        self._filas = {}  # iid -> (values, tags)
+        self._posiciones = None  # iid -> índice en self._iids (None = recalcular)
+        self._inicio = 0  # Índice de la primera fila visible
+        self._ancla = None  # Primera fila visible antes de insertar / mover / eliminar
+        self._seleccion = None  # iid de la fila seleccionada
+        
+        self._renglones = []  # Items del Treeview reutilizados
+        self._mostrado = {}  # renglón -> (iid, values, tags) que muestra
+        self._al_seleccionar = []  # Funciones ligadas a <<TreeviewSelect>>
+        self._dibujo_pendiente = None
+        
+        # Scrollbars
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.hsb = ttk.Scrollbar(self, orient="horizontal")
+        self.hsb.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        self.tree = ttk.Treeview(
+            self,
+            columns=columnas,
+            show='headings',
+            xscrollcommand=self.hsb.set,
+            selectmode='browse'
+        )
+        self.hsb.config(command=self.tree.xview)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        
+        self.tree.bind('<<TreeviewSelect>>', self._seleccion_tk)
+        self.tree.bind('<Configure>', lambda e: self._programar_dibujo())
+        self.tree.bind('<MouseWheel>', self._rueda)
+        self.tree.bind('<Button-4>', lambda e: self._desplazar(-3))
+        self.tree.bind('<Button-5>', lambda e: self._desplazar(3))
+        for tecla in ('<Up>', '<Down>', '<Prior>', '<Next>', '<Home>', '<End>'):
+            self.tree.bind(tecla, self._tecla)
+            
+    # ===== INTERFAZ DE TREEVIEW =====
+    
+    def heading(self, columna, **opciones):
+        return self.tree.heading(columna, **opciones)
+    
+    def column(self, columna, **opciones):
+        return self.tree.column(columna, **opciones)
+    
+    def tag_configure(self, tag, **opciones):
+        return self.tree.tag_configure(tag, **opciones)
+    
+    def bind(self, secuencia=None, funcion=None, add=None):
+        """<<TreeviewSelect>> se avisa solo cuando cambia la fila seleccionada; lo demás va al Treeview"""
+        if secuencia == '<<TreeviewSelect>>':
+            if not add:
+                self._al_seleccionar.clear()
+            self._al_seleccionar.append(funcion)
+            return None
+        return self.tree.bind(secuencia, funcion, add)
+    
+    def get_children(self, item: str = '') -> tuple:
+        return tuple(self._iids)
+    
+    def exists(self, iid) -> bool:
+        return str(iid) in self._filas
+    
+    def insert(self, parent, index, iid=None, values=(), tags=()) -> str:
+        """Agrega una fila en la posición index (número o tk.END)"""
+        iid = str(iid if iid is not None else id(values))
+        if iid in self._filas:
+            raise tk.TclError(f'Item {iid} already exists')
+        self._anclar()
+        self._filas[iid] = (tuple(values), self._como_tupla(tags))
+        if index == tk.END or index >= len(self._iids):
+            if self._posiciones is not None:
+                self._posiciones[iid] = len(self._iids)
+            self._iids.append(iid)
+        else:
+            self._iids.insert(index, iid)
+            self._posiciones = None
+        self._programar_dibujo()
+        return iid
+    
+    def item(self, iid, option=None, **opciones):
+        """Lee (dict con 'values' y 'tags') o cambia values / tags de una fila"""
+        iid = str(iid)
+        values, tags = self._filas[iid]
+        if not opciones:
+            datos = {'values': list(values), 'tags': list(tags)}
+            return datos[option] if option else datos
+        nuevos = (tuple(opciones.get('values', values)), self._como_tupla(opciones.get('tags', tags)))
+        if nuevos != (values, tags):  # Sin cambios no hay que volver a dibujar
+            self._filas[iid] = nuevos
+            self._programar_dibujo()
+        return None
+    
+    def move(self, iid, parent, index):
+        """Cambia una fila de posición"""
+        iid = str(iid)
+        actual = self._posicion(iid)
+        if actual == index:
+            return  # Ya está en su lugar
+        self._anclar()
+        if self._ancla == iid:
+            # La vista se queda donde estaba, no sigue a la fila movida
+            self._ancla = self._iids[actual + 1] if actual + 1 < len(self._iids) else None
+        self._iids.pop(actual)
+        self._iids.insert(index, iid)
+        self._posiciones = None
+        self._programar_dibujo()
+    
+    def delete(self, *iids):
+        """Elimina filas"""
+        if not iids:
+            return
+        quitar = {str(iid) for iid in iids}
+        if len(quitar) == len(self._iids):
+            # Se reemplaza todo (otra página u otro filtro): se vuelve al inicio
+            self._iids = []
+            self._inicio = 0
+            self._ancla = None
+        elif len(quitar) == 1:
+            self._anclar()
+            self._iids.pop(self._posicion(next(iter(quitar))))
+        else:
+            self._anclar()
+            self._iids = [iid for iid in self._iids if iid not in quitar]
+        for iid in quitar:
+            del self._filas[iid]
+        if self._seleccion in quitar:
+            self._seleccion = None
+        self._posiciones = None
+        self._programar_dibujo()
+    
+    def selection(self) -> tuple:
+        return (self._seleccion,) if self._seleccion is not None else ()
+    
+    def selection_set(self, iid):
+        """Selecciona una fila (sin avisar a <<TreeviewSelect>>) y la hace visible"""
+        self._seleccion = str(iid)
+        self.see(iid)
+    
+    def see(self, iid):
+        """Desplaza la tabla lo necesario para que la fila sea visible"""
+        self._restaurar_ancla()
+        posicion = self._posicion(str(iid))
+        visibles = self._filas_visibles()
+        if posicion < self._inicio:
+            self._inicio = posicion
+        elif posicion >= self._inicio + visibles:
+            self._inicio = posicion - visibles + 1
+        self._programar_dibujo()
+    
+    def yview(self, *args):
+        """Comando de la scrollbar vertical (moveto / scroll)"""
+        if not args:
+            total = max(len(self._iids), 1)
+            return self._inicio / total, min(self._inicio + self._filas_visibles(), total) / total
+        self._restaurar_ancla()
+        if args[0] == 'moveto':
+            self._inicio = int(float(args[1]) * len(self._iids))
+        elif args[0] == 'scroll':
+            paso = int(args[1])
+            if args[2] == 'pages':
+                paso *= self._filas_visibles()
+            self._inicio += paso
+        self._dibujar()
+        
+    # ===== DIBUJO =====
+    
+    def _programar_dibujo(self):
+        """Dibuja una sola vez después de varios cambios seguidos"""
+        if self._dibujo_pendiente is None:
+            self._dibujo_pendiente = self.after_idle(self._dibujar)
+    
+    def _dibujar(self):
+        """Pone en los renglones del Treeview las filas de la ventana visible"""
+        if self._dibujo_pendiente is not None:
+            self.after_cancel(self._dibujo_pendiente)
+            self._dibujo_pendiente = None
+            
+        self._restaurar_ancla()
+        total = len(self._iids)
+        visibles = self._filas_visibles()
+        self._inicio = max(0, min(self._inicio, total - visibles))
+        necesarios = min(total - self._inicio, visibles + self.overscan)
+        
+        while len(self._renglones) < necesarios:
+            self._renglones.append(self.tree.insert('', tk.END))
+        while len(self._renglones) > necesarios:
+            renglon = self._renglones.pop()
+            self._mostrado.pop(renglon, None)
+            self.tree.delete(renglon)
+            
+        seleccionado = None
+        for desplazamiento, renglon in enumerate(self._renglones):
+            iid = self._iids[self._inicio + desplazamiento]
+            values, tags = self._filas[iid]
+            mostrado = self._mostrado.get(renglon)
+            # Solo se llama a Tk si el renglón muestra otra cosa
+            if mostrado is None or mostrado[1] is not values or mostrado[2] is not tags:
+                self.tree.item(renglon, values=values, tags=tags)
+            self._mostrado[renglon] = (iid, values, tags)
+            if iid == self._seleccion:
+                seleccionado = renglon
+                
+        actual = self.tree.selection()
+        if seleccionado is None:
+            if actual:
+                self.tree.selection_remove(*actual)
+        elif actual != (seleccionado,):
+            self.tree.selection_set(seleccionado)
+        self.tree.yview_moveto(0)
+        self.vsb.set(*self.yview())
+    
+    def _filas_visibles(self) -> int:
+        """Renglones que caben en el alto actual del Treeview"""
+        alto = self.tree.winfo_height()
+        caja = self.tree.bbox(self._renglones[0]) if self._renglones else None
+        if caja:
+            return max(1, (alto - caja[1]) // caja[3])
+        return max(1, (alto - 25) // 20)  # Antes del primer dibujo: encabezado y renglón típicos
+        
+    # ===== EVENTOS =====
+    
+    def _seleccion_tk(self, event):
+        """Traduce la selección del Treeview a la fila y avisa si cambió"""
+        seleccion = self.tree.selection()
+        if not seleccion or seleccion[0] not in self._mostrado:
+            return  # Se quitó al desplazar: la fila sigue seleccionada
+        iid = self._mostrado[seleccion[0]][0]
+        if iid != self._seleccion:
+            self._seleccion = iid
+            self._avisar_seleccion(event)
+    
+    def _avisar_seleccion(self, event):
+        for funcion in self._al_seleccionar:
+            funcion(event)
+    
+    def _rueda(self, event):
+        """Rueda del ratón: Windows envía múltiplos de 120 por muesca, macOS pasos pequeños"""
+        if abs(event.delta) >= 120:
+            return self._desplazar(-3 * (event.delta // 120))
+        return self._desplazar(-event.delta)
+    
+    def _desplazar(self, filas: int):
+        self._restaurar_ancla()
+        self._inicio += filas
+        self._dibujar()
+        return 'break'
+    
+    def _tecla(self, event):
+        """Flechas, Re Pág / Av Pág, Inicio y Fin recorren todas las filas, no solo las creadas"""
+        if not self._iids:
+            return 'break'
+        if self._seleccion is None:
+            destino = self._inicio
+        else:
+            actual = self._posicion(self._seleccion)
+            pagina = self._filas_visibles()
+            destino = {
+                'Up': actual - 1, 'Down': actual + 1,
+                'Prior': actual - pagina, 'Next': actual + pagina,
+                'Home': 0, 'End': len(self._iids) - 1
+            }.get(event.keysym, actual)
+        destino = max(0, min(destino, len(self._iids) - 1))
+        
+        iid = self._iids[destino]
+        if iid != self._seleccion:
+            self.selection_set(iid)
+            self._dibujar()
+            self._avisar_seleccion(event)
+        return 'break'
+        
+    # ===== AUXILIARES =====
+    
+    def _anclar(self):
+        """Recuerda la primera fila visible antes de cambiar el orden de las filas"""
+        if self._ancla is None and self._inicio < len(self._iids):
+            self._ancla = self._iids[self._inicio]
+    
+    def _restaurar_ancla(self):
+        """
+        Vuelve a mostrar arriba la fila anclada aunque se hayan insertado o
+        eliminado filas antes que ella (si se eliminó, queda la misma posición)
+        """
+        if self._ancla is None:
+            return
+        if self._ancla in self._filas:
+            self._inicio = self._posicion(self._ancla)
+        self._ancla = None
+    
+    def _posicion(self, iid: str) -> int:
+        """Índice de una fila (el mapa se rehace solo después de inserciones o movimientos)"""
+        if self._posiciones is None:
+            self._posiciones = {fila: indice for indice, fila in enumerate(self._iids)}
+        return self._posiciones[iid]
+    
+    @staticmethod
+    def _como_tupla(tags) -> tuple:
+        if isinstance(tags, str):
+            return (tags,) if tags else ()
+        return tuple(tags or ())